@@ -41,6 +41,9 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'nodes.middleware.NodeCompressionMiddleware',
+    'nodes.routers.NodesReplicaMiddleware',
+    'nodes.cache.TreeVersionMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -50,6 +53,39 @@ MIDDLEWARE = [
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
 ]
 
+# Node API response compression (brotli/zstd when available, gzip otherwise)
+NODES_COMPRESSION_MIN_SIZE = 1024
+NODES_COMPRESSION_PATH_PREFIXES = ('/api/',)
+
+# Maximum number of (language, node) entries in the process-level name cache
+NODES_NAME_CACHE_SIZE = 10000
+
+# Node names fall back from a regional code to its language ('it-CH' -> 'it'),
+# then to the codes listed here for it (e.g. {'rm': ['it', 'de']}), then to
+# NODES_DEFAULT_LANGUAGE
+NODES_LANGUAGE_FALLBACKS = {}
+NODES_DEFAULT_LANGUAGE = 'en'
+
+# Server-Sent Events (/api/nodes/events/): events a client may fall behind
+# before it is disconnected, and seconds between keepalive comments
+NODES_EVENTS_QUEUE_SIZE = 1000
+NODES_EVENTS_KEEPALIVE = 15
+
+# Write coalescing of child inserts in create_node: off by default; when on,
+# inserts are queued for up to NODES_CREATE_BATCH_LATENCY seconds and written
+# up to NODES_CREATE_BATCH_SIZE at a time by a single writer thread
+NODES_CREATE_BATCHING = False
+NODES_CREATE_BATCH_SIZE = 100
+NODES_CREATE_BATCH_LATENCY = 0.005
+
+# Rendered JSON of list_all_nodes, list_trees, get_node and search_children,
+# cached per tree version: off by default; when on, the NODES_WARM_TOP most
+# requested reads are rendered again on NODES_WARM_THREADS background threads
+# after every write
+NODES_RESPONSE_CACHE = False
+NODES_WARM_TOP = 50
+NODES_WARM_THREADS = 2
+
 ROOT_URLCONF = 'challenge_hotiday.urls'
 
 TEMPLATES = [
@@ -77,9 +113,39 @@ DATABASES = {
     'default': {
         'ENGINE': 'django.db.backends.sqlite3',
         'NAME': BASE_DIR / 'db.sqlite3',
-    }
+    },
+    # Read replica of the nodes tables, only used once listed in
+    # NODES_READ_REPLICAS. Keeping it up to date is up to the replication
+    # (for SQLite, e.g. a periodic copy of db.sqlite3).
+    'replica': {
+        'ENGINE': 'django.db.backends.sqlite3',
+        'NAME': BASE_DIR / 'db.replica.sqlite3',
+    },
+}
+
+DATABASE_ROUTERS = ['nodes.routers.NodesReplicaRouter']
+
+# Shared by every worker: the tree version that keys the cached stats, names
+# and responses must be the same in all processes (see the nodes.W001 and
+# nodes.E001 checks). migrate creates the table. Entries of old versions stay
+# until they expire, so the table is sized well above the default 300 rows:
+# culling removes entries by key, current versions included.
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.db.DatabaseCache',
+        'LOCATION': 'nodes_cache',
+        'OPTIONS': {
+            'MAX_ENTRIES': 100000,
+            'CULL_FREQUENCY': 4,
+        },
+    },
 }
 
+# Aliases of DATABASES that the nodes app reads from (primary when empty),
+# and seconds a client keeps reading from the primary after a write
+NODES_READ_REPLICAS = []
+NODES_REPLICA_PIN_SECONDS = 5
+
 
 # Password validation
 # https://docs.djangoproject.com/en/5.2/ref/settings/#auth-password-validators
@@ -0,0 +1,30 @@
+"""
+API-only settings: the nodes JSON API without the admin, auth, sessions,
+messages and static files stacks, for workers that only serve /api/.
+
+Everything else comes from challenge_hotiday.settings. Use it with
+DJANGO_SETTINGS_MODULE=challenge_hotiday.settings_api; compare startup
+times with `python manage.py bench_startup`.
+"""
+
+from .settings import *  # noqa: F401,F403
+
+
+INSTALLED_APPS = [
+    'nodes',
+]
+
+MIDDLEWARE = [
+    'nodes.middleware.NodeCompressionMiddleware',
+    'nodes.routers.NodesReplicaMiddleware',
+    'nodes.cache.TreeVersionMiddleware',
+    'django.middleware.security.SecurityMiddleware',
+    'django.middleware.common.CommonMiddleware',
+]
+
+ROOT_URLCONF = 'challenge_hotiday.urls_api'
+
+# No HTML is rendered
+TEMPLATES = []
+
+AUTH_PASSWORD_VALIDATORS = []
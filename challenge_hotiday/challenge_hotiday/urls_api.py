@@ -0,0 +1,9 @@
+"""
+URL configuration of the API-only settings (challenge_hotiday.settings_api):
+the nodes endpoints, without the admin.
+"""
+from django.urls import path, include
+
+urlpatterns = [
+    path('', include('nodes.urls')),
+]
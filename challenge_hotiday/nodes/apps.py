@@ -1,6 +1,18 @@
 from django.apps import AppConfig
+from django.core.management import call_command
+from django.db.models.signals import post_migrate
+
+
+def create_cache_table(using: str = 'default', **kwargs) -> None:
+    # Without it every cached read fails; existing tables are left alone
+    call_command('createcachetable', database=using, verbosity=0)
 
 
 class NodesConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'nodes'
+
+    def ready(self):
+        # Connect the name cache invalidation handlers and system checks
+        from . import checks, signals  # noqa: F401
+        post_migrate.connect(create_cache_table, sender=self)
@@ -0,0 +1,228 @@
+"""
+Write coalescing for create_node: child inserts queued within a short
+window are written by a single writer thread in one transaction, with
+one shift of the Nested Set for the whole batch.
+"""
+import queue
+import time
+from collections import Counter
+from concurrent.futures import Future
+from threading import Lock, Thread
+from typing import Dict, List, Optional, Tuple, Union
+
+from django.conf import settings
+from django.db import close_old_connections, transaction
+from django.db.models import Case, F, IntegerField, When
+
+from .cache import bump_tree_version
+from .changes import record_changes
+from .models import NodeChange, NodeTree, NodeTreeNames
+from .nested_set import insert_node
+
+
+# (parent_id, {language: name})
+NodeSpec = Tuple[int, Dict[str, str]]
+
+# The created node and its names, or the error of that insert
+CreateResult = Union[Tuple[NodeTree, List[Dict[str, str]]], Exception]
+
+
+def create_nodes(specs: List[NodeSpec]) -> List[CreateResult]:
+    """
+    Insert one child per spec in a single transaction, with the same
+    numbering as inserting them one by one in order of insertion point.
+
+    Every insert at point P (its parent's rgt) shifts the values >= P of its
+    tree by 2, so after the whole batch a value v moves by 2 * (inserts in
+    the tree with P <= v): the shifts of each tree are done by one UPDATE
+    with a CASE over the distinct points.
+
+    Returns one result per spec, in order; an unknown parent gives a
+    NodeTree.DoesNotExist result and leaves the other inserts alone.
+    """
+    results: List[Optional[CreateResult]] = [None] * len(specs)
+    with transaction.atomic():
+        # Counting the children first takes the write lock, so the
+        # parents' rgt read below can't be stale
+        children: Counter = Counter(parent_id for parent_id, _ in specs)
+        NodeTree.objects.filter(id__in=children).update(children_count=Case(
+            *[When(id=parent_id, then=F('children_count') + count) for parent_id, count in children.items()],
+            default=F('children_count'),
+            output_field=IntegerField()
+        ))
+        parents: Dict[int, NodeTree] = NodeTree.objects.in_bulk(list(children))
+
+        accepted: List[int] = []
+        for index, (parent_id, _) in enumerate(specs):
+            if parent_id in parents:
+                accepted.append(index)
+            else:
+                results[index] = NodeTree.DoesNotExist(f'Parent node with ID {parent_id} not found')
+        if not accepted:
+            return results
+
+        # By tree, then insertion point; siblings keep their arrival order
+        accepted.sort(key=lambda index: (parents[specs[index][0]].tree_id, parents[specs[index][0]].rgt, index))
+        lfts: Dict[int, int] = {}
+        for tree_id in sorted({parents[specs[index][0]].tree_id for index in accepted}):
+            in_tree: List[int] = [index for index in accepted if parents[specs[index][0]].tree_id == tree_id]
+            points: List[int] = [parents[specs[index][0]].rgt for index in in_tree]
+            for position, (index, point) in enumerate(zip(in_tree, points)):
+                lfts[index] = point + 2 * position
+            _shift_tree(tree_id, points)
+
+        nodes: List[NodeTree] = NodeTree.objects.bulk_create([
+            NodeTree(
+                tree_id=parents[specs[index][0]].tree_id,
+                lft=lfts[index],
+                rgt=lfts[index] + 1,
+                children_count=0,
+                parent=parents[specs[index][0]],
+                level=parents[specs[index][0]].level + 1,
+                path=parents[specs[index][0]].descendant_path
+            )
+            for index in accepted
+        ])
+
+        names: List[NodeTreeNames] = []
+        for index, node in zip(accepted, nodes):
+            created_names: List[Dict[str, str]] = []
+            for language, name in specs[index][1].items():
+                if name:  # Only create if name is not empty
+                    names.append(NodeTreeNames(nodeTree=node, language=language, nodeName=name))
+                    created_names.append({'language': language, 'name': name})
+            results[index] = (node, created_names)
+        NodeTreeNames.objects.bulk_create(names)
+
+        # Logged in insertion order, so replaying the changes one by one
+        # gives the same numbering
+        record_changes(NodeChange.CREATED, [
+            {
+                'node_id': node.id, 'parent_id': specs[index][0], 'tree_id': node.tree_id,
+                'lft': node.lft, 'rgt': node.rgt,
+                'names': {row['language']: row['name'] for row in results[index][1]}
+            }
+            for index, node in zip(accepted, nodes)
+        ])
+        bump_tree_version()
+
+    return results
+
+
+def _shift_tree(tree_id: int, points: List[int]) -> None:
+    """Make room for one insert per (sorted) point of the tree with one UPDATE"""
+    # Inserts at or before each distinct point, highest point first
+    shifts: List[Tuple[int, int]] = []
+    for position, point in enumerate(points):
+        if shifts and shifts[-1][0] == point:
+            shifts[-1] = (point, position + 1)
+        else:
+            shifts.append((point, position + 1))
+    shifts.reverse()
+
+    def shifted(field: str) -> Case:
+        return Case(
+            *[When(**{f'{field}__gte': point}, then=F(field) + 2 * count) for point, count in shifts],
+            default=F(field),
+            output_field=IntegerField()
+        )
+
+    NodeTree.objects.filter(tree_id=tree_id, rgt__gte=points[0]).update(lft=shifted('lft'), rgt=shifted('rgt'))
+
+
+class CreateBatcher:
+    """
+    Queue of child inserts written by a single writer thread.
+
+    The writer waits up to `max_latency` seconds after the first queued
+    insert for others to join, up to `max_batch_size`, then writes them
+    with create_nodes(). Callers block until their own insert is done;
+    past `timeout` seconds an insert that is still queued is dropped, one
+    being written is waited for.
+    """
+
+    def __init__(self, max_batch_size: int = 100, max_latency: float = 0.005, timeout: float = 30.0) -> None:
+        self.max_batch_size = max_batch_size
+        self.max_latency = max_latency
+        self.timeout = timeout
+        self._queue: 'queue.Queue[Tuple[NodeSpec, Future]]' = queue.Queue()
+        self._writer: Optional[Thread] = None
+        self._lock = Lock()
+
+    def submit(self, parent_id: int, names: Dict[str, str]) -> Tuple[NodeTree, List[Dict[str, str]]]:
+        """
+        Queue an insert and wait for it. Raises NodeTree.DoesNotExist for an
+        unknown parent, InvalidNodeName for a rejected name, TimeoutError if
+        it was dropped unwritten, or the error that failed the insert.
+        """
+        future: Future = Future()
+        self._start_writer()
+        self._queue.put(((parent_id, names), future))
+        try:
+            return future.result(self.timeout)
+        except TimeoutError:
+            if future.cancel():
+                # Still queued: the writer will skip it
+                raise
+        # Already being written: its outcome is the answer, not the wait
+        return future.result()
+
+    def _start_writer(self) -> None:
+        with self._lock:
+            if self._writer is None or not self._writer.is_alive():
+                self._writer = Thread(target=self._run, name='nodes-create-batcher', daemon=True)
+                self._writer.start()
+
+    def _next_batch(self) -> List[Tuple[NodeSpec, Future]]:
+        batch: List[Tuple[NodeSpec, Future]] = [self._queue.get()]
+        deadline: float = time.monotonic() + self.max_latency
+        while len(batch) < self.max_batch_size:
+            try:
+                batch.append(self._queue.get(timeout=max(deadline - time.monotonic(), 0)))
+            except queue.Empty:
+                break
+        return batch
+
+    def _run(self) -> None:
+        while True:
+            # Dropped by callers that timed out (see submit)
+            batch = [item for item in self._next_batch() if item[1].set_running_or_notify_cancel()]
+            if not batch:
+                continue
+            try:
+                self.write(batch)
+            except Exception as e:
+                # Never leave a caller waiting
+                for _, future in batch:
+                    if not future.done():
+                        future.set_exception(e)
+            finally:
+                close_old_connections()
+
+    def write(self, batch: List[Tuple[NodeSpec, Future]]) -> None:
+        """Write a batch and resolve the callers' futures"""
+        try:
+            results: List[CreateResult] = create_nodes([spec for spec, _ in batch])
+        except Exception:
+            if len(batch) > 1:
+                # Don't let one bad insert fail the others: retry them alone
+                for item in batch:
+                    self.write([item])
+                return
+            # Alone, it takes the per-request path: same result and errors
+            # (e.g. InvalidNodeName) as without batching
+            try:
+                results = [insert_node(*batch[0][0])]
+            except Exception as e:
+                results = [e]
+        for (_, future), result in zip(batch, results):
+            if isinstance(result, Exception):
+                future.set_exception(result)
+            else:
+                future.set_result(result)
+
+
+create_batcher = CreateBatcher(
+    max_batch_size=getattr(settings, 'NODES_CREATE_BATCH_SIZE', 100),
+    max_latency=getattr(settings, 'NODES_CREATE_BATCH_LATENCY', 0.005),
+)
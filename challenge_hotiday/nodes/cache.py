@@ -0,0 +1,167 @@
+import random
+from collections import OrderedDict
+from contextlib import contextmanager
+from contextvars import ContextVar
+from threading import Lock
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Set, Tuple
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+
+from django.core.cache import cache, caches, DEFAULT_CACHE_ALIAS
+from django.core.cache.backends.dummy import DummyCache
+from django.core.cache.backends.locmem import LocMemCache
+from django.db import transaction
+from django.dispatch import Signal
+from django.http import HttpRequest, HttpResponse
+
+
+TREE_VERSION_KEY = 'nodes:tree_version'
+
+# Sent with the new `version` after every bump (see nodes.warmer)
+tree_version_bumped = Signal()
+
+# Version resolved in the current tree_version_scope(), if any
+_scoped_version: ContextVar[Optional[Dict[str, int]]] = ContextVar('nodes_tree_version', default=None)
+
+
+def is_shared_cache(alias: str = DEFAULT_CACHE_ALIAS) -> bool:
+    """
+    Whether every worker process sees the same cache. The tree version
+    must live in one, or a write in one worker never reaches the others.
+    """
+    return not isinstance(caches[alias], (LocMemCache, DummyCache))
+
+
+def _new_version() -> int:
+    # Random rather than incremented: concurrent bumps can't end on the same
+    # value (incr isn't atomic on every backend), and a lost key never
+    # brings back a version that was used before
+    return random.getrandbits(62)
+
+
+@contextmanager
+def tree_version_scope() -> Iterator[None]:
+    """
+    Read the tree version from the cache once for the whole block (a
+    request, see TreeVersionMiddleware) instead of on every lookup.
+    """
+    token = _scoped_version.set({})
+    try:
+        yield
+    finally:
+        _scoped_version.reset(token)
+
+
+def get_tree_version() -> int:
+    """
+    Current version of the tree, to key caches of data derived from it.
+    """
+    scope: Optional[Dict[str, int]] = _scoped_version.get()
+    if scope and 'version' in scope:
+        return scope['version']
+    version = cache.get(TREE_VERSION_KEY)
+    if version is None:
+        cache.add(TREE_VERSION_KEY, _new_version(), timeout=None)
+        version = cache.get(TREE_VERSION_KEY)
+    if scope is not None:
+        scope['version'] = version
+    return version
+
+
+def bump_tree_version() -> None:
+    """
+    Move to a new tree version once the current transaction commits.
+    Call it after every change to nodes or names.
+    """
+    def bump() -> None:
+        version: int = _new_version()
+        cache.set(TREE_VERSION_KEY, version, timeout=None)
+        scope: Optional[Dict[str, int]] = _scoped_version.get()
+        if scope is not None:
+            # The rest of the writing request reads its own write
+            scope['version'] = version
+        tree_version_bumped.send(sender=None, version=version)
+
+    transaction.on_commit(bump)
+
+
+class TreeVersionMiddleware:
+    """Resolves the tree version at most once per request"""
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response: Callable) -> None:
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request: HttpRequest):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        with tree_version_scope():
+            return self.get_response(request)
+
+    async def __acall__(self, request: HttpRequest) -> HttpResponse:
+        with tree_version_scope():
+            return await self.get_response(request)
+
+
+class NodeNameCache:
+    """
+    Process-level LRU cache of resolved node names (id -> name) per language.
+
+    Entries are invalidated per node, for every language, when a change to
+    the node or one of its names commits (see nodes.signals).
+    """
+
+    def __init__(self, max_size: int = 10000) -> None:
+        self.max_size = max_size
+        self._entries: 'OrderedDict[Tuple[str, int], str]' = OrderedDict()
+        self._languages: Dict[int, Set[str]] = {}
+        self._lock = Lock()
+
+    def get_many(self, node_ids: Iterable[int], language: str) -> Tuple[Dict[int, str], List[int]]:
+        """
+        Return the cached names and the list of ids that are not cached.
+        """
+        found: Dict[int, str] = {}
+        missing: List[int] = []
+        with self._lock:
+            for node_id in node_ids:
+                key = (language, node_id)
+                if key in self._entries:
+                    self._entries.move_to_end(key)
+                    found[node_id] = self._entries[key]
+                else:
+                    missing.append(node_id)
+        return found, missing
+
+    def set_many(self, names: Dict[int, str], language: str) -> None:
+        with self._lock:
+            for node_id, name in names.items():
+                key = (language, node_id)
+                self._entries[key] = name
+                self._entries.move_to_end(key)
+                self._languages.setdefault(node_id, set()).add(language)
+            while len(self._entries) > self.max_size:
+                (old_language, old_id), _ = self._entries.popitem(last=False)
+                languages = self._languages.get(old_id)
+                if languages is not None:
+                    languages.discard(old_language)
+                    if not languages:
+                        del self._languages[old_id]
+
+    def invalidate(self, node_ids: Iterable[int]) -> None:
+        """Drop the names of the given nodes in every language"""
+        with self._lock:
+            for node_id in node_ids:
+                for language in self._languages.pop(node_id, ()):
+                    self._entries.pop((language, node_id), None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._languages.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
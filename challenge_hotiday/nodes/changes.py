@@ -0,0 +1,39 @@
+"""
+Change feed of tree mutations (see NodeChange).
+"""
+from typing import Any, Dict, Iterable, List, Optional
+
+from .events import broker
+from .models import NodeChange
+
+
+def record_change(action: str, node_id: Optional[int] = None, **data: Any) -> NodeChange:
+    """
+    Append a change to the log. Call it inside the transaction of the
+    mutation, so the change is only visible (and published to live
+    subscribers) if the mutation commits.
+    """
+    change = NodeChange.objects.create(action=action, node_id=node_id, data=data)
+    broker.publish_on_commit(serialize_change(change))
+    return change
+
+
+def record_changes(action: str, changes: Iterable[Dict[str, Any]]) -> List[NodeChange]:
+    """Append one change per {"node_id": ..., **data} item with a single insert"""
+    created: List[NodeChange] = NodeChange.objects.bulk_create([
+        NodeChange(action=action, node_id=change.pop('node_id', None), data=change)
+        for change in (dict(change) for change in changes)
+    ])
+    for change in created:
+        broker.publish_on_commit(serialize_change(change))
+    return created
+
+
+def serialize_change(change: NodeChange) -> Dict[str, Any]:
+    return {
+        'seq': change.seq,
+        'action': change.action,
+        'node_id': change.node_id,
+        'data': change.data,
+        'created_at': change.created_at.isoformat()
+    }
@@ -0,0 +1,25 @@
+from django.conf import settings
+from django.core.checks import Error, Warning, register
+
+from .cache import is_shared_cache
+
+
+@register()
+def check_shared_cache(app_configs, **kwargs):
+    """The tree version keying the stats and response caches must be shared by every worker"""
+    if is_shared_cache():
+        return []
+    if getattr(settings, 'NODES_RESPONSE_CACHE', False):
+        return [Error(
+            'NODES_RESPONSE_CACHE is set but the default cache is local to each process, '
+            'so the response cache stays off.',
+            hint="Configure a shared CACHES['default'] backend (database, Redis or Memcached).",
+            id='nodes.E001',
+        )]
+    # Fine with a single process (e.g. runserver or one worker)
+    return [Warning(
+        'The default cache is local to each process: with several workers, a write in one '
+        'would not invalidate the cached stats and names of the others.',
+        hint="Configure a shared CACHES['default'] backend (database, Redis or Memcached).",
+        id='nodes.W001',
+    )]
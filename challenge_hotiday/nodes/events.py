@@ -0,0 +1,242 @@
+"""
+In-process publish/subscribe of tree changes, streamed to clients as
+Server-Sent Events.
+
+Changes are published once their transaction commits (see
+nodes.changes.record_change). Every process only sees its own writes:
+with several worker processes, clients that need every change should
+also poll the change feed (/api/nodes/changes/), which is what they
+catch up from when they reconnect with Last-Event-ID.
+"""
+import asyncio
+import json
+from threading import Lock
+from typing import Any, AsyncIterator, Dict, List, Optional, Set, Tuple
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Max, Q
+
+from .models import NodeChange, NodeTree
+
+
+# Changes read per query when a client catches up
+REPLAY_BATCH_SIZE: int = 500
+
+
+class Subscription:
+    """
+    Queue of events for one client, bound to the event loop serving it.
+
+    A client that falls more than `max_size` events behind is cut off
+    (it can reconnect and catch up from the change log) instead of
+    letting its queue grow without limit.
+    """
+
+    def __init__(self, loop: asyncio.AbstractEventLoop, max_size: int) -> None:
+        self.loop = loop
+        self.max_size = max_size
+        self.overflowed: bool = False
+        self._queue: 'asyncio.Queue[Optional[Dict[str, Any]]]' = asyncio.Queue()
+
+    def put(self, event: Dict[str, Any]) -> None:
+        """Thread-safe: hand the event over to the subscriber's loop"""
+        self.loop.call_soon_threadsafe(self._put, event)
+
+    def _put(self, event: Dict[str, Any]) -> None:
+        if self.overflowed:
+            return
+        if self._queue.qsize() >= self.max_size:
+            self.overflowed = True
+            # Wake the reader up so it notices
+            self._queue.put_nowait(None)
+            return
+        self._queue.put_nowait(event)
+
+    async def get(self) -> Optional[Dict[str, Any]]:
+        """Next event, or None once the subscription overflowed"""
+        event = await self._queue.get()
+        return None if self.overflowed else event
+
+
+class EventBroker:
+    """Fan-out of published events to every subscription of this process"""
+
+    def __init__(self, queue_size: int = 1000) -> None:
+        self.queue_size = queue_size
+        self._subscriptions: Set[Subscription] = set()
+        self._lock = Lock()
+
+    def subscribe(self) -> Subscription:
+        """Subscribe from a coroutine, on the loop that will read the events"""
+        subscription = Subscription(asyncio.get_running_loop(), self.queue_size)
+        with self._lock:
+            self._subscriptions.add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription) -> None:
+        with self._lock:
+            self._subscriptions.discard(subscription)
+
+    def publish(self, event: Dict[str, Any]) -> None:
+        """Send an event to every subscription; callable from any thread"""
+        with self._lock:
+            subscriptions: List[Subscription] = list(self._subscriptions)
+        for subscription in subscriptions:
+            try:
+                subscription.put(event)
+            except RuntimeError:
+                # The subscriber's loop is closed
+                self.unsubscribe(subscription)
+
+    def publish_on_commit(self, event: Dict[str, Any]) -> None:
+        """Publish once the current transaction commits, never if it rolls back"""
+        transaction.on_commit(lambda: self.publish(event))
+
+    def __len__(self) -> int:
+        return len(self._subscriptions)
+
+
+class SubtreeFilter:
+    """
+    Matches the events of one subtree by tree and lft/rgt range.
+
+    The range is shifted on node creations like create_node shifts the
+    tree, and must be reloaded (see load_subtree) after moves and rebuilds.
+    """
+
+    def __init__(self, node_id: int, tree_id: int, lft: int, rgt: int) -> None:
+        self.node_id = node_id
+        self.tree_id = tree_id
+        self.lft = lft
+        self.rgt = rgt
+
+    def needs_reload(self, event: Dict[str, Any]) -> bool:
+        return event['action'] in (NodeChange.MOVED, NodeChange.REBUILT)
+
+    def matches(self, event: Dict[str, Any], shift: bool = True) -> bool:
+        """
+        Whether the event is about the subtree. With `shift`, creations move
+        the range; pass False for events the range already reflects.
+        """
+        if event['action'] == NodeChange.REBUILT:
+            return True
+        if event['action'] == NodeChange.DELETED:
+            # Whole trees are deleted
+            return event['data']['tree_id'] == self.tree_id
+        lft: Optional[int] = event['data'].get('lft')
+        if lft is None or event['data'].get('tree_id', self.tree_id) != self.tree_id:
+            # Other trees have their own numbering
+            return False
+        if event['action'] == NodeChange.CREATED:
+            # The new node took the place of its parent's rgt
+            inside: bool = self.lft < lft <= self.rgt
+            if shift and lft <= self.rgt:
+                self.rgt += 2
+            if shift and lft < self.lft:
+                self.lft += 2
+            return inside
+        return self.lft <= lft <= self.rgt
+
+
+def load_subtree(node_id: int) -> Tuple[Optional[SubtreeFilter], int]:
+    """
+    Range filter of a subtree (None if the node doesn't exist) and the last
+    change sequence number it is consistent with.
+    """
+    with transaction.atomic():
+        node: Optional[NodeTree] = NodeTree.objects.filter(id=node_id).first()
+        last_seq: int = last_change_seq()
+    if node is None:
+        return None, last_seq
+    return SubtreeFilter(node.id, node.tree_id, node.lft, node.rgt), last_seq
+
+
+def last_change_seq() -> int:
+    return NodeChange.objects.aggregate(last_seq=Max('seq'))['last_seq'] or 0
+
+
+def changes_between(since: int, until: int, subtree: Optional[SubtreeFilter],
+                    limit: int = REPLAY_BATCH_SIZE) -> List[NodeChange]:
+    """
+    Logged changes with since < seq <= until. With a subtree, only the
+    changes of nodes that are in it now, and whole-tree changes.
+    """
+    changes = NodeChange.objects.filter(seq__gt=since, seq__lte=until)
+    if subtree is not None:
+        current = NodeTree.objects.filter(
+            tree_id=subtree.tree_id, lft__gte=subtree.lft, rgt__lte=subtree.rgt
+        ).values('id')
+        changes = changes.filter(Q(node_id__in=current) | Q(node_id__isnull=True))
+    return list(changes.order_by('seq')[:limit])
+
+
+def format_event(event: Dict[str, Any]) -> str:
+    """An event in the text/event-stream format"""
+    return (
+        f"id: {event['seq']}\n"
+        f"event: node-{event['action']}\n"
+        f"data: {json.dumps(event, separators=(',', ':'))}\n\n"
+    )
+
+
+async def event_stream(subscription: Subscription, since: Optional[int], node_id: Optional[int],
+                       keepalive: float) -> AsyncIterator[str]:
+    """
+    Stream the events of a subscription: first the logged changes after
+    `since` (if given), then live ones, with a comment line every
+    `keepalive` seconds so proxies keep the connection open.
+    """
+    from .changes import serialize_change
+
+    try:
+        subtree: Optional[SubtreeFilter] = None
+        if node_id is not None:
+            subtree, last_seq = await sync_to_async(load_subtree)(node_id)
+            # Changes up to range_seq are already reflected in the range
+            range_seq: int = last_seq
+            if subtree is None:
+                return
+        else:
+            last_seq = await sync_to_async(last_change_seq)()
+
+        # Tell the client how long to wait before reconnecting
+        yield 'retry: 3000\n\n'
+
+        if since is not None:
+            replayed_until: int = since
+            while True:
+                changes: List[NodeChange] = await sync_to_async(changes_between)(replayed_until, last_seq, subtree)
+                for change in changes:
+                    yield format_event(serialize_change(change))
+                if len(changes) < REPLAY_BATCH_SIZE:
+                    break
+                replayed_until = changes[-1].seq
+
+        while True:
+            try:
+                event: Optional[Dict[str, Any]] = await asyncio.wait_for(subscription.get(), keepalive)
+            except asyncio.TimeoutError:
+                yield ': keepalive\n\n'
+                continue
+            if event is None:
+                # Too far behind: let the client reconnect and catch up
+                return
+            # Already covered by the subtree range and the replay
+            if event['seq'] <= last_seq:
+                continue
+            last_seq = event['seq']
+            if subtree is not None:
+                if subtree.needs_reload(event):
+                    subtree, range_seq = await sync_to_async(load_subtree)(subtree.node_id)
+                    if subtree is None:
+                        return
+                if not subtree.matches(event, shift=event['seq'] > range_seq):
+                    continue
+            yield format_event(event)
+    finally:
+        broker.unsubscribe(subscription)
+
+
+broker = EventBroker(getattr(settings, 'NODES_EVENTS_QUEUE_SIZE', 1000))
@@ -0,0 +1,111 @@
+"""
+Synthetic trees for benchmarks and load tests.
+"""
+import random
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from django.db import transaction
+
+from .cache import bump_tree_version
+from .changes import record_change
+from .models import NodeChange, NodeTree, NodeTreeNames
+
+
+WORDS = [
+    'Sales', 'Marketing', 'Helpdesk', 'Accounting', 'Developers', 'Managers',
+    'Quality Assurance', 'Customer Account', 'Europe', 'Italy', 'North America',
+    'Logistics', 'Research', 'Legal', 'Operations', 'Procurement',
+]
+
+
+def tree_shape(size: int, fanout: int) -> List[Tuple[Optional[int], int, int, int, int]]:
+    """
+    Shape of a breadth-first tree with `fanout` children per node.
+
+    Returns one (parent index, lft, rgt, children_count, level) tuple per
+    node, indexed from 0; parents always come before their children.
+    """
+    children: Dict[int, List[int]] = {}
+    for index in range(1, size):
+        children.setdefault((index - 1) // fanout, []).append(index)
+
+    bounds: List[List[int]] = [[0, 0] for _ in range(size)]
+    counter: int = 0
+    stack: List[Tuple[int, bool]] = [(0, False)] if size else []
+    while stack:
+        index, visited = stack.pop()
+        counter += 1
+        if visited:
+            bounds[index][1] = counter
+            continue
+        bounds[index][0] = counter
+        stack.append((index, True))
+        for child in reversed(children.get(index, [])):
+            stack.append((child, False))
+
+    levels: List[int] = [0] * size
+    for index in range(1, size):
+        levels[index] = levels[(index - 1) // fanout] + 1
+
+    return [
+        ((index - 1) // fanout if index else None, lft, rgt, len(children.get(index, [])), levels[index])
+        for index, (lft, rgt) in enumerate(bounds)
+    ]
+
+
+def random_names(count: int, seed: int = 42) -> List[str]:
+    """Department-like names for generated nodes"""
+    rng = random.Random(seed)
+    return [f'{rng.choice(WORDS)} {index + 1}' for index in range(count)]
+
+
+def generate_tree(size: int, fanout: int = 8, languages: Iterable[str] = ('en', 'it'),
+                  batch_size: int = 5000) -> NodeTree:
+    """
+    Insert a new tree of `size` nodes, numbered in its own tree, with a
+    name per language for every node. Returns the root.
+    """
+    shape = tree_shape(size, fanout)
+    names: List[str] = random_names(size)
+    languages = list(languages)
+
+    with transaction.atomic():
+        tree_id: int = 0
+        ids: List[int] = []
+        paths: List[str] = []
+        start: int = 0
+        while start < size:
+            # A batch may only contain nodes whose parents were already inserted
+            end: int = min(start + batch_size, size, start * fanout + 1)
+            batch: List[NodeTree] = [
+                NodeTree(
+                    tree_id=tree_id,
+                    lft=lft,
+                    rgt=rgt,
+                    children_count=children_count,
+                    parent_id=ids[parent] if parent is not None else None,
+                    level=level,
+                    path=f'{paths[parent]}{ids[parent]}/' if parent is not None else '/',
+                )
+                for parent, lft, rgt, children_count, level in shape[start:end]
+            ]
+            for node in NodeTree.objects.bulk_create(batch):
+                ids.append(node.id)
+                paths.append(node.path)
+            if not tree_id:
+                # The root is alone in the first batch: the tree takes its id
+                tree_id = ids[0]
+                NodeTree.objects.filter(id=tree_id).update(tree_id=tree_id)
+
+            name_rows: List[NodeTreeNames] = [
+                NodeTreeNames(nodeTree_id=ids[index], language=language, nodeName=f'{names[index]} ({language})')
+                for index in range(start, end)
+                for language in languages
+            ]
+            NodeTreeNames.objects.bulk_create(name_rows)
+            start = end
+        # One entry instead of one per generated node
+        record_change(NodeChange.REBUILT, ids[0] if ids else None, generated=len(ids))
+        bump_tree_version()
+
+    return NodeTree.objects.get(id=ids[0])
@@ -0,0 +1,95 @@
+"""
+Fallback chains of node name languages.
+
+A language value (the 'language' parameter or an Accept-Language header)
+resolves to the ordered codes to look names up in: each requested code,
+then its base language ('it-CH' -> 'it'), then its NODES_LANGUAGE_FALLBACKS,
+and NODES_DEFAULT_LANGUAGE last. Chains are cached per value.
+"""
+from functools import lru_cache, wraps
+from typing import Callable, List, Tuple
+
+from django.conf import settings
+from django.core.signals import setting_changed
+from django.dispatch import receiver
+from django.http import HttpRequest, HttpResponse
+from django.utils.cache import patch_vary_headers
+
+
+# Longest chain resolved from one value, so headers can't make lookups grow
+MAX_CHAIN_LENGTH: int = 10
+
+
+def normalize_language(code: str) -> str:
+    """'it_ch' / 'IT-ch' -> 'it-CH'"""
+    base, _, region = code.strip().replace('_', '-').partition('-')
+    return f'{base.lower()}-{region.upper()}' if region else base.lower()
+
+
+def _accepted_codes(value: str) -> List[str]:
+    """Codes of a language value, most preferred first (q-values of Accept-Language)"""
+    weighted: List[Tuple[float, int, str]] = []
+    for position, item in enumerate(value.split(',')):
+        code, _, parameters = item.partition(';')
+        code = code.strip()
+        if not code or code == '*':
+            continue
+        quality: float = 1.0
+        for parameter in parameters.split(';'):
+            name, _, number = parameter.strip().partition('=')
+            if name == 'q':
+                try:
+                    quality = float(number)
+                except ValueError:
+                    quality = 0.0
+        if quality > 0:
+            weighted.append((-quality, position, normalize_language(code)))
+    return [code for _, _, code in sorted(weighted)]
+
+
+@lru_cache(maxsize=1024)
+def language_chain(value: str) -> Tuple[str, ...]:
+    """Ordered, distinct codes to resolve names for a language value"""
+    fallbacks = getattr(settings, 'NODES_LANGUAGE_FALLBACKS', {})
+    chain: List[str] = []
+    for code in _accepted_codes(value):
+        base: str = code.partition('-')[0]
+        for candidate in (code, base, *fallbacks.get(code, ()), *fallbacks.get(base, ())):
+            if candidate not in chain:
+                chain.append(candidate)
+    default: str = getattr(settings, 'NODES_DEFAULT_LANGUAGE', 'en')
+    chain = chain[:MAX_CHAIN_LENGTH - 1]
+    if default not in chain:
+        chain.append(default)
+    return tuple(chain)
+
+
+def request_language(request: HttpRequest) -> str:
+    """The 'language' parameter, else the Accept-Language header, else the default"""
+    return (
+        request.GET.get('language')
+        or request.headers.get('Accept-Language')
+        or getattr(settings, 'NODES_DEFAULT_LANGUAGE', 'en')
+    )
+
+
+def vary_on_language(view: Callable) -> Callable:
+    """
+    Mark the responses of a view naming nodes with request_language() as
+    varying on Accept-Language, unless the 'language' parameter decided.
+    Outermost, so responses served from a cache are marked too.
+    """
+    @wraps(view)
+    def wrapper(request: HttpRequest, *args, **kwargs) -> HttpResponse:
+        response: HttpResponse = view(request, *args, **kwargs)
+        if not request.GET.get('language'):
+            patch_vary_headers(response, ('Accept-Language',))
+        return response
+
+    return wrapper
+
+
+@receiver(setting_changed)
+def clear_language_chains(setting: str, **kwargs) -> None:
+    if setting in ('NODES_LANGUAGE_FALLBACKS', 'NODES_DEFAULT_LANGUAGE'):
+        language_chain.cache_clear()
@@ -0,0 +1,84 @@
+import json
+import time
+from typing import Any, Dict, List
+
+from django.core.management.base import BaseCommand
+
+from nodes.generators import random_names, tree_shape
+from nodes.middleware import CODECS, compress_bytes
+from nodes.views import _to_columnar
+
+
+class Command(BaseCommand):
+    help = 'Benchmark response compression of node listings (size vs. latency)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--nodes', type=int, default=1000, help='Nodes per payload (default: 1000)')
+        parser.add_argument('--fanout', type=int, default=8, help='Children per node (default: 8)')
+        parser.add_argument('--repeat', type=int, default=20, help='Timing repetitions (default: 20)')
+        parser.add_argument('--chunk-size', type=int, default=8192, help='Chunk size for streamed responses (default: 8192)')
+        parser.add_argument('--bandwidth-mbps', type=float, default=10.0, help='Link bandwidth used to estimate transfer time (default: 10)')
+
+    def handle(self, *args, **options):
+        rows: List[Dict[str, Any]] = self._build_rows(options['nodes'], options['fanout'])
+        payloads: Dict[str, bytes] = {
+            'json': json.dumps({'status': 'success', 'data': {'nodes': rows}}).encode(),
+            'columnar': json.dumps({'status': 'success', 'data': {'nodes': _to_columnar(rows)}}).encode(),
+        }
+        bytes_per_ms: float = options['bandwidth_mbps'] * 1_000_000 / 8 / 1000
+
+        self.stdout.write(
+            f"{options['nodes']} nodes, {options['bandwidth_mbps']} Mbit/s link, "
+            f"codecs available: {', '.join(CODECS)}\n"
+        )
+        self.stdout.write(f"{'format':<10} {'encoding':<14} {'bytes':>10} {'ratio':>7} {'cpu ms':>8} {'total ms':>9}")
+
+        for format_name, payload in payloads.items():
+            self._report(format_name, 'identity', payload, len(payload), 0.0, bytes_per_ms)
+            for name, stream_class in CODECS.items():
+                compressed: bytes = compress_bytes(stream_class, payload)
+                cpu_ms: float = self._time(lambda: compress_bytes(stream_class, payload), options['repeat'])
+                self._report(format_name, name, payload, len(compressed), cpu_ms, bytes_per_ms)
+
+                chunks: List[bytes] = [
+                    payload[i:i + options['chunk_size']]
+                    for i in range(0, len(payload), options['chunk_size'])
+                ]
+                streamed_size: int = len(self._compress_stream(stream_class, chunks))
+                stream_ms: float = self._time(lambda: self._compress_stream(stream_class, chunks), options['repeat'])
+                self._report(format_name, f'{name}/stream', payload, streamed_size, stream_ms, bytes_per_ms)
+
+    def _build_rows(self, size: int, fanout: int) -> List[Dict[str, Any]]:
+        # Same shape and names as generated trees, serialized like list_all_nodes
+        names: List[str] = random_names(size)
+        return [
+            {
+                'id': index + 1,
+                'name': names[index],
+                'lft': lft,
+                'rgt': rgt,
+                'children_count': children_count,
+                'is_leaf': children_count == 0,
+                'depth': (rgt - lft - 1) // 2,
+            }
+            for index, (_, lft, rgt, children_count, _) in enumerate(tree_shape(size, fanout))
+        ]
+
+    def _compress_stream(self, stream_class, chunks: List[bytes]) -> bytes:
+        stream = stream_class()
+        return b''.join([stream.compress(chunk) for chunk in chunks] + [stream.finish()])
+
+    def _time(self, func, repeat: int) -> float:
+        timings: List[float] = []
+        for _ in range(max(repeat, 1)):
+            start: float = time.perf_counter()
+            func()
+            timings.append((time.perf_counter() - start) * 1000)
+        timings.sort()
+        return timings[len(timings) // 2]
+
+    def _report(self, format_name: str, encoding: str, payload: bytes, size: int, cpu_ms: float, bytes_per_ms: float) -> None:
+        total_ms: float = cpu_ms + size / bytes_per_ms
+        self.stdout.write(
+            f'{format_name:<10} {encoding:<14} {size:>10} {len(payload) / size:>6.1f}x {cpu_ms:>8.2f} {total_ms:>9.1f}'
+        )
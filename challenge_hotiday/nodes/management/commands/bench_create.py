@@ -0,0 +1,85 @@
+import json
+import random
+import statistics
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Tuple
+
+from django.core.management.base import BaseCommand
+from django.db import connection
+from django.test import RequestFactory, override_settings
+
+from nodes import batching
+from nodes.generators import generate_tree
+from nodes.models import NodeTree
+from nodes.nested_set import delete_tree, iter_tree_problems
+from nodes.views import create_node
+
+
+class Command(BaseCommand):
+    help = (
+        'Compare create_node throughput per request and with write batching, '
+        'from concurrent threads. Writes to the configured database: a tree is '
+        'generated for the run and deleted afterwards unless --keep is given'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--nodes', type=int, default=2000, help='Size of the generated tree (default: 2000)')
+        parser.add_argument('--creates', type=int, default=500, help='Inserts per mode (default: 500)')
+        parser.add_argument('--threads', type=int, default=16, help='Concurrent clients (default: 16)')
+        parser.add_argument('--batch-size', type=int, default=100, help='Maximum inserts per batch (default: 100)')
+        parser.add_argument('--latency', type=float, default=0.005, help='Seconds a batch waits for inserts (default: 0.005)')
+        parser.add_argument('--seed', type=int, default=42)
+        parser.add_argument('--keep', action='store_true', help='Keep the generated tree')
+
+    def handle(self, *args, **options):
+        root: NodeTree = generate_tree(options['nodes'])
+        parent_ids: List[int] = list(
+            NodeTree.objects.filter(tree_id=root.tree_id).values_list('id', flat=True)
+        )
+        batching.create_batcher.max_batch_size = options['batch_size']
+        batching.create_batcher.max_latency = options['latency']
+
+        self.stdout.write(
+            f"{options['creates']} inserts from {options['threads']} threads into a tree of "
+            f"{NodeTree.objects.count()} nodes (batch size {options['batch_size']}, "
+            f"latency {options['latency'] * 1000:g} ms), times in ms\n"
+        )
+        self.stdout.write(f"{'mode':<12} {'inserts/s':>10} {'median':>8} {'p95':>8} {'max':>8} {'errors':>7}")
+        try:
+            for label, enabled in (('per request', False), ('batched', True)):
+                with override_settings(NODES_CREATE_BATCHING=enabled):
+                    self._run(label, parent_ids, options)
+            problems: int = sum(1 for _ in iter_tree_problems(tree_id=root.tree_id))
+            self.stdout.write(f'\nNested Set problems in the generated tree after the run: {problems}')
+        finally:
+            if not options['keep']:
+                delete_tree(root.tree_id)
+
+    def _run(self, label: str, parent_ids: List[int], options: Dict) -> None:
+        rng = random.Random(options['seed'])
+        parents: List[int] = [rng.choice(parent_ids) for _ in range(options['creates'])]
+        factory = RequestFactory()
+
+        def insert(parent_id: int) -> Tuple[float, int]:
+            body: str = json.dumps({'parent_id': parent_id, 'names': {'en': f'Bench {parent_id}'}})
+            request = factory.post('/api/nodes/create/', body, content_type='application/json')
+            start: float = time.perf_counter()
+            try:
+                status: int = create_node(request).status_code
+            finally:
+                connection.close()
+            return (time.perf_counter() - start) * 1000, status
+
+        start: float = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=options['threads']) as pool:
+            results: List[Tuple[float, int]] = list(pool.map(insert, parents))
+        elapsed: float = time.perf_counter() - start
+
+        timings: List[float] = sorted(timing for timing, _ in results)
+        errors: int = sum(1 for _, status in results if status != 201)
+        p95: float = timings[min(len(timings) - 1, int(len(timings) * 0.95))]
+        self.stdout.write(
+            f'{label:<12} {len(results) / elapsed:>10.1f} {statistics.median(timings):>8.2f} '
+            f'{p95:>8.2f} {timings[-1]:>8.2f} {errors:>7}'
+        )
@@ -0,0 +1,93 @@
+import random
+import statistics
+import time
+from typing import Callable, Dict, List
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.db.models import F
+
+from nodes.models import NodeTree
+
+
+class _Rollback(Exception):
+    pass
+
+
+class Command(BaseCommand):
+    help = (
+        'Compare ancestor/descendant reads served by the Nested Set against '
+        'the materialized path, and child inserts maintaining the Nested Set '
+        'alone against both, on the current tree'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--samples', type=int, default=200, help='Random nodes per measurement (default: 200)')
+        parser.add_argument('--writes', type=int, default=20, help='Inserts per write measurement (default: 20)')
+        parser.add_argument('--seed', type=int, default=42)
+
+    def handle(self, *args, **options):
+        ids: List[int] = list(NodeTree.objects.values_list('id', flat=True))
+        if len(ids) < 2:
+            raise CommandError('Not enough nodes, run generate_tree first')
+        rng = random.Random(options['seed'])
+        nodes: List[NodeTree] = list(NodeTree.objects.filter(id__in=rng.sample(ids, min(options['samples'], len(ids)))))
+        others: List[NodeTree] = list(NodeTree.objects.filter(id__in=rng.sample(ids, min(options['samples'], len(ids)))))
+        internal: List[NodeTree] = list(NodeTree.objects.filter(children_count__gt=0).order_by('-level')[:options['samples']])
+
+        self.stdout.write(f'{len(ids)} nodes, times in ms (median / p95)\n')
+        self.stdout.write(f"{'operation':<24} {'nested set':>20} {'path':>20}")
+
+        self._compare(
+            'ancestors', nodes,
+            lambda node: list(node.tree_nodes().filter(lft__lt=node.lft, rgt__gt=node.rgt).values_list('id', flat=True)),
+            lambda node: list(node.ancestors().values_list('id', flat=True)),
+        )
+        self._compare(
+            'descendants', internal,
+            lambda node: list(node.tree_nodes().filter(lft__gt=node.lft, rgt__lt=node.rgt).values_list('id', flat=True)),
+            lambda node: list(node.descendants().values_list('id', flat=True)),
+        )
+        pairs = list(zip(nodes, others))
+        self._compare(
+            'is_descendant_of', pairs,
+            lambda pair: pair[1].tree_nodes().filter(id=pair[0].id, lft__gt=pair[1].lft, rgt__lt=pair[1].rgt).exists(),
+            lambda pair: pair[0].is_descendant_of(pair[1]),
+        )
+        # Inserts always shift the Nested Set: the path column is the extra cost
+        self._compare(
+            'insert child (+ path)', nodes[:options['writes']],
+            lambda parent: self._rolled_back(lambda: self._insert(parent, with_path=False)),
+            lambda parent: self._rolled_back(lambda: self._insert(parent, with_path=True)),
+        )
+
+    def _compare(self, name: str, items: List, nested_set: Callable, path: Callable) -> None:
+        results: Dict[str, str] = {}
+        for label, func in (('nested set', nested_set), ('path', path)):
+            timings: List[float] = []
+            for item in items:
+                start: float = time.perf_counter()
+                func(item)
+                timings.append((time.perf_counter() - start) * 1000)
+            timings.sort()
+            p95: float = timings[min(len(timings) - 1, int(len(timings) * 0.95))]
+            results[label] = f'{statistics.median(timings):.3f} / {p95:.3f}'
+        self.stdout.write(f"{name:<24} {results['nested set']:>20} {results['path']:>20}")
+
+    def _rolled_back(self, func: Callable) -> None:
+        try:
+            with transaction.atomic():
+                func()
+                raise _Rollback()
+        except _Rollback:
+            pass
+
+    def _insert(self, parent: NodeTree, with_path: bool) -> None:
+        # What create_node does: shift everything to the right of the parent,
+        # then insert the child, with its path or the column's default
+        parent.tree_nodes().filter(rgt__gte=parent.rgt).update(rgt=F('rgt') + 2)
+        parent.tree_nodes().filter(lft__gt=parent.rgt).update(lft=F('lft') + 2)
+        NodeTree.objects.create(
+            tree_id=parent.tree_id, lft=parent.rgt, rgt=parent.rgt + 1, parent=parent,
+            level=parent.level + 1, path=parent.descendant_path if with_path else '/'
+        )
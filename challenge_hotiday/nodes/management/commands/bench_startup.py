@@ -0,0 +1,89 @@
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+from typing import Dict, List
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+
+# Run in a fresh interpreter per measurement: loads the WSGI application,
+# then serves one request, and prints the timings as JSON
+PROBE = '''
+import json, sys, time
+start = time.perf_counter()
+from wsgiref.util import setup_testing_defaults
+from django.core.wsgi import get_wsgi_application
+application = get_wsgi_application()
+loaded = time.perf_counter()
+path, _, query = sys.argv[1].partition('?')
+environ = {'PATH_INFO': path, 'QUERY_STRING': query, 'HTTP_HOST': sys.argv[2]}
+setup_testing_defaults(environ)
+statuses = []
+body = b''.join(application(environ, lambda status, headers, exc_info=None: statuses.append(status)))
+served = time.perf_counter()
+print(json.dumps({
+    'import_ms': (loaded - start) * 1000,
+    'first_response_ms': (served - loaded) * 1000,
+    'modules': len(sys.modules),
+    'status': statuses[0],
+}))
+'''
+
+
+class Command(BaseCommand):
+    help = (
+        'Compare the cold start of settings modules: time to load the WSGI '
+        'application (imports, django.setup(), middleware) and to serve the '
+        'first request, each in a fresh interpreter'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--settings-modules', default='challenge_hotiday.settings,challenge_hotiday.settings_api',
+            help='Comma-separated settings modules to compare (default: the full and the API-only settings)'
+        )
+        parser.add_argument('--path', default='/api/nodes/?page_size=1', help='First request (default: /api/nodes/?page_size=1)')
+        parser.add_argument('--host', default='localhost', help='Host header of the request (default: localhost)')
+        parser.add_argument('--runs', type=int, default=10, help='Runs per settings module (default: 10)')
+
+    def handle(self, *args, **options):
+        modules: List[str] = [module.strip() for module in options['settings_modules'].split(',') if module.strip()]
+        samples: Dict[str, List[Dict]] = {module: [] for module in modules}
+        # Interleaved, so both see the same machine load and file cache
+        for _ in range(options['runs']):
+            for module in modules:
+                samples[module].append(self._probe(module, options))
+
+        self.stdout.write(
+            f"Median of {options['runs']} cold starts serving GET {options['path']}, times in ms\n"
+        )
+        self.stdout.write(
+            f"{'settings':<36} {'process':>8} {'import':>8} {'first response':>15} {'modules':>8} {'status':>8}"
+        )
+        for module in modules:
+            rows: List[Dict] = samples[module]
+            self.stdout.write(
+                f"{module:<36} {statistics.median(row['process_ms'] for row in rows):>8.1f} "
+                f"{statistics.median(row['import_ms'] for row in rows):>8.1f} "
+                f"{statistics.median(row['first_response_ms'] for row in rows):>15.1f} "
+                f"{rows[0]['modules']:>8} {rows[0]['status'].split()[0]:>8}"
+            )
+
+    def _probe(self, module: str, options: Dict) -> Dict:
+        environment: Dict[str, str] = {**os.environ, 'DJANGO_SETTINGS_MODULE': module}
+        start: float = time.perf_counter()
+        result = subprocess.run(
+            [sys.executable, '-c', PROBE, options['path'], options['host']],
+            cwd=settings.BASE_DIR, env=environment, capture_output=True, text=True
+        )
+        elapsed: float = (time.perf_counter() - start) * 1000
+        if result.returncode != 0:
+            raise CommandError(f'{module} failed to start:\n{result.stderr}')
+        row: Dict = json.loads(result.stdout.strip().splitlines()[-1])
+        # Interpreter startup included
+        row['process_ms'] = elapsed
+        return row
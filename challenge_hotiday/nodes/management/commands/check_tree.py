@@ -0,0 +1,53 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+
+from nodes.nested_set import find_orphan_names, iter_tree_problems, rebuild_nested_set
+
+
+class Command(BaseCommand):
+    help = 'Check the Nested Set invariants of the node tree, optionally repairing them'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--repair', action='store_true',
+            help='Rebuild lft/rgt/children_count from the parent relationships and delete orphan names'
+        )
+        parser.add_argument(
+            '--max-problems', type=int, default=50,
+            help='Maximum number of problems to print (default: 50)'
+        )
+
+    def handle(self, *args, **options):
+        problems: int = self._check(options['max_problems'])
+
+        if not problems:
+            self.stdout.write(self.style.SUCCESS('Tree is consistent'))
+            return
+
+        if not options['repair']:
+            raise CommandError(f'Found {problems} problems, run with --repair to fix them')
+
+        self.stdout.write('Repairing...')
+        try:
+            with transaction.atomic():
+                deleted, _ = find_orphan_names().delete()
+                updated: int = rebuild_nested_set()
+        except ValueError as e:
+            raise CommandError(f'Repair failed: {e}')
+        self.stdout.write(f'Deleted {deleted} orphan names, updated {updated} nodes')
+
+        remaining: int = self._check(options['max_problems'])
+        if remaining:
+            raise CommandError(f'{remaining} problems left after repair')
+        self.stdout.write(self.style.SUCCESS('Tree repaired'))
+
+    def _check(self, max_problems: int) -> int:
+        problems: int = 0
+        for node_id, problem in iter_tree_problems():
+            problems += 1
+            if problems <= max_problems:
+                prefix: str = f'Node {node_id}: ' if node_id is not None else ''
+                self.stdout.write(self.style.WARNING(f'{prefix}{problem}'))
+        if problems > max_problems:
+            self.stdout.write(f'... and {problems - max_problems} more')
+        return problems
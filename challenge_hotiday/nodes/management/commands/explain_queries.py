@@ -0,0 +1,205 @@
+import json
+import re
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from django.test import RequestFactory
+from django.test.utils import CaptureQueriesContext
+from django.urls import resolve, reverse
+
+from nodes import urls
+from nodes.cache import bump_tree_version
+from nodes.generators import generate_tree
+from nodes.models import NodeTree, node_names_cache
+
+
+# Statements worth explaining; savepoints and temp tables are skipped
+EXPLAINED = ('SELECT', 'INSERT', 'UPDATE', 'DELETE', 'WITH')
+
+# Tables (and their aliases, e.g. U0) scanned without an index
+TABLE_SCAN = re.compile(r'^SCAN (\w+)$')
+
+# Endpoints that can't be run as a plain request
+SKIPPED = {
+    'stream_events': 'streaming response (ASGI)',
+}
+
+
+class _Rollback(Exception):
+    pass
+
+
+class Command(BaseCommand):
+    help = (
+        'Run every endpoint of nodes/urls.py against a generated tree, '
+        'capture its SQL and report the EXPLAIN QUERY PLAN of every statement, '
+        'flagging full scans and temporary B-trees. Everything is rolled back'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--nodes', type=int, default=10000, help='Size of the generated tree (default: 10000)')
+        parser.add_argument('--fanout', type=int, default=8, help='Children per node (default: 8)')
+        parser.add_argument('--output', help='Write the report to this file instead of stdout')
+
+    def handle(self, *args, **options):
+        lines: List[str] = [f"# Query plans, generated tree of {options['nodes']} nodes (fanout {options['fanout']})"]
+        summary: List[str] = []
+        try:
+            with transaction.atomic():
+                root: NodeTree = generate_tree(options['nodes'], options['fanout'])
+                for name, method, kwargs, params, skipped in self._scenarios(root):
+                    lines.append('')
+                    if skipped:
+                        lines.append(f'## {name}: skipped, {skipped}')
+                        summary.append(f'{name:<20} skipped')
+                        continue
+                    lines.extend(self._report(name, method, kwargs, params, summary))
+                raise _Rollback()
+        except _Rollback:
+            pass
+        # Ids of the rolled back nodes can be reused: drop what was cached about them
+        node_names_cache.clear()
+        bump_tree_version()
+
+        lines.append('')
+        lines.append('# Summary (queries, full scans, temp B-trees)')
+        lines.extend(summary)
+        report: str = '\n'.join(lines) + '\n'
+        if options['output']:
+            with open(options['output'], 'w') as f:
+                f.write(report)
+            self.stdout.write(f"Report written to {options['output']}")
+        else:
+            self.stdout.write(report, ending='')
+
+    def _scenarios(self, root: NodeTree) -> List[Tuple[str, str, Dict[str, Any], Dict[str, Any], Optional[str]]]:
+        """
+        (url name, method, url kwargs, query parameters or JSON body, reason
+        to skip) per request, in the order of the URL patterns
+        """
+        children: List[NodeTree] = list(root.children.order_by('lft')[:2])
+        node: NodeTree = children[0] if children else root
+        sibling: NodeTree = children[-1]
+        leaf: NodeTree = node.tree_nodes().filter(
+            lft__gt=node.lft, rgt__lt=node.rgt
+        ).order_by('-level', 'lft').first() or node
+
+        scenarios: Dict[str, List[Tuple[str, Dict[str, Any], Dict[str, Any]]]] = {
+            'list_all_nodes': [
+                ('GET', {}, {'page_size': 100}),
+                ('GET', {}, {'page_size': 100, 'max_level': 1}),
+                ('GET', {}, {'page_size': 100, 'root_id': node.id, 'leaves_only': 'true'}),
+            ],
+            'list_trees': [('GET', {}, {'page_size': 100})],
+            'create_node': [('POST', {}, {'parent_id': node.id, 'names': {'en': 'Report', 'it': 'Report'}})],
+            'bulk_upsert_names': [('POST', {}, {'names': [{'node_id': node.id, 'language': 'fr', 'name': 'Rapport'}]})],
+            'list_changes': [('GET', {}, {'limit': 100})],
+            'get_node': [('GET', {'node_id': node.id}, {})],
+            'search_children': [('GET', {'node_id': node.id}, {'page_size': 100})],
+            'reorder_node': [('POST', {'node_id': sibling.id}, {'before': node.id})],
+            'node_ancestors': [('GET', {'node_id': leaf.id}, {})],
+            'node_stats': [('GET', {'node_id': node.id}, {})],
+            'children_stats': [('GET', {'node_id': node.id}, {'page_size': 100})],
+        }
+
+        result: List[Tuple[str, str, Dict[str, Any], Dict[str, Any], Optional[str]]] = []
+        for pattern in urls.urlpatterns:
+            if pattern.name in SKIPPED:
+                result.append((pattern.name, '', {}, {}, SKIPPED[pattern.name]))
+            elif pattern.name not in scenarios:
+                # New endpoints show up in the report until they get a scenario
+                result.append((pattern.name, '', {}, {}, 'no scenario in explain_queries'))
+            else:
+                for method, kwargs, params in scenarios[pattern.name]:
+                    result.append((pattern.name, method, kwargs, params, None))
+        return result
+
+    def _report(self, name: str, method: str, kwargs: Dict[str, Any], params: Dict[str, Any],
+                summary: List[str]) -> List[str]:
+        factory = RequestFactory()
+        path: str = reverse(f'nodes:{name}', kwargs=kwargs)
+        if method == 'GET':
+            request = factory.get(path, params)
+        else:
+            request = factory.post(path, json.dumps(params), content_type='application/json')
+        match = resolve(path)
+
+        # Every endpoint starts from cold caches, so the report doesn't depend on the order
+        node_names_cache.clear()
+        with CaptureQueriesContext(connection) as captured:
+            status: int = match.func(request, **match.kwargs).status_code
+        tables: Set[str] = set(connection.introspection.table_names())
+        skipped_tables: Set[str] = _cache_tables()
+
+        query = f"?{'&'.join(f'{key}={value}' for key, value in params.items())}" if method == 'GET' and params else ''
+        lines: List[str] = [f'## {name}: {method} {_normalize(path + query)} -> {status}']
+        scans: int = 0
+        temp_btrees: int = 0
+        explained: int = 0
+        for captured_query in captured.captured_queries:
+            sql: str = captured_query['sql']
+            if not sql.lstrip().upper().startswith(EXPLAINED):
+                continue
+            if any(f'"{table}"' in sql for table in skipped_tables):
+                # Statements of the cache backend, not of the endpoint
+                continue
+            explained += 1
+            lines.append(f'[{explained}] {_normalize(sql)}')
+            scanned: Set[str] = tables | _table_aliases(sql, tables)
+            for depth, detail in self._plan(sql):
+                flag: str = ''
+                if is_full_scan(detail, scanned):
+                    flag = '  <-- FULL SCAN'
+                    scans += 1
+                elif 'TEMP B-TREE' in detail:
+                    flag = '  <-- TEMP B-TREE'
+                    temp_btrees += 1
+                lines.append(f"    {'  ' * depth}{detail}{flag}")
+        summary.append(f'{name:<20} {explained:>3} {scans:>3} {temp_btrees:>3}   {method} {_normalize(path + query)}')
+        return lines
+
+    def _plan(self, sql: str) -> List[Tuple[int, str]]:
+        """(depth, detail) rows of the statement's query plan"""
+        with connection.cursor() as cursor:
+            try:
+                cursor.execute(f'EXPLAIN QUERY PLAN {sql}')
+            except Exception as e:
+                return [(0, f'(cannot explain: {e})')]
+            rows: List[Tuple[int, int, int, str]] = cursor.fetchall()
+
+        depths: Dict[int, int] = {0: -1}
+        plan: List[Tuple[int, str]] = []
+        for node_id, parent_id, _, detail in rows:
+            depths[node_id] = depths.get(parent_id, -1) + 1
+            plan.append((depths[node_id], detail))
+        return plan
+
+
+def is_full_scan(detail: str, tables: Set[str]) -> bool:
+    """
+    Whether a plan row reads a whole table (or an alias of one) without an
+    index. Scans of subqueries, co-routines and CTEs are not table scans.
+    """
+    match = TABLE_SCAN.match(detail)
+    return match is not None and match.group(1) in tables
+
+
+def _table_aliases(sql: str, tables: Set[str]) -> Set[str]:
+    """Aliases Django gives tables in subqueries and joins ('"nodes" U0')"""
+    return {alias for table, alias in re.findall(r'(?:FROM|JOIN) "(\w+)" ([A-Z]\d+)\b', sql) if table in tables}
+
+
+def _cache_tables() -> Set[str]:
+    """Tables of the database cache backends"""
+    return {
+        config['LOCATION'] for config in settings.CACHES.values()
+        if config['BACKEND'] == 'django.core.cache.backends.db.DatabaseCache'
+    }
+
+
+def _normalize(sql: str) -> str:
+    """Replace literals with ?, so ids of the generated tree don't show up in diffs"""
+    sql = re.sub(r"'(?:[^']|'')*'", '?', sql)
+    return re.sub(r'(?<![\w"])\d+(?![\w"])', '?', sql)
@@ -0,0 +1,26 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from nodes.generators import generate_tree
+
+
+class Command(BaseCommand):
+    help = 'Generate a synthetic tree for benchmarks, after the existing nodes'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--nodes', type=int, default=10000, help='Number of nodes (default: 10000)')
+        parser.add_argument('--fanout', type=int, default=8, help='Children per node (default: 8)')
+        parser.add_argument(
+            '--languages', default='en,it',
+            help='Comma separated languages to create names for (default: en,it)'
+        )
+
+    def handle(self, *args, **options):
+        languages = [language for language in options['languages'].split(',') if language]
+        started: float = time.perf_counter()
+        root = generate_tree(options['nodes'], fanout=options['fanout'], languages=languages)
+        self.stdout.write(self.style.SUCCESS(
+            f"Generated {options['nodes']} nodes under root {root.id} "
+            f"in {time.perf_counter() - started:.2f}s"
+        ))
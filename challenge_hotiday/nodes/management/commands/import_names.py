@@ -0,0 +1,36 @@
+from pathlib import Path
+
+from django.core.management.base import BaseCommand, CommandError
+
+from nodes.names import read_name_rows, upsert_node_names
+
+
+class Command(BaseCommand):
+    help = 'Insert or update node names from a JSON or CSV file (node_id, language, name)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help='File to import')
+        parser.add_argument(
+            '--format', choices=['json', 'csv'],
+            help='File format (default: guessed from the extension)'
+        )
+        parser.add_argument(
+            '--chunk-size', type=int, default=1000,
+            help='Rows written per query (default: 1000)'
+        )
+
+    def handle(self, *args, **options):
+        path = Path(options['path'])
+        content_format: str = options['format'] or ('csv' if path.suffix.lower() == '.csv' else 'json')
+        try:
+            rows = read_name_rows(path.read_text(encoding='utf-8'), content_format)
+        except (OSError, ValueError) as e:
+            raise CommandError(str(e))
+
+        upserted, errors = upsert_node_names(rows, chunk_size=options['chunk_size'])
+
+        for error in errors:
+            self.stdout.write(self.style.WARNING(f"Row {error['row']}: {error['message']}"))
+        self.stdout.write(self.style.SUCCESS(
+            f'Imported {upserted} of {len(rows)} names ({len(errors)} errors)'
+        ))
@@ -15,8 +15,11 @@ class Command(BaseCommand):
         # Create hierarchical structure based on the test data
         # Root - Company/Azienda
         company = NodeTree.objects.create(
-            lft=1, rgt=26, children_count=11
+            lft=1, rgt=24, children_count=11
         )
+        # Every tree is numbered on its own, under its root's id
+        company.tree_id = company.id
+        company.save(update_fields=['tree_id'])
         NodeTreeNames.objects.create(
             nodeTree=company, language='en', nodeName='Company'
         )
@@ -26,7 +29,8 @@ class Command(BaseCommand):
         
         # Marketing
         marketing = NodeTree.objects.create(
-            lft=2, rgt=3, children_count=0
+            lft=2, rgt=3, children_count=0,
+            parent=company, level=1, path=company.descendant_path, tree_id=company.id
         )
         NodeTreeNames.objects.create(
             nodeTree=marketing, language='en', nodeName='Marketing'
@@ -37,7 +41,8 @@ class Command(BaseCommand):
         
         # Helpdesk/Supporto tecnico
         helpdesk = NodeTree.objects.create(
-            lft=4, rgt=5, children_count=0
+            lft=4, rgt=5, children_count=0,
+            parent=company, level=1, path=company.descendant_path, tree_id=company.id
         )
         NodeTreeNames.objects.create(
             nodeTree=helpdesk, language='en', nodeName='Helpdesk'
@@ -48,7 +53,8 @@ class Command(BaseCommand):
         
         # Managers
         managers = NodeTree.objects.create(
-            lft=6, rgt=7, children_count=0
+            lft=6, rgt=7, children_count=0,
+            parent=company, level=1, path=company.descendant_path, tree_id=company.id
         )
         NodeTreeNames.objects.create(
             nodeTree=managers, language='en', nodeName='Managers'
@@ -59,7 +65,8 @@ class Command(BaseCommand):
         
         # Customer Account/Assistenza Cliente
         customer_account = NodeTree.objects.create(
-            lft=8, rgt=9, children_count=0
+            lft=8, rgt=9, children_count=0,
+            parent=company, level=1, path=company.descendant_path, tree_id=company.id
         )
         NodeTreeNames.objects.create(
             nodeTree=customer_account, language='en', nodeName='Customer Account'
@@ -70,7 +77,8 @@ class Command(BaseCommand):
         
         # Accounting/Amministrazione
         accounting = NodeTree.objects.create(
-            lft=10, rgt=11, children_count=0
+            lft=10, rgt=11, children_count=0,
+            parent=company, level=1, path=company.descendant_path, tree_id=company.id
         )
         NodeTreeNames.objects.create(
             nodeTree=accounting, language='en', nodeName='Accounting'
@@ -81,7 +89,8 @@ class Command(BaseCommand):
         
         # Sales/Supporto Vendite
         sales = NodeTree.objects.create(
-            lft=12, rgt=13, children_count=0
+            lft=12, rgt=13, children_count=0,
+            parent=company, level=1, path=company.descendant_path, tree_id=company.id
         )
         NodeTreeNames.objects.create(
             nodeTree=sales, language='en', nodeName='Sales'
@@ -92,7 +101,8 @@ class Command(BaseCommand):
         
         # Italy/Italia
         italy = NodeTree.objects.create(
-            lft=14, rgt=15, children_count=0
+            lft=14, rgt=15, children_count=0,
+            parent=company, level=1, path=company.descendant_path, tree_id=company.id
         )
         NodeTreeNames.objects.create(
             nodeTree=italy, language='en', nodeName='Italy'
@@ -103,7 +113,8 @@ class Command(BaseCommand):
         
         # Europe/Europa
         europe = NodeTree.objects.create(
-            lft=16, rgt=17, children_count=0
+            lft=16, rgt=17, children_count=0,
+            parent=company, level=1, path=company.descendant_path, tree_id=company.id
         )
         NodeTreeNames.objects.create(
             nodeTree=europe, language='en', nodeName='Europe'
@@ -114,7 +125,8 @@ class Command(BaseCommand):
         
         # Developers/Sviluppatori
         developers = NodeTree.objects.create(
-            lft=18, rgt=19, children_count=0
+            lft=18, rgt=19, children_count=0,
+            parent=company, level=1, path=company.descendant_path, tree_id=company.id
         )
         NodeTreeNames.objects.create(
             nodeTree=developers, language='en', nodeName='Developers'
@@ -125,7 +137,8 @@ class Command(BaseCommand):
         
         # North America/Nord America
         north_america = NodeTree.objects.create(
-            lft=20, rgt=21, children_count=0
+            lft=20, rgt=21, children_count=0,
+            parent=company, level=1, path=company.descendant_path, tree_id=company.id
         )
         NodeTreeNames.objects.create(
             nodeTree=north_america, language='en', nodeName='North America'
@@ -136,7 +149,8 @@ class Command(BaseCommand):
         
         # Quality Assurance/Controllo Qualità
         qa = NodeTree.objects.create(
-            lft=22, rgt=23, children_count=0
+            lft=22, rgt=23, children_count=0,
+            parent=company, level=1, path=company.descendant_path, tree_id=company.id
         )
         NodeTreeNames.objects.create(
             nodeTree=qa, language='en', nodeName='Quality Assurance'
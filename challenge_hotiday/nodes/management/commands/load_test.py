@@ -0,0 +1,220 @@
+import json
+import random
+import time
+import urllib.error
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, List, Optional, Tuple
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test import Client
+
+from nodes.generators import generate_tree
+from nodes.models import NodeTree
+from nodes.nested_set import delete_tree, iter_tree_problems
+
+
+OPERATIONS = ('get_node', 'search_children', 'list_all_nodes', 'create_node')
+
+DEFAULT_MIX = 'get_node=50,search_children=25,list_all_nodes=15,create_node=10'
+
+# Statements that take the database write lock
+WRITES = ('INSERT', 'UPDATE', 'DELETE')
+
+# (operation, method, path, JSON body)
+Call = Tuple[str, str, str, Optional[Dict[str, Any]]]
+
+# (operation, latency in ms, succeeded, lock wait in ms or None)
+Result = Tuple[str, float, bool, Optional[float]]
+
+
+def parse_mix(value: str) -> List[Tuple[str, int]]:
+    """'get_node=50,create_node=10' -> [('get_node', 50), ('create_node', 10)]"""
+    mix: List[Tuple[str, int]] = []
+    for item in value.split(','):
+        operation, _, weight = item.strip().partition('=')
+        if operation not in OPERATIONS:
+            raise CommandError(f"Unknown operation {operation!r}, expected one of {', '.join(OPERATIONS)}")
+        try:
+            mix.append((operation, int(weight)))
+        except ValueError:
+            raise CommandError(f'Invalid weight for {operation}: {weight!r}')
+    if not any(weight > 0 for _, weight in mix):
+        raise CommandError('The mix needs at least one positive weight')
+    return mix
+
+
+def percentile(values: List[float], fraction: float) -> float:
+    """Nearest-rank percentile of sorted values"""
+    return values[min(len(values) - 1, int(len(values) * fraction))]
+
+
+class _WriteLockTimer:
+    """
+    Times the first write statement of a request: transactions take the
+    database write lock there, so it is how long the request waited for
+    other writers (plus the statement itself).
+    """
+
+    def __init__(self) -> None:
+        self.waited: Optional[float] = None
+
+    def __call__(self, execute, sql, params, many, context):
+        if self.waited is not None or not sql.lstrip().upper().startswith(WRITES):
+            return execute(sql, params, many, context)
+        start: float = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.waited = (time.perf_counter() - start) * 1000
+
+
+class Command(BaseCommand):
+    help = (
+        'Replay a weighted mix of get_node, search_children, list_all_nodes and '
+        'create_node calls from concurrent threads, in process (through the '
+        'middleware) or against a running server with --url. Reports throughput, '
+        'latency percentiles, errors and write lock waits, then checks the Nested '
+        'Set invariants. Writes to the configured database: a tree is generated '
+        'for the run and deleted afterwards unless --keep is given'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--mix', default=DEFAULT_MIX, help=f'Weights per operation (default: {DEFAULT_MIX})')
+        parser.add_argument('--requests', type=int, default=2000, help='Calls to make (default: 2000)')
+        parser.add_argument('--threads', type=int, default=16, help='Concurrent clients, 1 runs inline (default: 16)')
+        parser.add_argument('--nodes', type=int, default=2000, help='Size of the generated tree (default: 2000)')
+        parser.add_argument('--page-size', type=int, default=50, help='Page size of the listings (default: 50)')
+        parser.add_argument('--url', help='Base URL of a running server using the same database, e.g. http://127.0.0.1:8000')
+        parser.add_argument('--host', help='Host header of in-process calls (default: from ALLOWED_HOSTS)')
+        parser.add_argument('--seed', type=int, default=42)
+        parser.add_argument('--keep', action='store_true', help='Keep the generated tree')
+
+    def handle(self, *args, **options):
+        mix: List[Tuple[str, int]] = parse_mix(options['mix'])
+        root: NodeTree = generate_tree(options['nodes'])
+        try:
+            calls: List[Call] = self._plan(root, mix, options)
+            self.stdout.write(
+                f"{len(calls)} calls from {options['threads']} threads, mix {options['mix']}, "
+                f"tree of {options['nodes']} nodes, {options['url'] or 'in process'}; times in ms\n"
+            )
+            start: float = time.perf_counter()
+            if options['threads'] <= 1:
+                client = self._client(options)
+                results: List[Result] = [client(call) for call in calls]
+            else:
+                with ThreadPoolExecutor(max_workers=options['threads']) as pool:
+                    results = list(pool.map(self._pooled(options), calls))
+            elapsed: float = time.perf_counter() - start
+            self._report(results, elapsed)
+
+            problems: List[Tuple[int, str]] = list(iter_tree_problems(tree_id=root.tree_id))
+            self.stdout.write(f'\nNested Set problems in the generated tree after the run: {len(problems)}')
+            for node_id, problem in problems[:10]:
+                self.stdout.write(f'  node {node_id}: {problem}')
+        finally:
+            if not options['keep']:
+                delete_tree(root.tree_id)
+        if problems:
+            raise CommandError(f'The tree is inconsistent after the run ({len(problems)} problems)')
+
+    def _plan(self, root: NodeTree, mix: List[Tuple[str, int]], options: Dict) -> List[Call]:
+        """The same calls for the same seed, tree size and mix"""
+        rng = random.Random(options['seed'])
+        node_ids: List[int] = list(NodeTree.objects.filter(tree_id=root.tree_id).values_list('id', flat=True))
+        page_size: int = options['page_size']
+        pages: int = max(NodeTree.objects.count() // page_size, 1)
+        operations: List[str] = rng.choices([operation for operation, _ in mix],
+                                            weights=[weight for _, weight in mix], k=options['requests'])
+        calls: List[Call] = []
+        for index, operation in enumerate(operations):
+            node_id: int = rng.choice(node_ids)
+            language: str = rng.choice(('en', 'it'))
+            if operation == 'get_node':
+                calls.append((operation, 'GET', f'/api/nodes/{node_id}/?language={language}', None))
+            elif operation == 'search_children':
+                calls.append((operation, 'GET', f'/api/nodes/{node_id}/children/?page_size={page_size}&language={language}', None))
+            elif operation == 'list_all_nodes':
+                calls.append((operation, 'GET', f'/api/nodes/?page_num={rng.randrange(pages) + 1}&page_size={page_size}', None))
+            else:
+                calls.append((operation, 'POST', '/api/nodes/create/', {
+                    'parent_id': node_id, 'names': {'en': f'Load {index}', 'it': f'Carico {index}'}
+                }))
+        return calls
+
+    def _pooled(self, options: Dict):
+        def call(item: Call) -> Result:
+            try:
+                return self._client(options)(item)
+            finally:
+                # Worker threads don't go through the request cycle that closes them
+                connection.close()
+        return call
+
+    def _client(self, options: Dict):
+        """A function making one call and returning its result"""
+        if options['url']:
+            return lambda item: self._http_call(options['url'].rstrip('/'), item)
+        host: str = options['host'] or _default_host()
+        client = Client(HTTP_HOST=host)
+
+        def call(item: Call) -> Result:
+            operation, method, path, body = item
+            timer = _WriteLockTimer()
+            start: float = time.perf_counter()
+            try:
+                with connection.execute_wrapper(timer):
+                    if method == 'GET':
+                        status: int = client.get(path).status_code
+                    else:
+                        status = client.post(path, json.dumps(body), content_type='application/json').status_code
+            except Exception:
+                status = 500
+            return operation, (time.perf_counter() - start) * 1000, status < 400, timer.waited
+        return call
+
+    def _http_call(self, base_url: str, item: Call) -> Result:
+        operation, method, path, body = item
+        data: Optional[bytes] = json.dumps(body).encode() if body is not None else None
+        request = urllib.request.Request(base_url + path, data=data, method=method,
+                                         headers={'Content-Type': 'application/json'})
+        start: float = time.perf_counter()
+        try:
+            with urllib.request.urlopen(request, timeout=60) as response:
+                response.read()
+                ok: bool = response.status < 400
+        except (urllib.error.URLError, OSError):
+            ok = False
+        # Lock waits of a remote server can't be seen from here
+        return operation, (time.perf_counter() - start) * 1000, ok, None
+
+    def _report(self, results: List[Result], elapsed: float) -> None:
+        self.stdout.write(
+            f"{'operation':<16} {'calls':>6} {'calls/s':>8} {'p50':>8} {'p90':>8} {'p99':>8} {'max':>8} "
+            f"{'errors':>7} {'lock avg':>9} {'lock max':>9}"
+        )
+        for operation in (*OPERATIONS, 'total'):
+            rows: List[Result] = [row for row in results if operation in ('total', row[0])]
+            if not rows:
+                continue
+            timings: List[float] = sorted(row[1] for row in rows)
+            errors: int = sum(1 for row in rows if not row[2])
+            waits: List[float] = [row[3] for row in rows if row[3] is not None]
+            lock: str = f'{sum(waits) / len(waits):>9.2f} {max(waits):>9.2f}' if waits else f"{'-':>9} {'-':>9}"
+            self.stdout.write(
+                f'{operation:<16} {len(rows):>6} {len(rows) / elapsed:>8.1f} {percentile(timings, 0.5):>8.2f} '
+                f'{percentile(timings, 0.9):>8.2f} {percentile(timings, 0.99):>8.2f} {timings[-1]:>8.2f} '
+                f'{errors / len(rows):>6.1%} {lock}'
+            )
+        self.stdout.write(f'\nElapsed {elapsed:.2f} s')
+
+
+def _default_host() -> str:
+    """A host accepted by ALLOWED_HOSTS (localhost is allowed with DEBUG and no hosts)"""
+    for host in settings.ALLOWED_HOSTS:
+        if host != '*':
+            return host.lstrip('.')
+    return 'localhost'
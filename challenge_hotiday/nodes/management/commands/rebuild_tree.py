@@ -0,0 +1,41 @@
+import time
+from typing import Dict
+
+from django.core.management.base import BaseCommand, CommandError
+
+from nodes.models import NodeTree
+from nodes.nested_set import rebuild_nested_set
+
+
+class Command(BaseCommand):
+    help = 'Renumber lft/rgt/children_count of every node from the parent relationships'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size', type=int, default=1000,
+            help='Rows read and updated per query (default: 1000)'
+        )
+        parser.add_argument(
+            '--dry-run', action='store_true',
+            help='Only report how many nodes would change'
+        )
+
+    def handle(self, *args, **options):
+        total: int = NodeTree.objects.count()
+        timings: Dict[str, float] = {}
+        started: float = time.perf_counter()
+        try:
+            updated: int = rebuild_nested_set(
+                batch_size=options['batch_size'], dry_run=options['dry_run'], timings=timings
+            )
+        except ValueError as e:
+            raise CommandError(str(e))
+        elapsed: float = time.perf_counter() - started
+
+        verb: str = 'would be updated' if options['dry_run'] else 'updated'
+        self.stdout.write(f'{total} nodes, {updated} {verb}')
+        self.stdout.write(
+            f"read {timings['read']:.2f}s, compute {timings['compute']:.2f}s, "
+            f"write {timings['write']:.2f}s, total {elapsed:.2f}s"
+        )
+        self.stdout.write(self.style.SUCCESS('Tree rebuilt' if not options['dry_run'] else 'Dry run done'))
@@ -0,0 +1,176 @@
+import zlib
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+from django.conf import settings
+from django.http import HttpRequest, HttpResponse
+from django.utils.cache import patch_vary_headers
+from django.utils.deprecation import MiddlewareMixin
+
+try:
+    import brotli
+except ImportError:  # optional dependency
+    brotli = None
+
+try:
+    from compression import zstd  # Python 3.14+
+except ImportError:
+    zstd = None
+
+
+class _GzipStream:
+    """Incremental gzip compressor that flushes after every chunk"""
+
+    def __init__(self) -> None:
+        self._compressor = zlib.compressobj(6, zlib.DEFLATED, 31)
+
+    def compress(self, chunk: bytes) -> bytes:
+        return self._compressor.compress(chunk) + self._compressor.flush(zlib.Z_SYNC_FLUSH)
+
+    def finish(self) -> bytes:
+        return self._compressor.flush(zlib.Z_FINISH)
+
+
+class _BrotliStream:
+    """Incremental brotli compressor that flushes after every chunk"""
+
+    def __init__(self) -> None:
+        self._compressor = brotli.Compressor(quality=5)
+
+    def compress(self, chunk: bytes) -> bytes:
+        return self._compressor.process(chunk) + self._compressor.flush()
+
+    def finish(self) -> bytes:
+        return self._compressor.finish()
+
+
+class _ZstdStream:
+    """Incremental zstd compressor that flushes after every chunk"""
+
+    def __init__(self) -> None:
+        self._compressor = zstd.ZstdCompressor(level=3)
+
+    def compress(self, chunk: bytes) -> bytes:
+        return self._compressor.compress(chunk, mode=zstd.ZstdCompressor.FLUSH_BLOCK)
+
+    def finish(self) -> bytes:
+        return self._compressor.flush()
+
+
+def compress_bytes(stream_class: Callable, data: bytes) -> bytes:
+    """Compress a whole body in one go with the given codec"""
+    stream = stream_class()
+    return stream.compress(data) + stream.finish()
+
+
+# Available encodings, in order of preference
+CODECS: Dict[str, Callable] = {}
+if brotli is not None:
+    CODECS['br'] = _BrotliStream
+if zstd is not None:
+    CODECS['zstd'] = _ZstdStream
+CODECS['gzip'] = _GzipStream
+
+
+def parse_accept_encoding(header: str) -> Dict[str, float]:
+    """
+    Parse an Accept-Encoding header into {encoding: quality}.
+    """
+    encodings: Dict[str, float] = {}
+    for item in header.split(','):
+        parts: List[str] = [part.strip() for part in item.split(';')]
+        if not parts[0]:
+            continue
+        quality: float = 1.0
+        for param in parts[1:]:
+            if param.startswith('q='):
+                try:
+                    quality = float(param[2:])
+                except ValueError:
+                    quality = 0.0
+        encodings[parts[0].lower()] = quality
+    return encodings
+
+
+def choose_encoding(header: str) -> Optional[str]:
+    """
+    Pick the preferred available encoding accepted by the client, if any.
+    """
+    accepted: Dict[str, float] = parse_accept_encoding(header)
+    candidates: List[Tuple[float, int, str]] = []
+    for position, name in enumerate(CODECS):
+        quality: float = accepted.get(name, accepted.get('*', 0.0))
+        if quality > 0:
+            candidates.append((-quality, position, name))
+    if not candidates:
+        return None
+    return min(candidates)[2]
+
+
+class NodeCompressionMiddleware(MiddlewareMixin):
+    """
+    Compress node API responses with brotli, zstd or gzip, negotiated by
+    Accept-Encoding. Regular responses are only compressed above
+    NODES_COMPRESSION_MIN_SIZE bytes; streamed responses are compressed
+    chunk by chunk.
+    """
+
+    def process_response(self, request: HttpRequest, response: HttpResponse) -> HttpResponse:
+        prefixes: Iterable[str] = getattr(settings, 'NODES_COMPRESSION_PATH_PREFIXES', ('/api/',))
+        if not request.path.startswith(tuple(prefixes)):
+            return response
+        if response.has_header('Content-Encoding'):
+            return response
+        # Server-sent events must reach the client as soon as they are written
+        if response.get('Content-Type', '').startswith('text/event-stream'):
+            return response
+
+        patch_vary_headers(response, ('Accept-Encoding',))
+
+        encoding: Optional[str] = choose_encoding(request.META.get('HTTP_ACCEPT_ENCODING', ''))
+        if encoding is None:
+            return response
+        stream_class = CODECS[encoding]
+
+        if response.streaming:
+            if response.is_async:
+                original_async_iterator = response.streaming_content
+
+                async def compress_async():
+                    stream = stream_class()
+                    async for chunk in original_async_iterator:
+                        data = stream.compress(chunk)
+                        if data:
+                            yield data
+                    yield stream.finish()
+
+                response.streaming_content = compress_async()
+            else:
+                original_iterator = response.streaming_content
+
+                def compress_sync():
+                    stream = stream_class()
+                    for chunk in original_iterator:
+                        data = stream.compress(chunk)
+                        if data:
+                            yield data
+                    yield stream.finish()
+
+                response.streaming_content = compress_sync()
+            response.headers.pop('Content-Length', None)
+        else:
+            min_size: int = getattr(settings, 'NODES_COMPRESSION_MIN_SIZE', 1024)
+            if len(response.content) < min_size:
+                return response
+            compressed: bytes = compress_bytes(stream_class, response.content)
+            if len(compressed) >= len(response.content):
+                return response
+            response.content = compressed
+            response.headers['Content-Length'] = str(len(response.content))
+
+        # The compressed body differs from the original one byte by byte
+        etag: Optional[str] = response.get('ETag')
+        if etag and etag.startswith('"'):
+            response.headers['ETag'] = 'W/' + etag
+        response.headers['Content-Encoding'] = encoding
+
+        return response
@@ -0,0 +1,55 @@
+# Generated by Django 5.2.4 on 2026-10-19 12:52
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+def backfill_parents(apps, schema_editor):
+    # The innermost interval strictly enclosing each node is its parent.
+    # Roots created through the API all start at lft=1 and overlap the
+    # first tree: a node that no open interval encloses becomes a root
+    NodeTree = apps.get_model('nodes', 'NodeTree')
+    stack = []
+    updated = []
+    for node in NodeTree.objects.order_by('lft', 'id').only('id', 'lft', 'rgt'):
+        stack = [open_node for open_node in stack if open_node.rgt >= node.lft]
+        parent = next((
+            open_node for open_node in reversed(stack)
+            if open_node.lft < node.lft and node.rgt < open_node.rgt
+        ), None)
+        if parent is not None:
+            node.parent_id = parent.id
+            updated.append(node)
+        stack.append(node)
+    NodeTree.objects.bulk_update(updated, ['parent'], batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('nodes', '0002_alter_nodetree_lft_alter_nodetree_rgt_nodetreenames'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='nodetree',
+            name='parent',
+            field=models.ForeignKey(blank=True, help_text='Direct parent (null for roots), used to check and rebuild the Nested Set', null=True, on_delete=django.db.models.deletion.CASCADE, related_name='children', to='nodes.nodetree'),
+        ),
+        migrations.AlterField(
+            model_name='nodetree',
+            name='lft',
+            field=models.IntegerField(help_text='Left value of the Nested Set'),
+        ),
+        migrations.AlterField(
+            model_name='nodetree',
+            name='rgt',
+            field=models.IntegerField(help_text='Right value of the Nested Set'),
+        ),
+        migrations.AlterField(
+            model_name='nodetreenames',
+            name='language',
+            field=models.CharField(help_text="Language code ('en', 'it')", max_length=10),
+        ),
+        migrations.RunPython(backfill_parents, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,36 @@
+# Generated by Django 5.2.4 on 2026-10-19 13:19
+
+from django.db import migrations, models
+
+
+def backfill_levels(apps, schema_editor):
+    # Parents come before their children in lft order
+    NodeTree = apps.get_model('nodes', 'NodeTree')
+    levels = {}
+    updated = []
+    for node in NodeTree.objects.order_by('lft', 'id').only('id', 'parent_id'):
+        node.level = levels[node.parent_id] + 1 if node.parent_id in levels else 0
+        levels[node.id] = node.level
+        if node.level:
+            updated.append(node)
+    NodeTree.objects.bulk_update(updated, ['level'], batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('nodes', '0003_nodetree_parent'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='nodetree',
+            name='level',
+            field=models.IntegerField(default=0, help_text='Distance from the root (0 for roots)'),
+        ),
+        migrations.AddIndex(
+            model_name='nodetree',
+            index=models.Index(fields=['lft', 'rgt'], name='nodes_lft_5520e5_idx'),
+        ),
+        migrations.RunPython(backfill_levels, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,32 @@
+# Generated by Django 5.2.4 on 2026-10-19 13:21
+
+from django.db import migrations, models
+
+
+def backfill_paths(apps, schema_editor):
+    # Parents come before their children in lft order
+    NodeTree = apps.get_model('nodes', 'NodeTree')
+    paths = {}
+    updated = []
+    for node in NodeTree.objects.order_by('lft', 'id').only('id', 'parent_id'):
+        node.path = f"{paths[node.parent_id]}{node.parent_id}/" if node.parent_id in paths else '/'
+        paths[node.id] = node.path
+        if node.path != '/':
+            updated.append(node)
+    NodeTree.objects.bulk_update(updated, ['path'], batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('nodes', '0004_nodetree_level'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='nodetree',
+            name='path',
+            field=models.CharField(db_index=True, default='/', help_text="Materialized path of the ancestor ids, e.g. '/1/5/' ('/' for roots)", max_length=1024),
+        ),
+        migrations.RunPython(backfill_paths, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,29 @@
+# Generated by Django 5.2.4 on 2026-10-19 13:23
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('nodes', '0005_nodetree_path'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='NodeChange',
+            fields=[
+                ('seq', models.BigAutoField(help_text='Monotonic sequence number', primary_key=True, serialize=False)),
+                ('action', models.CharField(choices=[('created', 'Created'), ('moved', 'Moved'), ('renamed', 'Renamed'), ('rebuilt', 'Rebuilt')], max_length=20)),
+                ('node_id', models.BigIntegerField(blank=True, help_text='Changed node (null for whole-tree changes)', null=True)),
+                ('data', models.JSONField(default=dict, help_text='Details needed to apply the change')),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+            ],
+            options={
+                'verbose_name': 'Node Change',
+                'verbose_name_plural': 'Node Changes',
+                'db_table': 'node_changes',
+                'ordering': ['seq'],
+            },
+        ),
+    ]
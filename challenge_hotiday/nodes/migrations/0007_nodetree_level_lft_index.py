@@ -0,0 +1,17 @@
+# Generated by Django 5.2.4 on 2026-10-19 13:34
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('nodes', '0006_nodechange'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='nodetree',
+            index=models.Index(fields=['level', 'lft'], name='nodes_level_32f94b_idx'),
+        ),
+    ]
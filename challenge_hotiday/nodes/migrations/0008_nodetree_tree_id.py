@@ -0,0 +1,60 @@
+# Generated by Django 5.2.4 on 2026-10-19 13:37
+
+from django.db import migrations, models
+from django.db.models import F, Q
+
+
+def backfill_tree_ids(apps, schema_editor):
+    # Every tree gets the id of its root and its own numbering from 1
+    NodeTree = apps.get_model('nodes', 'NodeTree')
+    for root in NodeTree.objects.filter(parent__isnull=True).order_by('lft', 'id'):
+        offset = root.lft - 1
+        NodeTree.objects.filter(Q(id=root.id) | Q(path__startswith=f'/{root.id}/')).update(
+            tree_id=root.id, lft=F('lft') - offset, rgt=F('rgt') - offset
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('nodes', '0007_nodetree_level_lft_index'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='nodetree',
+            name='nodes_lft_5520e5_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='nodetree',
+            name='nodes_level_32f94b_idx',
+        ),
+        migrations.AddField(
+            model_name='nodetree',
+            name='tree_id',
+            field=models.IntegerField(default=0, help_text="Id of the tree's root: every tree has its own lft/rgt numbering"),
+        ),
+        migrations.AlterField(
+            model_name='nodetree',
+            name='lft',
+            field=models.IntegerField(help_text='Left value of the Nested Set, within the tree'),
+        ),
+        migrations.AlterField(
+            model_name='nodetree',
+            name='rgt',
+            field=models.IntegerField(help_text='Right value of the Nested Set, within the tree'),
+        ),
+        migrations.RunPython(backfill_tree_ids, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='nodetree',
+            index=models.Index(fields=['tree_id', 'lft', 'rgt'], name='nodes_tree_id_a599fd_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='nodetree',
+            index=models.Index(fields=['tree_id', 'rgt'], name='nodes_tree_id_48f8d1_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='nodetree',
+            index=models.Index(fields=['level', 'tree_id', 'lft'], name='nodes_level_2c5aba_idx'),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.4 on 2026-10-19 13:49
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('nodes', '0008_nodetree_tree_id'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='nodetreenames',
+            name='language',
+            field=models.CharField(help_text="Language code ('en', 'it', 'it-CH')", max_length=10),
+        ),
+    ]
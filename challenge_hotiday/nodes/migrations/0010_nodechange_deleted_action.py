@@ -0,0 +1,18 @@
+# Generated by Django 5.2.4 on 2026-10-19 14:13
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('nodes', '0009_nodetreenames_language_help'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='nodechange',
+            name='action',
+            field=models.CharField(choices=[('created', 'Created'), ('moved', 'Moved'), ('renamed', 'Renamed'), ('rebuilt', 'Rebuilt'), ('deleted', 'Deleted')], max_length=20),
+        ),
+    ]
@@ -1,22 +1,53 @@
+from django.conf import settings
 from django.db import models
-from typing import Optional
+from django.db.models import Case, F, IntegerField, Value, When, Window
+from django.db.models.functions import RowNumber
+from typing import Dict, Iterable, List, Optional, Tuple
+from .cache import NodeNameCache, get_tree_version
+from .languages import language_chain
+from .routers import reads_from_primary
 
 # Create your models here.
 
 
 class NodeTree(models.Model):
 
-    lft = models.IntegerField(help_text="Left value of the Nested Set")
-    rgt = models.IntegerField(help_text="Right value of the Nested Set")
+    tree_id = models.IntegerField(default=0, help_text="Id of the tree's root: every tree has its own lft/rgt numbering")
+    lft = models.IntegerField(help_text="Left value of the Nested Set, within the tree")
+    rgt = models.IntegerField(help_text="Right value of the Nested Set, within the tree")
     children_count = models.IntegerField(default=0, help_text="Number of direct children")
+    parent = models.ForeignKey(
+        'self', null=True, blank=True, on_delete=models.CASCADE, related_name='children',
+        help_text="Direct parent (null for roots), used to check and rebuild the Nested Set"
+    )
+    level = models.IntegerField(default=0, help_text="Distance from the root (0 for roots)")
+    path = models.CharField(
+        max_length=1024, default='/', db_index=True,
+        help_text="Materialized path of the ancestor ids, e.g. '/1/5/' ('/' for roots)"
+    )
     
     class Meta:
         db_table = 'nodes'
         verbose_name = 'Node'
         verbose_name_plural = 'Nodes'
+        indexes = [
+            # Every Nested Set query and shift is scoped to one tree
+            models.Index(fields=['tree_id', 'lft', 'rgt']),
+            models.Index(fields=['tree_id', 'rgt']),
+            # Level-limited listings (list_all_nodes?max_level=)
+            models.Index(fields=['level', 'tree_id', 'lft']),
+        ]
     
     def __str__(self):
-        return f"Node {self.id} (lft: {self.lft}, rgt: {self.rgt})"
+        return f"Node {self.id} (tree: {self.tree_id}, lft: {self.lft}, rgt: {self.rgt})"
+    
+    @property
+    def is_root(self) -> bool:
+        return self.parent_id is None
+    
+    def tree_nodes(self) -> models.QuerySet:
+        """All the nodes of the node's tree"""
+        return NodeTree.objects.filter(tree_id=self.tree_id)
     
     @property
     def is_leaf(self) -> bool:
@@ -27,6 +58,32 @@ class NodeTree(models.Model):
     def depth(self) -> int:
         """Calculate the depth of the node in the tree"""
         return (self.rgt - self.lft - 1) // 2
+    
+    @property
+    def ancestor_ids(self) -> List[int]:
+        """Ids of the ancestors, from the root down to the parent"""
+        return [int(node_id) for node_id in self.path.strip('/').split('/') if node_id]
+    
+    @property
+    def descendant_path(self) -> str:
+        """Path prefix shared by all the descendants of the node"""
+        return f"{self.path}{self.id}/"
+    
+    def is_descendant_of(self, other: 'NodeTree') -> bool:
+        """Check if the node is below `other`, without any query"""
+        return self.path.startswith(other.descendant_path)
+    
+    def descendants(self) -> models.QuerySet:
+        """
+        Descendants of the node, as a range on the indexed path
+        ('/1/5/' <= path < '/1/50' matches every path starting with '/1/5/').
+        """
+        prefix: str = self.descendant_path
+        return NodeTree.objects.filter(path__gte=prefix, path__lt=prefix[:-1] + '0')
+    
+    def ancestors(self) -> models.QuerySet:
+        """Ancestors of the node, from the root down"""
+        return NodeTree.objects.filter(id__in=self.ancestor_ids).order_by('level')
 
 
 class NodeTreeNames(models.Model):
@@ -35,7 +92,7 @@ class NodeTreeNames(models.Model):
     supporting internationalization (i18n) for the API.
     """
     nodeTree = models.ForeignKey(NodeTree, on_delete=models.CASCADE, related_name='names')
-    language = models.CharField(max_length=10, help_text="Language code ('en', 'it')")
+    language = models.CharField(max_length=10, help_text="Language code ('en', 'it', 'it-CH')")
     nodeName = models.CharField(max_length=255, help_text="Name of the node in the specified language")
     
     class Meta:
@@ -54,17 +111,80 @@ class NodeTreeNames(models.Model):
     @classmethod
     def get_node_name(cls, node_id: int, language: str = 'en') -> str:
         """
-        Get the name of a node in the specified language ('en' or 'it')
-        Falls back to English if the requested language is not available.
+        Get the name of a node in the specified language ('en', 'it-CH', or
+        an Accept-Language value), following its fallback chain
+        (e.g. 'it-CH' -> 'it' -> 'en', see nodes.languages).
+        """
+        return cls.get_node_names([node_id], language)[node_id]
+    
+    @classmethod
+    def get_node_names(cls, node_ids: Iterable[int], language: str = 'en') -> Dict[int, str]:
         """
-        try:
-            # Try to get the name in the requested language
-            name_obj = cls.objects.get(nodeTree_id=node_id, language=language)
-            return name_obj.nodeName
-        except cls.DoesNotExist:
-            # Fallback to English
-            try:
-                name_obj = cls.objects.get(nodeTree_id=node_id, language='en')
-                return name_obj.nodeName
-            except cls.DoesNotExist:
-                return f"Node {node_id}"
+        Get the names of several nodes in the specified language, with the
+        same fallback chain as get_node_name.
+        Served from the process-level name cache, per chain; the missing
+        ids are loaded with a single query that keeps, for each node, the
+        name earliest in the chain.
+        """
+        node_ids = list(node_ids)
+        chain: Tuple[str, ...] = language_chain(language)
+        # Per tree version too, so writes in other workers reach this cache
+        cache_key: str = f"{get_tree_version()}:{'|'.join(chain)}"
+        names, missing = node_names_cache.get_many(node_ids, cache_key)
+        if missing:
+            loaded: Dict[int, str] = {node_id: f"Node {node_id}" for node_id in missing}
+            position = Case(
+                *[When(language=code, then=Value(index)) for index, code in enumerate(chain)],
+                output_field=IntegerField()
+            )
+            rows = cls.objects.filter(
+                nodeTree_id__in=missing, language__in=chain
+            ).annotate(
+                rank=Window(RowNumber(), partition_by=[F('nodeTree_id')], order_by=position.asc())
+            ).filter(rank=1).values_list('nodeTree_id', 'nodeName')
+            loaded.update(rows)
+            # A lagging replica would cache old names under the current version
+            if reads_from_primary():
+                node_names_cache.set_many(loaded, cache_key)
+            names.update(loaded)
+        return names
+
+
+
+class NodeChange(models.Model):
+    """
+    Append-only log of tree mutations. Mirrors poll it by sequence number
+    to sync incrementally instead of downloading the whole tree.
+    """
+    CREATED = 'created'
+    MOVED = 'moved'
+    RENAMED = 'renamed'
+    REBUILT = 'rebuilt'
+    DELETED = 'deleted'
+    ACTIONS = [
+        (CREATED, 'Created'),
+        (MOVED, 'Moved'),
+        (RENAMED, 'Renamed'),
+        (REBUILT, 'Rebuilt'),
+        (DELETED, 'Deleted'),
+    ]
+    
+    seq = models.BigAutoField(primary_key=True, help_text="Monotonic sequence number")
+    action = models.CharField(max_length=20, choices=ACTIONS)
+    # Not a foreign key, so the log outlives deleted nodes
+    node_id = models.BigIntegerField(null=True, blank=True, help_text="Changed node (null for whole-tree changes)")
+    data = models.JSONField(default=dict, help_text="Details needed to apply the change")
+    created_at = models.DateTimeField(auto_now_add=True)
+    
+    class Meta:
+        db_table = 'node_changes'
+        verbose_name = 'Node Change'
+        verbose_name_plural = 'Node Changes'
+        ordering = ['seq']
+    
+    def __str__(self):
+        return f"#{self.seq} {self.action} {self.node_id}"
+
+
+# Process-level cache behind NodeTreeNames.get_node_names
+node_names_cache = NodeNameCache(getattr(settings, 'NODES_NAME_CACHE_SIZE', 10000))
@@ -0,0 +1,127 @@
+"""
+Bulk import of node names (translations).
+"""
+import csv
+import io
+import json
+from functools import partial
+from typing import Any, Dict, Iterable, List, Tuple
+
+from django.db import transaction
+
+from .cache import bump_tree_version
+from .changes import record_changes
+from .models import NodeChange, NodeTree, NodeTreeNames, node_names_cache
+
+
+LANGUAGE_MAX_LENGTH: int = NodeTreeNames._meta.get_field('language').max_length
+NAME_MAX_LENGTH: int = NodeTreeNames._meta.get_field('nodeName').max_length
+
+
+def read_name_rows(content: str, content_format: str) -> List[Dict[str, Any]]:
+    """
+    Parse name rows from JSON or CSV text.
+
+    JSON: a list of {"node_id", "language", "name"} objects, or an object
+    with that list under "names". CSV: a header row with node_id,language,name.
+    Raises ValueError if the content can't be parsed.
+    """
+    if content_format == 'csv':
+        reader = csv.DictReader(io.StringIO(content))
+        if not reader.fieldnames or not {'node_id', 'language', 'name'} <= set(reader.fieldnames):
+            raise ValueError('CSV header must contain node_id, language and name')
+        return list(reader)
+    if content_format == 'json':
+        try:
+            data: Any = json.loads(content)
+        except json.JSONDecodeError:
+            raise ValueError('Invalid JSON format')
+        if isinstance(data, dict):
+            data = data.get('names')
+        if not isinstance(data, list):
+            raise ValueError('Names must be a list')
+        return data
+    raise ValueError(f'Unknown format {content_format}')
+
+
+def _validate_row(row: Any) -> Tuple[int, str, str]:
+    """Return (node_id, language, name) or raise ValueError with the reason"""
+    if not isinstance(row, dict):
+        raise ValueError('Row must be an object')
+    try:
+        node_id: int = int(row.get('node_id'))
+    except (TypeError, ValueError):
+        raise ValueError('node_id must be an integer')
+    language: Any = row.get('language')
+    name: Any = row.get('name')
+    if not isinstance(language, str) or not language.strip():
+        raise ValueError('language is required')
+    if len(language.strip()) > LANGUAGE_MAX_LENGTH:
+        raise ValueError(f'language is longer than {LANGUAGE_MAX_LENGTH} characters')
+    if not isinstance(name, str) or not name.strip():
+        raise ValueError('name is required')
+    if len(name) > NAME_MAX_LENGTH:
+        raise ValueError(f'name is longer than {NAME_MAX_LENGTH} characters')
+    return node_id, language.strip(), name
+
+
+def upsert_node_names(rows: Iterable[Any], chunk_size: int = 1000) -> Tuple[int, List[Dict[str, Any]]]:
+    """
+    Insert or update names in chunks, with one existence query and one
+    INSERT ... ON CONFLICT DO UPDATE per chunk on (nodeTree, language).
+
+    Invalid rows are skipped and reported as {"row": index, "message": ...}.
+    Returns (number of upserted names, errors).
+    """
+    rows = list(rows)
+    errors: List[Dict[str, Any]] = []
+    upserted: int = 0
+
+    with transaction.atomic():
+        for start in range(0, len(rows), chunk_size):
+            valid: Dict[Tuple[int, str], Tuple[int, str]] = {}
+            for index, row in enumerate(rows[start:start + chunk_size], start=start):
+                try:
+                    node_id, language, name = _validate_row(row)
+                except ValueError as e:
+                    errors.append({'row': index, 'message': str(e)})
+                    continue
+                # A later row for the same node and language wins
+                valid[(node_id, language)] = (index, name)
+
+            # The position is logged with the changes, for subtree subscribers
+            existing: Dict[int, Tuple[int, int]] = {
+                node_id: (tree_id, lft)
+                for node_id, tree_id, lft in NodeTree.objects.filter(
+                    id__in={node_id for node_id, _ in valid}
+                ).values_list('id', 'tree_id', 'lft')
+            }
+
+            names: List[NodeTreeNames] = []
+            for (node_id, language), (index, name) in valid.items():
+                if node_id not in existing:
+                    errors.append({'row': index, 'message': f'Node with ID {node_id} not found'})
+                    continue
+                names.append(NodeTreeNames(nodeTree_id=node_id, language=language, nodeName=name))
+
+            NodeTreeNames.objects.bulk_create(
+                names,
+                update_conflicts=True,
+                unique_fields=['nodeTree', 'language'],
+                update_fields=['nodeName'],
+            )
+            upserted += len(names)
+            record_changes(NodeChange.RENAMED, [
+                {'node_id': name.nodeTree_id, 'tree_id': existing[name.nodeTree_id][0],
+                 'lft': existing[name.nodeTree_id][1], 'language': name.language, 'name': name.nodeName}
+                for name in names
+            ])
+
+            # bulk_create doesn't send signals, invalidate the name cache here
+            transaction.on_commit(partial(node_names_cache.invalidate, {name.nodeTree_id for name in names}))
+
+        if upserted:
+            bump_tree_version()
+
+    errors.sort(key=lambda error: error['row'])
+    return upserted, errors
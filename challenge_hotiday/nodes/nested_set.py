@@ -0,0 +1,327 @@
+"""
+Nested Set maintenance helpers: integrity checks, renumbering
+of lft/rgt/children_count from the parent relationships and
+sibling moves.
+"""
+import time
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from django.db import connection, transaction
+from django.db.models import Case, F, Q, When
+
+from .cache import bump_tree_version
+from .changes import record_change
+from .models import NodeChange, NodeTree, NodeTreeNames
+
+
+def iter_tree_problems(chunk_size: int = 2000, tree_id: Optional[int] = None) -> Iterator[Tuple[Optional[int], str]]:
+    """
+    Check the Nested Set invariants in a single pass over the nodes
+    ordered by tree and lft, keeping only the current ancestors on a
+    stack (memory is O(depth)). Every tree must be numbered from 1.
+    With `tree_id`, only that tree is checked (and not the names).
+
+    Yields (node_id, problem) tuples; node_id is None for problems that
+    are not about a single node.
+    """
+    # Each frame: [id, lft, rgt, expected children_count, children seen, next expected lft, path]
+    stack: List[List[Any]] = []
+
+    def close(frame: List[Any]) -> Iterator[Tuple[Optional[int], str]]:
+        node_id, lft, rgt, children_count, children_seen, next_lft, _ = frame
+        if children_seen != children_count:
+            yield node_id, f'children_count is {children_count} but node has {children_seen} children'
+        if next_lft != rgt:
+            yield node_id, f'rgt is {rgt} but children end at {next_lft - 1}'
+
+    whole_table: bool = tree_id is None
+    nodes = NodeTree.objects.all() if whole_table else NodeTree.objects.filter(tree_id=tree_id)
+    rows = (
+        nodes
+        .order_by('tree_id', 'lft', 'id')
+        .values_list('id', 'tree_id', 'lft', 'rgt', 'children_count', 'parent_id', 'level', 'path')
+        .iterator(chunk_size=chunk_size)
+    )
+    current_tree: Optional[int] = None
+    for node_id, tree_id, lft, rgt, children_count, parent_id, level, path in rows:
+        if tree_id != current_tree:
+            while stack:
+                yield from close(stack.pop())
+            current_tree = tree_id
+
+        if lft >= rgt or (rgt - lft) % 2 == 0:
+            yield node_id, f'invalid interval ({lft}, {rgt})'
+            continue
+
+        while stack and stack[-1][2] < lft:
+            yield from close(stack.pop())
+
+        if stack:
+            top = stack[-1]
+            if rgt >= top[2] or lft == top[1]:
+                yield node_id, f'interval ({lft}, {rgt}) overlaps node {top[0]} ({top[1]}, {top[2]})'
+                continue
+            if parent_id != top[0]:
+                yield node_id, f'parent is {parent_id} but interval is inside node {top[0]}'
+            if lft != top[5]:
+                yield node_id, f'lft is {lft} but expected {top[5]}'
+            top[4] += 1
+            top[5] = rgt + 1
+        else:
+            if parent_id is not None:
+                yield node_id, f'parent is {parent_id} but interval is not inside any node'
+            if lft != 1:
+                yield node_id, f'lft is {lft} but the root of tree {tree_id} must start at 1'
+            if tree_id != node_id:
+                yield node_id, f'tree_id is {tree_id} but the root of a tree must have its own id'
+
+        if level != len(stack):
+            yield node_id, f'level is {level} but node is at depth {len(stack)}'
+        expected_path: str = f'{stack[-1][6]}{stack[-1][0]}/' if stack else '/'
+        if path != expected_path:
+            yield node_id, f'path is {path} but expected {expected_path}'
+
+        stack.append([node_id, lft, rgt, children_count, 0, lft + 1, path])
+
+    while stack:
+        yield from close(stack.pop())
+
+    if not whole_table:
+        return
+    orphan_names: int = find_orphan_names().count()
+    if orphan_names:
+        yield None, f'{orphan_names} names reference missing nodes'
+
+
+class InvalidNodeName(ValueError):
+    """A name of a new node was rejected by the database"""
+
+    def __init__(self, language: str) -> None:
+        super().__init__(f'Error creating name for language {language}')
+        self.language = language
+
+
+def insert_node(parent_id: Optional[int], names: Dict[str, str]) -> Tuple[NodeTree, List[Dict[str, str]]]:
+    """
+    Insert a new root (parent_id None) or a last child of the parent, with
+    its non-empty names. Node, shifts and names are written in one
+    transaction, so a failure can't leave the Nested Set half updated.
+
+    Returns the node and its created names. Raises NodeTree.DoesNotExist
+    for an unknown parent and InvalidNodeName for a name the database
+    rejects; nothing is written then.
+    """
+    with transaction.atomic():
+        if parent_id is None:
+            # A new root starts its own tree numbered from 1
+            new_node = NodeTree.objects.create(lft=1, rgt=2, children_count=0)
+            new_node.tree_id = new_node.id
+            NodeTree.objects.filter(id=new_node.id).update(tree_id=new_node.tree_id)
+        else:
+            # Update parent's children count first: this takes the write
+            # lock, so the parent's rgt read below can't be stale
+            if not NodeTree.objects.filter(id=parent_id).update(children_count=F('children_count') + 1):
+                raise NodeTree.DoesNotExist(f'Parent node with ID {parent_id} not found')
+            parent_node = NodeTree.objects.get(id=parent_id)
+
+            # Update all nodes that need to be shifted, in the parent's tree only
+            tree_nodes = parent_node.tree_nodes()
+            tree_nodes.filter(rgt__gte=parent_node.rgt).update(rgt=F('rgt') + 2)
+            tree_nodes.filter(lft__gt=parent_node.rgt).update(lft=F('lft') + 2)
+
+            new_node = NodeTree.objects.create(
+                tree_id=parent_node.tree_id,
+                lft=parent_node.rgt,
+                rgt=parent_node.rgt + 1,
+                children_count=0,
+                parent=parent_node,
+                level=parent_node.level + 1,
+                path=parent_node.descendant_path
+            )
+
+        created_names: List[Dict[str, str]] = []
+        for language, name in names.items():
+            if name:  # Only create if name is not empty
+                try:
+                    with transaction.atomic():
+                        NodeTreeNames.objects.create(nodeTree=new_node, language=language, nodeName=name)
+                except Exception:
+                    # Undoes the whole insert
+                    raise InvalidNodeName(language)
+                created_names.append({'language': language, 'name': name})
+
+        record_change(
+            NodeChange.CREATED, new_node.id,
+            parent_id=parent_id, tree_id=new_node.tree_id, lft=new_node.lft, rgt=new_node.rgt,
+            names={row['language']: row['name'] for row in created_names}
+        )
+        bump_tree_version()
+
+    return new_node, created_names
+
+
+def delete_tree(tree_id: int) -> int:
+    """
+    Delete a whole tree with its names, recording the change for mirrors
+    and moving to a new tree version. Returns the number of deleted nodes.
+    """
+    with transaction.atomic():
+        _, deleted = NodeTree.objects.filter(tree_id=tree_id).delete()
+        count: int = deleted.get(NodeTree._meta.label, 0)
+        if count:
+            record_change(NodeChange.DELETED, tree_id, tree_id=tree_id, deleted=count)
+            bump_tree_version()
+    return count
+
+
+def find_orphan_names():
+    """Names whose node no longer exists"""
+    return NodeTreeNames.objects.exclude(nodeTree_id__in=NodeTree.objects.values('id'))
+
+
+def rebuild_nested_set(batch_size: int = 1000, dry_run: bool = False,
+                       timings: Optional[Dict[str, float]] = None) -> int:
+    """
+    Renumber tree_id/lft/rgt/children_count/level/path of every node from
+    the parent relationships, keeping the current order of siblings. Every
+    root starts its own tree numbered from 1. Only changed rows are written,
+    staged in chunks of `batch_size` rows, in a single transaction.
+
+    If `timings` is given it is filled with the seconds spent reading,
+    computing and writing.
+
+    Returns the number of updated (or, with dry_run, outdated) nodes.
+    Raises ValueError if some nodes cannot be reached from a root.
+    """
+    timings = timings if timings is not None else {}
+    with transaction.atomic():
+        started: float = time.perf_counter()
+        children: Dict[Optional[int], List[int]] = {}
+        current: Dict[int, Tuple[int, int, int, int, int, str]] = {}
+        rows = (
+            NodeTree.objects
+            .order_by('tree_id', 'lft', 'id')
+            .values_list('id', 'parent_id', 'tree_id', 'lft', 'rgt', 'children_count', 'level', 'path')
+            .iterator(chunk_size=batch_size)
+        )
+        for node_id, parent_id, tree_id, lft, rgt, children_count, level, path in rows:
+            children.setdefault(parent_id, []).append(node_id)
+            current[node_id] = (tree_id, lft, rgt, children_count, level, path)
+        timings['read'] = time.perf_counter() - started
+
+        started = time.perf_counter()
+        # Iterative DFS, so deep trees don't hit the recursion limit
+        numbering: Dict[int, Tuple[int, int, int, int, int, str]] = {}
+        counter: int = 0
+        stack: List[Tuple[int, bool, int, int, str]] = [
+            (root_id, False, root_id, 0, '/') for root_id in reversed(children.get(None, []))
+        ]
+        while stack:
+            node_id, visited, tree_id, level, path = stack.pop()
+            if not visited and level == 0:
+                # A new tree
+                counter = 0
+            counter += 1
+            if visited:
+                lft = numbering[node_id][1]
+                numbering[node_id] = (tree_id, lft, counter, len(children.get(node_id, [])), level, path)
+                continue
+            numbering[node_id] = (tree_id, counter, 0, 0, level, path)
+            stack.append((node_id, True, tree_id, level, path))
+            for child_id in reversed(children.get(node_id, [])):
+                stack.append((child_id, False, tree_id, level + 1, f'{path}{node_id}/'))
+
+        unreachable: List[int] = [node_id for node_id in current if node_id not in numbering]
+        if unreachable:
+            raise ValueError(
+                f'{len(unreachable)} nodes are not reachable from a root '
+                f'(parent cycle), e.g. {sorted(unreachable)[:10]}'
+            )
+
+        updated: List[Tuple[int, int, int, int, int, int, str]] = [
+            (node_id, *values)
+            for node_id, values in numbering.items()
+            if current[node_id] != values
+        ]
+        timings['compute'] = time.perf_counter() - started
+
+        started = time.perf_counter()
+        if not dry_run:
+            _write_numbering(updated, batch_size)
+            if updated:
+                # Renumbering can touch any node: mirrors have to resync
+                record_change(NodeChange.REBUILT, updated=len(updated))
+            bump_tree_version()
+        timings['write'] = time.perf_counter() - started
+
+        return len(updated)
+
+
+def _write_numbering(rows: List[Tuple[int, int, int, int, int, int, str]], batch_size: int) -> None:
+    """
+    Write (id, tree_id, lft, rgt, children_count, level, path) rows with one
+    set-based UPDATE.
+
+    Rows are staged in a temporary table in chunks and joined back by id:
+    bulk_update() would build a CASE with one branch per row for every
+    column, which gets quadratic on large rebuilds.
+    """
+    if not rows:
+        return
+    table: str = connection.ops.quote_name(NodeTree._meta.db_table)
+    with connection.cursor() as cursor:
+        cursor.execute(
+            'CREATE TEMP TABLE nodes_renumber '
+            '(id INTEGER PRIMARY KEY, tree_id INTEGER, lft INTEGER, rgt INTEGER, children_count INTEGER, '
+            'level INTEGER, path VARCHAR(1024))'
+        )
+        try:
+            for start in range(0, len(rows), batch_size):
+                cursor.executemany(
+                    'INSERT INTO nodes_renumber (id, tree_id, lft, rgt, children_count, level, path) '
+                    'VALUES (%s, %s, %s, %s, %s, %s, %s)',
+                    rows[start:start + batch_size]
+                )
+            cursor.execute(
+                f'UPDATE {table} SET tree_id = r.tree_id, lft = r.lft, rgt = r.rgt, children_count = r.children_count, '
+                f'level = r.level, path = r.path '
+                f'FROM nodes_renumber AS r WHERE {table}.id = r.id'
+            )
+        finally:
+            cursor.execute('DROP TABLE nodes_renumber')
+
+
+def move_among_siblings(node: NodeTree, sibling: NodeTree, position: str) -> NodeTree:
+    """
+    Move `node` right before or after `sibling` ('before' or 'after').
+
+    Only the intervals between the two positions change: the node's
+    subtree and the siblings it jumps over swap places with a single
+    UPDATE. Returns the node with its new lft/rgt.
+    """
+    width: int = node.rgt - node.lft + 1
+    # Where the node's subtree should start, in the current numbering
+    target: int = sibling.lft if position == 'before' else sibling.rgt + 1
+
+    if target < node.lft:
+        low, high = target, node.rgt
+        node_shift, others_shift = target - node.lft, width
+    elif target > node.rgt + 1:
+        low, high = node.lft, target - 1
+        node_shift, others_shift = target - 1 - node.rgt, -width
+    else:
+        return node
+
+    in_subtree = Q(lft__gte=node.lft, lft__lte=node.rgt)
+    with transaction.atomic():
+        node.tree_nodes().filter(lft__gte=low, rgt__lte=high).update(
+            lft=Case(When(in_subtree, then=F('lft') + node_shift), default=F('lft') + others_shift),
+            rgt=Case(When(in_subtree, then=F('rgt') + node_shift), default=F('rgt') + others_shift),
+        )
+        node.refresh_from_db(fields=['lft', 'rgt'])
+        record_change(
+            NodeChange.MOVED, node.id,
+            position=position, sibling_id=sibling.id, tree_id=node.tree_id, lft=node.lft, rgt=node.rgt
+        )
+        bump_tree_version()
+    return node
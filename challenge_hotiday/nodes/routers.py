@@ -0,0 +1,128 @@
+"""
+Read/write routing of the nodes app between the primary database and
+read replicas.
+
+Reads go to a random replica from NODES_READ_REPLICAS, writes to the
+primary. Reads stay on the primary inside transactions, for the rest of
+a request after it wrote, and for NODES_REPLICA_PIN_SECONDS after it
+(through a cookie), so clients always read their own writes despite the
+replication lag.
+"""
+import random
+from contextvars import ContextVar
+from typing import Callable, List, Optional, Tuple
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, connections
+from django.http import HttpRequest, HttpResponse
+
+
+PIN_COOKIE = 'nodes_primary'
+
+# Whether the client wrote recently (pin cookie), and whether the current
+# request wrote
+_pinned: ContextVar[bool] = ContextVar('nodes_pinned', default=False)
+_wrote: ContextVar[bool] = ContextVar('nodes_wrote', default=False)
+
+
+def read_replicas() -> List[str]:
+    return list(getattr(settings, 'NODES_READ_REPLICAS', []))
+
+
+def pin_to_primary() -> None:
+    """Send the next reads of the current request (and client) to the primary"""
+    _wrote.set(True)
+
+
+def is_pinned() -> bool:
+    return _pinned.get() or _wrote.get()
+
+
+def reads_from_primary() -> bool:
+    """
+    Whether reads of the nodes app go to the primary right now. Only their
+    results may be cached: a replica can lag behind the tree version.
+    """
+    return not read_replicas() or is_pinned() or connections[DEFAULT_DB_ALIAS].in_atomic_block
+
+
+class NodesReplicaRouter:
+    """Database router for the nodes app (see the module docstring)"""
+
+    app_label = 'nodes'
+
+    def db_for_read(self, model, **hints) -> Optional[str]:
+        if model._meta.app_label != self.app_label:
+            return None
+        if reads_from_primary():
+            return DEFAULT_DB_ALIAS
+        return random.choice(read_replicas())
+
+    def db_for_write(self, model, **hints) -> Optional[str]:
+        if model._meta.app_label != self.app_label:
+            return None
+        pin_to_primary()
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints) -> Optional[bool]:
+        # Replicas hold the same rows as the primary
+        databases = {DEFAULT_DB_ALIAS, *read_replicas()}
+        if obj1._state.db in databases and obj2._state.db in databases:
+            return True
+        return None
+
+    def allow_migrate(self, db: str, app_label: str, model_name: Optional[str] = None, **hints) -> Optional[bool]:
+        # Replicas get their schema from the primary
+        if db in read_replicas():
+            return False
+        return None
+
+
+class NodesReplicaMiddleware:
+    """
+    Pins a client's reads to the primary during and for a while after its
+    writes. Requests that don't write are left on the replicas.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response: Callable) -> None:
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request: HttpRequest):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        tokens = self._start(request)
+        try:
+            return self._finish(request, self.get_response(request))
+        finally:
+            self._end(tokens)
+
+    async def __acall__(self, request: HttpRequest) -> HttpResponse:
+        tokens = self._start(request)
+        try:
+            return self._finish(request, await self.get_response(request))
+        finally:
+            self._end(tokens)
+
+    def _start(self, request: HttpRequest) -> Tuple:
+        return _pinned.set(PIN_COOKIE in request.COOKIES), _wrote.set(False)
+
+    def _finish(self, request: HttpRequest, response: HttpResponse) -> HttpResponse:
+        # Writes done by other threads (e.g. write batching) don't go
+        # through this request's router calls: unsafe methods pin too
+        wrote: bool = _wrote.get() or request.method not in ('GET', 'HEAD', 'OPTIONS')
+        if wrote and read_replicas():
+            response.set_cookie(
+                PIN_COOKIE, '1',
+                max_age=getattr(settings, 'NODES_REPLICA_PIN_SECONDS', 5),
+                httponly=True, samesite='Lax'
+            )
+        return response
+
+    def _end(self, tokens: Tuple) -> None:
+        _pinned.reset(tokens[0])
+        _wrote.reset(tokens[1])
@@ -0,0 +1,28 @@
+from functools import partial
+
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from .cache import tree_version_bumped
+from .models import NodeTree, NodeTreeNames, node_names_cache
+from .warmer import cache_warmer, response_cache_enabled
+
+
+@receiver([post_save, post_delete], sender=NodeTreeNames)
+def invalidate_node_name(sender, instance: NodeTreeNames, **kwargs) -> None:
+    # A name change may also change the fallback of other languages. Dropped
+    # on commit, so a read before it can't cache the old name again
+    transaction.on_commit(partial(node_names_cache.invalidate, [instance.nodeTree_id]))
+
+
+@receiver([post_save, post_delete], sender=NodeTree)
+def invalidate_node(sender, instance: NodeTree, **kwargs) -> None:
+    # The id is taken now, deletes clear it before the commit
+    transaction.on_commit(partial(node_names_cache.invalidate, [instance.id]))
+
+
+@receiver(tree_version_bumped)
+def warm_rendered_responses(sender, version: int, **kwargs) -> None:
+    if response_cache_enabled():
+        cache_warmer.schedule()
@@ -0,0 +1,118 @@
+"""
+Subtree aggregate statistics, computed in SQL over the lft/rgt ranges
+and cached per tree version.
+"""
+from typing import Any, Dict, List
+
+from django.core.cache import cache
+from django.db.models import Case, Count, F, IntegerField, Max, OuterRef, Subquery, Value, When
+from django.db.models.functions import Coalesce
+
+from .cache import get_tree_version
+from .models import NodeTree, NodeTreeNames
+from .routers import reads_from_primary
+
+
+STATS_CACHE_TIMEOUT: int = 3600
+
+# Name counts are grouped with one CASE branch per node, keep it small
+NAMES_BATCH_SIZE: int = 200
+
+
+def _descendants():
+    """Descendants of the outer query's node"""
+    return NodeTree.objects.filter(
+        tree_id=OuterRef('tree_id'), lft__gt=OuterRef('lft'), rgt__lt=OuterRef('rgt')
+    ).order_by()
+
+
+def compute_subtree_stats(nodes: List[NodeTree]) -> Dict[int, Dict[str, Any]]:
+    """
+    Compute the statistics of each node's subtree:
+    - descendant_count: nodes below the node
+    - leaf_count: leaves below the node (rgt = lft + 1)
+    - max_depth: levels below the node (0 for a leaf)
+    - names: number of names per language in the subtree, node included
+    """
+    if not nodes:
+        return {}
+    node_ids: List[int] = [node.id for node in nodes]
+
+    leaf_count = Subquery(
+        _descendants().filter(rgt=F('lft') + 1)
+        .annotate(group=Value(1)).values('group')
+        .annotate(count=Count('id')).values('count'),
+        output_field=IntegerField()
+    )
+    max_level = Subquery(
+        _descendants().annotate(group=Value(1)).values('group')
+        .annotate(max_level=Max('level')).values('max_level'),
+        output_field=IntegerField()
+    )
+    rows = NodeTree.objects.filter(id__in=node_ids).annotate(
+        leaf_count=Coalesce(leaf_count, 0),
+        max_level=Coalesce(max_level, F('level')),
+    ).values_list('id', 'lft', 'rgt', 'level', 'leaf_count', 'max_level')
+
+    stats: Dict[int, Dict[str, Any]] = {}
+    for node_id, lft, rgt, level, leaves, max_level in rows:
+        stats[node_id] = {
+            'node_id': node_id,
+            'descendant_count': (rgt - lft - 1) // 2,
+            'leaf_count': leaves,
+            'max_depth': max_level - level,
+            'names': {},
+        }
+
+    # Names per language, mapping every name to the subtree it falls in
+    for start in range(0, len(nodes), NAMES_BATCH_SIZE):
+        batch: List[NodeTree] = nodes[start:start + NAMES_BATCH_SIZE]
+        owner = Case(
+            *[
+                When(
+                    nodeTree__tree_id=node.tree_id, nodeTree__lft__gte=node.lft, nodeTree__lft__lte=node.rgt,
+                    then=Value(node.id)
+                )
+                for node in batch
+            ],
+            output_field=IntegerField()
+        )
+        name_rows = (
+            NodeTreeNames.objects
+            .filter(
+                nodeTree__tree_id__in={node.tree_id for node in batch},
+                nodeTree__lft__gte=min(node.lft for node in batch),
+                nodeTree__lft__lte=max(node.rgt for node in batch)
+            )
+            .annotate(owner=owner)
+            .filter(owner__isnull=False)
+            .values('owner', 'language')
+            .annotate(count=Count('id'))
+            .order_by()
+        )
+        for row in name_rows:
+            stats[row['owner']]['names'][row['language']] = row['count']
+
+    return stats
+
+
+def get_subtree_stats(nodes: List[NodeTree]) -> Dict[int, Dict[str, Any]]:
+    """
+    Subtree statistics of the given nodes, from the cache when the tree
+    hasn't changed since they were computed. Statistics computed on a
+    replica aren't cached, it may not have the current version yet.
+    """
+    version: int = get_tree_version()
+    keys: Dict[int, str] = {node.id: f'nodes:stats:{version}:{node.id}' for node in nodes}
+    cached: Dict[str, Any] = cache.get_many(keys.values())
+
+    stats: Dict[int, Dict[str, Any]] = {
+        node_id: cached[key] for node_id, key in keys.items() if key in cached
+    }
+    missing: List[NodeTree] = [node for node in nodes if node.id not in stats]
+    if missing:
+        computed = compute_subtree_stats(missing)
+        if reads_from_primary():
+            cache.set_many({keys[node_id]: value for node_id, value in computed.items()}, STATS_CACHE_TIMEOUT)
+        stats.update(computed)
+    return stats
@@ -1,7 +1,10 @@
-from django.test import TestCase, RequestFactory
+from django.test import TestCase, TransactionTestCase, RequestFactory, override_settings
+from django.db import connection
+from django.http import JsonResponse
 from .models import NodeTree, NodeTreeNames
-from typing import Dict, Any, List
+from typing import Dict, Any, List, Optional
 import json
+import time
 
 
 class NodeTreeModelTest(TestCase):
@@ -92,6 +95,31 @@ class ListAllNodesViewTest(TestCase):
         
         self.assertEqual(len(data['data']['nodes']), 1)
         self.assertEqual(data['data']['pagination']['total_pages'], 2)
+    
+    def test_list_all_nodes_columnar_format(self) -> None:
+        # Test columnar format returns one array per field
+        from .views import list_all_nodes
+        
+        request = self.factory.get('/api/nodes/', {'format': 'columnar'})
+        response: JsonResponse = list_all_nodes(request)
+        
+        self.assertEqual(response.status_code, 200)
+        data: Dict[str, Any] = json.loads(response.content)
+        
+        nodes: Dict[str, List[Any]] = data['data']['nodes']
+        self.assertEqual(data['data']['format'], 'columnar')
+        self.assertEqual(sorted(nodes['name']), ['Child', 'Root'])
+        self.assertEqual(len(nodes['id']), 2)
+        self.assertEqual(len(nodes['is_leaf']), 2)
+    
+    def test_list_all_nodes_invalid_format(self) -> None:
+        # Test unknown format is rejected
+        from .views import list_all_nodes
+        
+        request = self.factory.get('/api/nodes/', {'format': 'xml'})
+        response: JsonResponse = list_all_nodes(request)
+        
+        self.assertEqual(response.status_code, 400)
 
 
 class GetNodeViewTest(TestCase):
@@ -252,3 +280,1188 @@ class CreateNodeViewTest(TestCase):
         
         self.assertEqual(response_data['status'], 'success')
         self.assertEqual(response_data['data']['names'][0]['name'], 'New Child')
+
+
+class CompressionMiddlewareTest(TestCase):
+    """Test cases for the node API compression middleware"""
+    
+    def setUp(self) -> None:
+        # Set up enough nodes to exceed the size threshold
+        for index in range(20):
+            node: NodeTree = NodeTree.objects.create(
+                lft=index * 2 + 1, rgt=index * 2 + 2, children_count=0
+            )
+            NodeTreeNames.objects.create(
+                nodeTree=node, language='en', nodeName=f'Department {index}'
+            )
+    
+    @override_settings(NODES_COMPRESSION_MIN_SIZE=200)
+    def test_large_response_is_gzipped(self) -> None:
+        # Test response above the threshold is compressed
+        import gzip
+        
+        response = self.client.get(
+            '/api/nodes/', {'page_size': '20'}, HTTP_ACCEPT_ENCODING='gzip'
+        )
+        
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response['Content-Encoding'], 'gzip')
+        self.assertIn('Accept-Encoding', response['Vary'])
+        data: Dict[str, Any] = json.loads(gzip.decompress(response.content))
+        self.assertEqual(len(data['data']['nodes']), 20)
+    
+    @override_settings(NODES_COMPRESSION_MIN_SIZE=100000)
+    def test_small_response_is_not_compressed(self) -> None:
+        # Test response below the threshold is sent as is
+        response = self.client.get('/api/nodes/', HTTP_ACCEPT_ENCODING='gzip')
+        
+        self.assertEqual(response.status_code, 200)
+        self.assertFalse(response.has_header('Content-Encoding'))
+    
+    def test_choose_encoding(self) -> None:
+        # Test Accept-Encoding negotiation
+        from .middleware import choose_encoding
+        
+        self.assertEqual(choose_encoding('gzip, deflate'), 'gzip')
+        self.assertIsNone(choose_encoding('identity'))
+        self.assertIsNone(choose_encoding('gzip;q=0'))
+
+
+class CheckTreeTest(TestCase):
+    """Test cases for the Nested Set integrity check and repair"""
+    
+    def setUp(self) -> None:
+        # Set up a consistent tree: root -> (child1 -> grandchild), child2
+        self.root: NodeTree = NodeTree.objects.create(
+            lft=1, rgt=8, children_count=2
+        )
+        self.child1: NodeTree = NodeTree.objects.create(
+            lft=2, rgt=5, children_count=1, parent=self.root, level=1,
+            path=self.root.descendant_path
+        )
+        self.grandchild: NodeTree = NodeTree.objects.create(
+            lft=3, rgt=4, children_count=0, parent=self.child1, level=2,
+            path=self.child1.descendant_path
+        )
+        self.child2: NodeTree = NodeTree.objects.create(
+            lft=6, rgt=7, children_count=0, parent=self.root, level=1,
+            path=self.root.descendant_path
+        )
+        NodeTree.objects.update(tree_id=self.root.id)
+    
+    def test_consistent_tree_has_no_problems(self) -> None:
+        # Test a valid tree passes the check
+        from .nested_set import iter_tree_problems
+        
+        self.assertEqual(list(iter_tree_problems()), [])
+    
+    def test_detects_wrong_intervals_and_counts(self) -> None:
+        # Test broken intervals and children counts are reported
+        from .nested_set import iter_tree_problems
+        
+        NodeTree.objects.filter(id=self.child2.id).update(lft=4, rgt=7)
+        NodeTree.objects.filter(id=self.root.id).update(children_count=5)
+        
+        problems: List[Any] = list(iter_tree_problems())
+        problem_ids = {node_id for node_id, _ in problems}
+        self.assertIn(self.child2.id, problem_ids)
+        self.assertIn(self.root.id, problem_ids)
+    
+    def test_repair_rebuilds_from_parents(self) -> None:
+        # Test --repair renumbers the tree from the parent relationships
+        from django.core.management import call_command
+        from django.core.management.base import CommandError
+        from io import StringIO
+        
+        NodeTree.objects.filter(id=self.grandchild.id).update(lft=10, rgt=11)
+        NodeTree.objects.filter(id=self.child1.id).update(children_count=0)
+        
+        with self.assertRaises(CommandError):
+            call_command('check_tree', stdout=StringIO())
+        
+        call_command('check_tree', '--repair', stdout=StringIO())
+        
+        self.grandchild.refresh_from_db()
+        self.child1.refresh_from_db()
+        self.assertEqual((self.grandchild.lft, self.grandchild.rgt), (3, 4))
+        self.assertEqual(self.child1.children_count, 1)
+
+
+class RebuildTreeTest(TestCase):
+    """Test cases for rebuilding the Nested Set from parent relationships"""
+    
+    def test_generated_tree_is_consistent(self) -> None:
+        # Test generated trees are valid Nested Sets
+        from .generators import generate_tree
+        from .nested_set import iter_tree_problems
+        
+        root: NodeTree = generate_tree(50, fanout=3, languages=['en'])
+        
+        self.assertEqual((root.lft, root.rgt), (1, 100))
+        self.assertEqual(NodeTreeNames.objects.count(), 50)
+        self.assertEqual(list(iter_tree_problems()), [])
+    
+    def test_rebuild_tree_command(self) -> None:
+        # Test the command renumbers a scrambled tree
+        from django.core.management import call_command
+        from io import StringIO
+        from .generators import generate_tree
+        from .nested_set import iter_tree_problems
+        
+        generate_tree(30, fanout=2, languages=['en'])
+        NodeTree.objects.filter(id__in=list(NodeTree.objects.values_list('id', flat=True)[5:10])).update(lft=1000, rgt=1001)
+        self.assertNotEqual(list(iter_tree_problems()), [])
+        
+        out = StringIO()
+        call_command('rebuild_tree', '--batch-size', '7', stdout=out)
+        
+        self.assertIn('30 nodes', out.getvalue())
+        self.assertEqual(list(iter_tree_problems()), [])
+
+
+class NodeNameCacheTest(TestCase):
+    """Test cases for the node name cache"""
+    
+    def setUp(self) -> None:
+        # Set up nodes with names in different languages
+        from .models import node_names_cache
+        node_names_cache.clear()
+        
+        self.node1: NodeTree = NodeTree.objects.create(lft=1, rgt=2, children_count=0)
+        self.node2: NodeTree = NodeTree.objects.create(lft=3, rgt=4, children_count=0)
+        NodeTreeNames.objects.create(nodeTree=self.node1, language='en', nodeName='Sales')
+        NodeTreeNames.objects.create(nodeTree=self.node1, language='it', nodeName='Vendite')
+        NodeTreeNames.objects.create(nodeTree=self.node2, language='en', nodeName='Legal')
+    
+    def test_get_node_names_single_query(self) -> None:
+        # Test batch lookup with fallback in one query, then from cache
+        from .cache import get_tree_version, tree_version_scope
+        ids: List[int] = [self.node1.id, self.node2.id, 999]
+        
+        with tree_version_scope():
+            get_tree_version()
+            with self.assertNumQueries(1):
+                names: Dict[int, str] = NodeTreeNames.get_node_names(ids, 'it')
+            self.assertEqual(names, {self.node1.id: 'Vendite', self.node2.id: 'Legal', 999: 'Node 999'})
+            
+            with self.assertNumQueries(0):
+                self.assertEqual(NodeTreeNames.get_node_name(self.node1.id, 'it'), 'Vendite')
+    
+    def test_tree_version_read_once_per_request(self) -> None:
+        # Test cached lookups of a request share one read of the tree version
+        from .cache import TreeVersionMiddleware
+        
+        def view(request) -> JsonResponse:
+            names: List[str] = [NodeTreeNames.get_node_name(self.node1.id, 'it') for _ in range(3)]
+            return JsonResponse({'status': 'success', 'data': names})
+        
+        middleware = TreeVersionMiddleware(view)
+        middleware(RequestFactory().get('/'))
+        with self.assertNumQueries(1):
+            response: JsonResponse = middleware(RequestFactory().get('/'))
+        self.assertEqual(json.loads(response.content)['data'], ['Vendite'] * 3)
+    
+    def test_cache_invalidated_on_name_change(self) -> None:
+        # Test saving a name invalidates the cached fallback
+        self.assertEqual(NodeTreeNames.get_node_name(self.node2.id, 'it'), 'Legal')
+        
+        with self.captureOnCommitCallbacks() as callbacks:
+            NodeTreeNames.objects.create(nodeTree=self.node2, language='it', nodeName='Legale')
+            # Not before the commit, when other transactions still see the old name
+            self.assertEqual(NodeTreeNames.get_node_name(self.node2.id, 'it'), 'Legal')
+        for callback in callbacks:
+            callback()
+        
+        self.assertEqual(NodeTreeNames.get_node_name(self.node2.id, 'it'), 'Legale')
+    
+    def test_cache_follows_tree_version(self) -> None:
+        # Test a version bump (a write in any worker) also misses the cache
+        from .cache import bump_tree_version
+        from .models import node_names_cache
+        
+        NodeTreeNames.get_node_names([self.node1.id], 'it')
+        # No signals, like a write made by another process
+        NodeTreeNames.objects.filter(nodeTree=self.node1, language='it').update(nodeName='Vendita')
+        with self.captureOnCommitCallbacks(execute=True):
+            bump_tree_version()
+        
+        self.assertEqual(NodeTreeNames.get_node_name(self.node1.id, 'it'), 'Vendita')
+        self.assertEqual(len(node_names_cache), 2)
+    
+    def test_lru_eviction(self) -> None:
+        # Test the cache keeps at most max_size entries
+        from .cache import NodeNameCache
+        
+        cache = NodeNameCache(max_size=2)
+        cache.set_many({1: 'a', 2: 'b'}, 'en')
+        cache.get_many([1], 'en')
+        cache.set_many({3: 'c'}, 'en')
+        
+        found, missing = cache.get_many([1, 2, 3], 'en')
+        self.assertEqual(found, {1: 'a', 3: 'c'})
+        self.assertEqual(missing, [2])
+
+
+class ReorderNodeViewTest(TestCase):
+    """Test cases for reorder_node view"""
+    
+    def setUp(self) -> None:
+        # Set up root with children a (with child a1), b and c
+        self.factory: RequestFactory = RequestFactory()
+        
+        self.root: NodeTree = NodeTree.objects.create(lft=1, rgt=10, children_count=3)
+        self.a: NodeTree = NodeTree.objects.create(
+            lft=2, rgt=5, children_count=1, parent=self.root, level=1,
+            path=self.root.descendant_path
+        )
+        self.a1: NodeTree = NodeTree.objects.create(
+            lft=3, rgt=4, children_count=0, parent=self.a, level=2,
+            path=self.a.descendant_path
+        )
+        self.b: NodeTree = NodeTree.objects.create(
+            lft=6, rgt=7, children_count=0, parent=self.root, level=1,
+            path=self.root.descendant_path
+        )
+        self.c: NodeTree = NodeTree.objects.create(
+            lft=8, rgt=9, children_count=0, parent=self.root, level=1,
+            path=self.root.descendant_path
+        )
+        NodeTree.objects.update(tree_id=self.root.id)
+    
+    def _reorder(self, node_id: int, body: Dict[str, Any]) -> JsonResponse:
+        from .views import reorder_node
+        
+        request = self.factory.post(
+            f'/api/nodes/{node_id}/reorder/',
+            json.dumps(body),
+            content_type='application/json'
+        )
+        return reorder_node(request, node_id)
+    
+    def _order(self) -> List[int]:
+        return list(NodeTree.objects.filter(parent=self.root).order_by('lft').values_list('id', flat=True))
+    
+    def test_move_subtree_after_sibling(self) -> None:
+        # Test moving a subtree to the right keeps the tree consistent
+        from .nested_set import iter_tree_problems
+        
+        response: JsonResponse = self._reorder(self.a.id, {'after': self.c.id})
+        
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(self._order(), [self.b.id, self.c.id, self.a.id])
+        self.a1.refresh_from_db()
+        self.assertEqual((self.a1.lft, self.a1.rgt), (7, 8))
+        self.assertEqual(list(iter_tree_problems()), [])
+    
+    def test_move_before_sibling_only_touches_range(self) -> None:
+        # Test moving to the left leaves nodes outside the range untouched
+        from .nested_set import iter_tree_problems
+        
+        response: JsonResponse = self._reorder(self.c.id, {'before': self.b.id})
+        
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(self._order(), [self.a.id, self.c.id, self.b.id])
+        self.a1.refresh_from_db()
+        self.assertEqual((self.a1.lft, self.a1.rgt), (3, 4))
+        self.assertEqual(list(iter_tree_problems()), [])
+    
+    def test_reorder_requires_sibling(self) -> None:
+        # Test nodes can't be moved next to a non-sibling
+        response: JsonResponse = self._reorder(self.a1.id, {'before': self.b.id})
+        
+        self.assertEqual(response.status_code, 400)
+
+
+class BulkUpsertNamesViewTest(TestCase):
+    """Test cases for bulk_upsert_names view"""
+    
+    def setUp(self) -> None:
+        # Set up a node with an English name
+        self.factory: RequestFactory = RequestFactory()
+        
+        self.node: NodeTree = NodeTree.objects.create(lft=1, rgt=2, children_count=0)
+        NodeTreeNames.objects.create(nodeTree=self.node, language='en', nodeName='Company')
+    
+    def test_bulk_upsert_json(self) -> None:
+        # Test inserting, updating and reporting invalid rows
+        from .views import bulk_upsert_names
+        
+        self.assertEqual(NodeTreeNames.get_node_name(self.node.id, 'de'), 'Company')
+        
+        body: Dict[str, Any] = {'names': [
+            {'node_id': self.node.id, 'language': 'de', 'name': 'Firma'},
+            {'node_id': self.node.id, 'language': 'en', 'name': 'Company Ltd'},
+            {'node_id': 999, 'language': 'de', 'name': 'Missing'},
+            {'node_id': self.node.id, 'language': 'fr'},
+        ]}
+        request = self.factory.post('/api/nodes/names/bulk/', json.dumps(body), content_type='application/json')
+        with self.captureOnCommitCallbacks(execute=True):
+            response: JsonResponse = bulk_upsert_names(request)
+        
+        self.assertEqual(response.status_code, 200)
+        data: Dict[str, Any] = json.loads(response.content)['data']
+        self.assertEqual(data['upserted'], 2)
+        self.assertEqual([error['row'] for error in data['errors']], [2, 3])
+        self.assertEqual(NodeTreeNames.get_node_name(self.node.id, 'de'), 'Firma')
+        self.assertEqual(NodeTreeNames.get_node_name(self.node.id, 'en'), 'Company Ltd')
+    
+    def test_bulk_upsert_csv(self) -> None:
+        # Test CSV input
+        from .views import bulk_upsert_names
+        
+        body: str = f'node_id,language,name\n{self.node.id},fr,Entreprise\n'
+        request = self.factory.post('/api/nodes/names/bulk/', body, content_type='text/csv')
+        response: JsonResponse = bulk_upsert_names(request)
+        
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(NodeTreeNames.objects.get(nodeTree=self.node, language='fr').nodeName, 'Entreprise')
+
+
+class NodeStatsViewTest(TestCase):
+    """Test cases for node_stats and children_stats views"""
+    
+    def setUp(self) -> None:
+        # Set up root -> (a -> (a1, a2), b)
+        self.factory: RequestFactory = RequestFactory()
+        
+        self.root: NodeTree = NodeTree.objects.create(lft=1, rgt=10, children_count=2)
+        self.a: NodeTree = NodeTree.objects.create(
+            lft=2, rgt=7, children_count=2, parent=self.root, level=1,
+            path=self.root.descendant_path
+        )
+        self.a1: NodeTree = NodeTree.objects.create(
+            lft=3, rgt=4, children_count=0, parent=self.a, level=2,
+            path=self.a.descendant_path
+        )
+        self.a2: NodeTree = NodeTree.objects.create(
+            lft=5, rgt=6, children_count=0, parent=self.a, level=2,
+            path=self.a.descendant_path
+        )
+        self.b: NodeTree = NodeTree.objects.create(
+            lft=8, rgt=9, children_count=0, parent=self.root, level=1,
+            path=self.root.descendant_path
+        )
+        for node in (self.root, self.a, self.a1, self.a2, self.b):
+            NodeTreeNames.objects.create(nodeTree=node, language='en', nodeName=f'Node {node.lft}')
+        NodeTreeNames.objects.create(nodeTree=self.a1, language='it', nodeName='Nodo')
+        NodeTree.objects.update(tree_id=self.root.id)
+    
+    def test_node_stats(self) -> None:
+        # Test aggregates over the subtree
+        from .views import node_stats
+        
+        request = self.factory.get(f'/api/nodes/{self.root.id}/stats/')
+        response: JsonResponse = node_stats(request, self.root.id)
+        
+        self.assertEqual(response.status_code, 200)
+        data: Dict[str, Any] = json.loads(response.content)['data']
+        self.assertEqual(data['descendant_count'], 4)
+        self.assertEqual(data['leaf_count'], 3)
+        self.assertEqual(data['max_depth'], 2)
+        self.assertEqual(data['names'], {'en': 5, 'it': 1})
+    
+    def test_children_stats(self) -> None:
+        # Test batch statistics for all children
+        from .views import children_stats
+        
+        request = self.factory.get(f'/api/nodes/{self.root.id}/children/stats/')
+        response: JsonResponse = children_stats(request, self.root.id)
+        
+        self.assertEqual(response.status_code, 200)
+        children: List[Dict[str, Any]] = json.loads(response.content)['data']['children']
+        self.assertEqual([child['node_id'] for child in children], [self.a.id, self.b.id])
+        self.assertEqual(children[0]['leaf_count'], 2)
+        self.assertEqual(children[0]['names'], {'en': 3, 'it': 1})
+        self.assertEqual(children[1]['max_depth'], 0)
+    
+    def test_stats_cached_until_tree_changes(self) -> None:
+        # Test cached stats are reused until the tree version changes
+        from .cache import bump_tree_version
+        from .stats import get_subtree_stats
+        
+        from .cache import tree_version_scope
+        
+        with tree_version_scope():
+            get_subtree_stats([self.root])
+            # One lookup in the (database) cache
+            with self.assertNumQueries(1):
+                get_subtree_stats([self.root])
+            
+            with self.captureOnCommitCallbacks(execute=True):
+                bump_tree_version()
+            # The lookup, the two aggregate queries, and the database cache
+            # storing them (count, savepoint, select, insert, release)
+            with self.assertNumQueries(8):
+                get_subtree_stats([self.root])
+
+
+class MaterializedPathTest(TestCase):
+    """Test cases for the materialized path hierarchy index"""
+    
+    def setUp(self) -> None:
+        # Set up a tree through create_node so the path is maintained by it
+        from .views import create_node
+        
+        self.factory: RequestFactory = RequestFactory()
+        self.ids: List[int] = []
+        parent_id = None
+        for name in ('Company', 'Sales', 'Europe'):
+            body: Dict[str, Any] = {'parent_id': parent_id, 'names': {'en': name}}
+            request = self.factory.post('/api/nodes/create/', json.dumps(body), content_type='application/json')
+            parent_id = json.loads(create_node(request).content)['data']['node_id']
+            self.ids.append(parent_id)
+    
+    def test_path_queries(self) -> None:
+        # Test ancestor, descendant and is-descendant-of checks from the path
+        nodes: Dict[int, NodeTree] = NodeTree.objects.in_bulk(self.ids)
+        root, sales, europe = [nodes[node_id] for node_id in self.ids]
+        
+        self.assertEqual(europe.path, f'/{root.id}/{sales.id}/')
+        self.assertEqual(europe.ancestor_ids, [root.id, sales.id])
+        self.assertTrue(europe.is_descendant_of(root))
+        self.assertFalse(root.is_descendant_of(europe))
+        self.assertEqual(set(root.descendants().values_list('id', flat=True)), {sales.id, europe.id})
+    
+    def test_node_ancestors_view(self) -> None:
+        # Test the ancestors endpoint returns the chain from the root
+        from .views import node_ancestors
+        
+        request = self.factory.get(f'/api/nodes/{self.ids[2]}/ancestors/')
+        response: JsonResponse = node_ancestors(request, self.ids[2])
+        
+        self.assertEqual(response.status_code, 200)
+        ancestors: List[Dict[str, Any]] = json.loads(response.content)['data']['ancestors']
+        self.assertEqual([node['name'] for node in ancestors], ['Company', 'Sales'])
+
+
+class ChangeFeedTest(TestCase):
+    """Test cases for the incremental change feed"""
+    
+    def setUp(self) -> None:
+        self.factory: RequestFactory = RequestFactory()
+    
+    def _create(self, parent_id: Optional[int], name: str) -> int:
+        from .views import create_node
+        
+        body: Dict[str, Any] = {'parent_id': parent_id, 'names': {'en': name}}
+        request = self.factory.post('/api/nodes/create/', json.dumps(body), content_type='application/json')
+        return json.loads(create_node(request).content)['data']['node_id']
+    
+    def _changes(self, **params: Any) -> Dict[str, Any]:
+        from .views import list_changes
+        
+        response: JsonResponse = list_changes(self.factory.get('/api/nodes/changes/', params))
+        self.assertEqual(response.status_code, 200)
+        return json.loads(response.content)['data']
+    
+    def test_mutations_are_logged_in_order(self) -> None:
+        # Test create, move and rename append changes with increasing seq
+        from .names import upsert_node_names
+        from .nested_set import move_among_siblings
+        
+        root_id = self._create(None, 'Company')
+        first_id = self._create(root_id, 'Sales')
+        second_id = self._create(root_id, 'Legal')
+        move_among_siblings(NodeTree.objects.get(id=second_id), NodeTree.objects.get(id=first_id), 'before')
+        upsert_node_names([{'node_id': first_id, 'language': 'it', 'name': 'Vendite'}])
+        
+        data: Dict[str, Any] = self._changes()
+        changes: List[Dict[str, Any]] = data['changes']
+        self.assertEqual(
+            [(change['action'], change['node_id']) for change in changes],
+            [('created', root_id), ('created', first_id), ('created', second_id),
+             ('moved', second_id), ('renamed', first_id)]
+        )
+        self.assertEqual([change['seq'] for change in changes], sorted(change['seq'] for change in changes))
+        self.assertEqual(changes[1]['data']['parent_id'], root_id)
+        self.assertEqual(changes[4]['data']['name'], 'Vendite')
+        self.assertEqual(data['last_seq'], changes[-1]['seq'])
+        self.assertFalse(data['has_more'])
+    
+    def test_since_and_limit(self) -> None:
+        # Test polling from a sequence number in batches
+        for index in range(3):
+            self._create(None, f'Root {index}')
+        
+        first: Dict[str, Any] = self._changes(limit=2)
+        self.assertEqual(len(first['changes']), 2)
+        self.assertTrue(first['has_more'])
+        
+        rest: Dict[str, Any] = self._changes(since=first['last_seq'], limit=2)
+        self.assertEqual(len(rest['changes']), 1)
+        self.assertFalse(rest['has_more'])
+        
+        empty: Dict[str, Any] = self._changes(since=rest['last_seq'])
+        self.assertEqual(empty['changes'], [])
+        self.assertEqual(empty['last_seq'], rest['last_seq'])
+    
+    def test_invalid_since(self) -> None:
+        # Test invalid parameters are rejected
+        from .views import list_changes
+        
+        response: JsonResponse = list_changes(self.factory.get('/api/nodes/changes/', {'since': 'abc'}))
+        self.assertEqual(response.status_code, 400)
+
+
+class EventStreamTest(TestCase):
+    """Test cases for the Server-Sent Events stream"""
+    
+    def setUp(self) -> None:
+        self.root: NodeTree = NodeTree.objects.create(lft=1, rgt=6, children_count=2)
+        self.sales: NodeTree = NodeTree.objects.create(
+            lft=2, rgt=3, children_count=0, parent=self.root, level=1,
+            path=self.root.descendant_path
+        )
+        self.legal: NodeTree = NodeTree.objects.create(
+            lft=4, rgt=5, children_count=0, parent=self.root, level=1,
+            path=self.root.descendant_path
+        )
+        NodeTree.objects.update(tree_id=self.root.id)
+    
+    async def _open(self, **params: Any):
+        from django.test import AsyncRequestFactory
+        from .views import stream_events
+        
+        response = await stream_events(AsyncRequestFactory().get('/api/nodes/events/', params))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response['Content-Type'], 'text/event-stream')
+        stream = response.streaming_content
+        self.assertEqual(await anext(stream), b'retry: 3000\n\n')
+        return stream
+    
+    async def _next_event(self, stream) -> str:
+        import asyncio
+        return (await asyncio.wait_for(anext(stream), 1)).decode()
+    
+    def _create(self, parent_id: int, name: str) -> int:
+        # Runs on the test's database connection thread, where the commit
+        # callbacks that publish the events are captured
+        from .views import create_node
+        
+        body: Dict[str, Any] = {'parent_id': parent_id, 'names': {'en': name}}
+        request = RequestFactory().post('/api/nodes/create/', json.dumps(body), content_type='application/json')
+        with self.captureOnCommitCallbacks(execute=True):
+            return json.loads(create_node(request).content)['data']['node_id']
+    
+    async def test_created_node_is_pushed(self) -> None:
+        # Test a node created through the API reaches subscribers once committed
+        from asgiref.sync import sync_to_async
+        
+        stream = await self._open()
+        node_id: int = await sync_to_async(self._create)(self.root.id, 'Marketing')
+        
+        message: str = await self._next_event(stream)
+        self.assertIn('event: node-created\n', message)
+        event: Dict[str, Any] = json.loads(message.split('data: ', 1)[1])
+        self.assertEqual(event['node_id'], node_id)
+        self.assertEqual(event['data']['names'], {'en': 'Marketing'})
+        await stream.aclose()
+    
+    async def test_subtree_filter(self) -> None:
+        # Test only the changes inside the subscribed subtree are sent
+        from asgiref.sync import sync_to_async
+        
+        stream = await self._open(node_id=self.legal.id)
+        await sync_to_async(self._create)(self.sales.id, 'Europe')
+        legal_child: int = await sync_to_async(self._create)(self.legal.id, 'Contracts')
+        
+        # The first insert shifted Legal's range, the filter follows it
+        event: Dict[str, Any] = json.loads((await self._next_event(stream)).split('data: ', 1)[1])
+        self.assertEqual(event['node_id'], legal_child)
+        await stream.aclose()
+    
+    async def test_replay_since(self) -> None:
+        # Test logged changes after `since` are replayed on connect
+        from asgiref.sync import sync_to_async
+        
+        node_id: int = await sync_to_async(self._create)(self.root.id, 'Marketing')
+        
+        stream = await self._open(since=0)
+        self.assertIn(f'"node_id":{node_id}', await self._next_event(stream))
+        await stream.aclose()
+    
+    def test_unknown_node(self) -> None:
+        # Test subscribing to a missing subtree returns 404
+        from asgiref.sync import async_to_sync
+        from django.test import AsyncRequestFactory
+        from .views import stream_events
+        
+        request = AsyncRequestFactory().get('/api/nodes/events/', {'node_id': 9999})
+        response = async_to_sync(stream_events)(request)
+        self.assertEqual(response.status_code, 404)
+
+
+class CreateBatchingTest(TestCase):
+    """Test cases for coalesced child inserts"""
+    
+    def setUp(self) -> None:
+        # Set up root -> (child1 -> grandchild), child2
+        self.root: NodeTree = NodeTree.objects.create(lft=1, rgt=8, children_count=2)
+        self.child1: NodeTree = NodeTree.objects.create(
+            lft=2, rgt=5, children_count=1, parent=self.root, level=1,
+            path=self.root.descendant_path
+        )
+        self.grandchild: NodeTree = NodeTree.objects.create(
+            lft=3, rgt=4, children_count=0, parent=self.child1, level=2,
+            path=self.child1.descendant_path
+        )
+        self.child2: NodeTree = NodeTree.objects.create(
+            lft=6, rgt=7, children_count=0, parent=self.root, level=1,
+            path=self.root.descendant_path
+        )
+        NodeTree.objects.update(tree_id=self.root.id)
+    
+    def test_batch_matches_sequential_inserts(self) -> None:
+        # Test one batch leaves the same valid tree as inserting one by one
+        from .batching import create_nodes
+        from .nested_set import iter_tree_problems
+        
+        specs = [
+            (self.child2.id, {'en': 'A'}),
+            (self.grandchild.id, {'en': 'B'}),
+            (self.root.id, {'en': 'C', 'it': 'C'}),
+            (self.grandchild.id, {'en': 'D'}),
+        ]
+        results = create_nodes(specs)
+        
+        self.assertEqual(list(iter_tree_problems()), [])
+        intervals: Dict[str, tuple] = {
+            specs[index][1]['en']: (node.lft, node.rgt) for index, (node, _) in enumerate(results)
+        }
+        # B and D under the grandchild (in arrival order), A under child2, C last under root
+        self.assertEqual(intervals, {'B': (4, 5), 'D': (6, 7), 'A': (11, 12), 'C': (14, 15)})
+        self.root.refresh_from_db()
+        self.assertEqual((self.root.lft, self.root.rgt, self.root.children_count), (1, 16, 3))
+        self.assertEqual(NodeTreeNames.get_node_name(results[2][0].id, 'it'), 'C')
+    
+    def test_unknown_parent_fails_alone(self) -> None:
+        # Test each caller gets its own result from a shared batch
+        from concurrent.futures import Future
+        from .batching import CreateBatcher
+        
+        batch = [((self.child1.id, {'en': 'New'}), Future()), ((9999, {'en': 'Lost'}), Future())]
+        CreateBatcher().write(batch)
+        
+        node, names = batch[0][1].result()
+        self.assertEqual(node.parent_id, self.child1.id)
+        self.assertEqual(names, [{'language': 'en', 'name': 'New'}])
+        with self.assertRaises(NodeTree.DoesNotExist):
+            batch[1][1].result()
+    
+    def test_rejected_name_is_a_bad_request(self) -> None:
+        # Test a name the database rejects gives the same 400 with and without batching
+        from concurrent.futures import Future
+        from .batching import CreateBatcher
+        from .nested_set import InvalidNodeName
+        from .views import create_node
+        
+        # Enforce the column length like PostgreSQL does (SQLite doesn't)
+        with connection.cursor() as cursor:
+            cursor.execute(
+                'CREATE TRIGGER name_length BEFORE INSERT ON node_tree_names '
+                'WHEN length(NEW."nodeName") > 255 BEGIN SELECT RAISE(ABORT, \'value too long\'); END'
+            )
+        names: Dict[str, str] = {'en': 'New', 'it': 'x' * 300}
+        batch = [((self.child1.id, names), Future())]
+        CreateBatcher().write(batch)
+        with self.assertRaises(InvalidNodeName):
+            batch[0][1].result()
+        
+        body: str = json.dumps({'parent_id': self.child1.id, 'names': names})
+        response: JsonResponse = create_node(RequestFactory().post('/api/nodes/create/', body, content_type='application/json'))
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(json.loads(response.content)['message'], 'Error creating name for language it')
+        self.assertEqual(NodeTree.objects.count(), 4)
+    
+    def test_timeout_drops_queued_insert_only(self) -> None:
+        # Test a timed out insert is dropped if still queued, and waited for if being written
+        from threading import Thread
+        from .batching import CreateBatcher
+        
+        queued = CreateBatcher(timeout=0.01)
+        queued._start_writer = lambda: None
+        with self.assertRaises(TimeoutError):
+            queued.submit(self.child1.id, {'en': 'Late'})
+        _, future = queued._queue.get_nowait()
+        self.assertFalse(future.set_running_or_notify_cancel())
+        
+        writing = CreateBatcher(timeout=0.01)
+        
+        def slow_writer() -> None:
+            spec, future = writing._queue.get()
+            future.set_running_or_notify_cancel()
+            time.sleep(0.05)
+            future.set_result(('written', []))
+        
+        writing._start_writer = lambda: Thread(target=slow_writer).start()
+        self.assertEqual(writing.submit(self.child1.id, {'en': 'Slow'}), ('written', []))
+
+
+class ReplicaRoutingTest(TransactionTestCase):
+    """Test cases for read replica routing, with the 'replica' SQLite database"""
+    
+    # Not a TestCase: reads inside its transaction would stay on the primary
+    databases = {'default', 'replica'}
+    
+    def setUp(self) -> None:
+        from .routers import NodesReplicaMiddleware
+        from .views import create_node, get_node
+        
+        self.factory: RequestFactory = RequestFactory()
+        self.get_node = NodesReplicaMiddleware(lambda request: get_node(request, self.node_id))
+        self.create_node = NodesReplicaMiddleware(create_node)
+        self.node_id: int = 0
+    
+    @override_settings(NODES_READ_REPLICAS=['replica'])
+    def test_reads_go_to_replica_and_writes_to_primary(self) -> None:
+        # Test the replica serves reads until the client has written
+        body: str = json.dumps({'parent_id': None, 'names': {'en': 'Company'}})
+        response = self.create_node(self.factory.post('/api/nodes/create/', body, content_type='application/json'))
+        self.assertEqual(response.status_code, 201)
+        self.node_id = json.loads(response.content)['data']['node_id']
+        self.assertTrue(NodeTree.objects.using('default').filter(id=self.node_id).exists())
+        self.assertFalse(NodeTree.objects.using('replica').filter(id=self.node_id).exists())
+        
+        # The writer got a pin cookie: its reads see its own write on the primary
+        pin = response.cookies['nodes_primary']
+        request = self.factory.get(f'/api/nodes/{self.node_id}/')
+        request.COOKIES['nodes_primary'] = pin.value
+        self.assertEqual(self.get_node(request).status_code, 200)
+        
+        # Other clients read the replica, which hasn't caught up yet
+        self.assertEqual(self.get_node(self.factory.get(f'/api/nodes/{self.node_id}/')).status_code, 404)
+        
+        # Once replicated, the replica serves it
+        node: NodeTree = NodeTree.objects.using('default').get(id=self.node_id)
+        node.save(using='replica', force_insert=True)
+        self.assertEqual(self.get_node(self.factory.get(f'/api/nodes/{self.node_id}/')).status_code, 200)
+    
+    @override_settings(NODES_READ_REPLICAS=['replica'])
+    def test_replica_reads_are_not_cached(self) -> None:
+        # Test names and stats read from a lagging replica aren't cached
+        from django.core.cache import cache
+        from .cache import get_tree_version
+        from .models import node_names_cache
+        from .routers import _wrote
+        from .stats import get_subtree_stats
+        
+        node_names_cache.clear()
+        node: NodeTree = NodeTree.objects.using('default').create(lft=1, rgt=2, children_count=0)
+        node.save(using='replica', force_insert=True)
+        # Only on the primary: the replica lags behind
+        NodeTreeNames.objects.using('default').create(nodeTree_id=node.id, language='en', nodeName='Company')
+        # Writes of earlier tests outside a request left the thread pinned
+        self.addCleanup(_wrote.reset, _wrote.set(False))
+        
+        self.assertEqual(NodeTreeNames.get_node_name(node.id, 'en'), f'Node {node.id}')
+        self.assertEqual(len(node_names_cache), 0)
+        self.assertEqual(get_subtree_stats([node])[node.id]['names'], {})
+        self.assertIsNone(cache.get(f'nodes:stats:{get_tree_version()}:{node.id}'))
+    
+    def test_without_replicas_everything_uses_primary(self) -> None:
+        # Test the router is a no-op when no replica is configured
+        from .routers import NodesReplicaRouter
+        
+        router = NodesReplicaRouter()
+        self.assertEqual(router.db_for_read(NodeTree), 'default')
+        self.assertEqual(router.db_for_write(NodeTree), 'default')
+
+
+class ListFiltersTest(TestCase):
+    """Test cases for the max_level, root_id and leaves_only listing filters"""
+    
+    def setUp(self) -> None:
+        # Set up root -> (child1 -> grandchild), child2
+        self.factory: RequestFactory = RequestFactory()
+        self.root: NodeTree = NodeTree.objects.create(lft=1, rgt=8, children_count=2)
+        self.child1: NodeTree = NodeTree.objects.create(
+            lft=2, rgt=5, children_count=1, parent=self.root, level=1,
+            path=self.root.descendant_path
+        )
+        self.grandchild: NodeTree = NodeTree.objects.create(
+            lft=3, rgt=4, children_count=0, parent=self.child1, level=2,
+            path=self.child1.descendant_path
+        )
+        self.child2: NodeTree = NodeTree.objects.create(
+            lft=6, rgt=7, children_count=0, parent=self.root, level=1,
+            path=self.root.descendant_path
+        )
+        NodeTree.objects.update(tree_id=self.root.id)
+    
+    def _list_ids(self, **params: Any) -> List[int]:
+        from .views import list_all_nodes
+        
+        response: JsonResponse = list_all_nodes(self.factory.get('/api/nodes/', {'page_size': 100, **params}))
+        self.assertEqual(response.status_code, 200)
+        return [node['id'] for node in json.loads(response.content)['data']['nodes']]
+    
+    def test_filters(self) -> None:
+        # Test each filter alone and combined
+        self.assertEqual(self._list_ids(max_level=0), [self.root.id])
+        self.assertEqual(self._list_ids(max_level=1), [self.root.id, self.child1.id, self.child2.id])
+        self.assertEqual(self._list_ids(root_id=self.child1.id), [self.child1.id, self.grandchild.id])
+        self.assertEqual(self._list_ids(leaves_only='true'), [self.grandchild.id, self.child2.id])
+        self.assertEqual(self._list_ids(max_level=1, leaves_only='true'), [self.child2.id])
+    
+    def test_invalid_filters(self) -> None:
+        # Test unknown roots and invalid values are rejected
+        from .views import list_all_nodes
+        
+        response: JsonResponse = list_all_nodes(self.factory.get('/api/nodes/', {'root_id': 9999}))
+        self.assertEqual(response.status_code, 404)
+        response = list_all_nodes(self.factory.get('/api/nodes/', {'leaves_only': 'maybe'}))
+        self.assertEqual(response.status_code, 400)
+
+
+class ExplainQueriesTest(TestCase):
+    """Test cases for the query plan report command"""
+    
+    def test_report_covers_every_endpoint(self) -> None:
+        # Test every URL pattern is in the report and nothing is left behind
+        from io import StringIO
+        from django.core.management import call_command
+        from .urls import urlpatterns
+        
+        out = StringIO()
+        # Runs the version bump that invalidates what was cached for the rolled back tree
+        with self.captureOnCommitCallbacks(execute=True):
+            call_command('explain_queries', nodes=50, stdout=out)
+        report: str = out.getvalue()
+        
+        for pattern in urlpatterns:
+            self.assertIn(f'## {pattern.name}:', report)
+        self.assertIn('SEARCH nodes USING INTEGER PRIMARY KEY', report)
+        self.assertNotIn('nodes_cache', report)
+        self.assertEqual(NodeTree.objects.count(), 0)
+    
+    def test_only_unindexed_table_reads_are_full_scans(self) -> None:
+        # Test a read of an unindexed column is flagged, subquery and index scans aren't
+        from .management.commands.explain_queries import Command, is_full_scan
+        
+        tables = set(connection.introspection.table_names())
+        unindexed = Command()._plan('SELECT id FROM node_tree_names WHERE "nodeName" = \'Sales\'')
+        self.assertEqual([is_full_scan(detail, tables) for _, detail in unindexed], [True])
+        
+        subquery = Command()._plan('SELECT * FROM (SELECT language, COUNT(*) FROM node_tree_names GROUP BY language)')
+        self.assertIn('SCAN (subquery-1)', [detail for _, detail in subquery])
+        self.assertFalse(any(is_full_scan(detail, tables) for _, detail in subquery if 'subquery' in detail))
+        self.assertFalse(is_full_scan('SCAN nodes USING INDEX nodes_tree_id_a599fd_idx', tables))
+        self.assertTrue(is_full_scan('SCAN U0', tables | {'U0'}))
+
+
+class ForestTest(TestCase):
+    """Test cases for trees numbered on their own"""
+    
+    def setUp(self) -> None:
+        self.factory: RequestFactory = RequestFactory()
+    
+    def _create(self, body: Dict[str, Any]) -> Dict[str, Any]:
+        from .views import create_node
+        
+        with self.captureOnCommitCallbacks(execute=True):
+            response: JsonResponse = create_node(
+                self.factory.post('/api/nodes/create/', json.dumps(body), content_type='application/json')
+            )
+        self.assertEqual(response.status_code, 201)
+        return json.loads(response.content)['data']
+    
+    def test_roots_get_their_own_numbering(self) -> None:
+        # Test child inserts only shift the tree they go into
+        from .nested_set import iter_tree_problems
+        
+        first: Dict[str, Any] = self._create({'names': {'en': 'Acme'}})
+        second: Dict[str, Any] = self._create({'names': {'en': 'Globex'}})
+        self.assertEqual((second['lft'], second['rgt'], second['tree_id']), (1, 2, second['node_id']))
+        
+        child: Dict[str, Any] = self._create({'parent_id': first['node_id'], 'names': {'en': 'Sales'}})
+        self.assertEqual((child['lft'], child['rgt'], child['tree_id']), (2, 3, first['node_id']))
+        self.assertEqual(NodeTree.objects.get(id=first['node_id']).rgt, 4)
+        self.assertEqual(NodeTree.objects.get(id=second['node_id']).rgt, 2)
+        self.assertEqual(list(iter_tree_problems()), [])
+    
+    def test_list_trees(self) -> None:
+        # Test roots are listed with the size of their tree
+        from .views import list_trees
+        
+        first: Dict[str, Any] = self._create({'names': {'en': 'Acme'}})
+        second: Dict[str, Any] = self._create({'names': {'en': 'Globex'}})
+        self._create({'parent_id': first['node_id'], 'names': {'en': 'Sales'}})
+        
+        response: JsonResponse = list_trees(self.factory.get('/api/trees/'))
+        self.assertEqual(response.status_code, 200)
+        trees: List[Dict[str, Any]] = json.loads(response.content)['data']['trees']
+        self.assertEqual(
+            [(tree['id'], tree['name'], tree['node_count']) for tree in trees],
+            [(first['node_id'], 'Acme', 2), (second['node_id'], 'Globex', 1)]
+        )
+    
+    def test_check_tree_flags_shared_numbering(self) -> None:
+        # Test a root without its own tree is reported
+        from .nested_set import iter_tree_problems
+        
+        root: NodeTree = NodeTree.objects.create(lft=1, rgt=2, children_count=0)
+        self.assertEqual(
+            list(iter_tree_problems()),
+            [(root.id, 'tree_id is 0 but the root of a tree must have its own id')]
+        )
+
+
+@override_settings(NODES_RESPONSE_CACHE=True, NODES_WARM_THREADS=0)
+class ResponseCacheTest(TestCase):
+    """Test cases for the rendered response cache and its warmer"""
+    
+    def setUp(self) -> None:
+        from django.core.cache import cache
+        from .models import node_names_cache
+        from .warmer import hot_requests
+        
+        cache.clear()
+        node_names_cache.clear()
+        hot_requests.clear()
+        self.factory: RequestFactory = RequestFactory()
+        self.root: NodeTree = NodeTree.objects.create(lft=1, rgt=4, children_count=1)
+        self.child: NodeTree = NodeTree.objects.create(
+            lft=2, rgt=3, children_count=0, parent=self.root, level=1,
+            path=self.root.descendant_path
+        )
+        NodeTree.objects.update(tree_id=self.root.id)
+        NodeTreeNames.objects.create(nodeTree=self.root, language='en', nodeName='Company')
+        NodeTreeNames.objects.create(nodeTree=self.child, language='en', nodeName='Sales')
+    
+    def test_repeated_read_is_served_from_cache(self) -> None:
+        # Test the second identical request is served from two cache lookups
+        from .cache import tree_version_scope
+        from .views import get_node
+        
+        first: JsonResponse = get_node(self.factory.get(f'/api/nodes/{self.root.id}/', {'language': 'en'}), self.root.id)
+        self.assertEqual(first.status_code, 200)
+        # The tree version and the rendered entry, from the (database) cache
+        with tree_version_scope(), self.assertNumQueries(2):
+            second = get_node(self.factory.get(f'/api/nodes/{self.root.id}/', {'language': 'en'}), self.root.id)
+        self.assertEqual(second.content, first.content)
+    
+    def test_missing_node_is_read_once_and_not_counted(self) -> None:
+        # Test an error response is built once, returned as is and not warmed
+        from .cache import get_tree_version, tree_version_scope
+        from .warmer import hot_requests
+        from .views import get_node
+        
+        with tree_version_scope():
+            get_tree_version()
+            # The rendered entry lookup and one read of the node
+            with self.assertNumQueries(2):
+                response = get_node(self.factory.get('/api/nodes/999/'), 999)
+        self.assertEqual(response.status_code, 404)
+        self.assertEqual(hot_requests.top(10), [])
+    
+    def test_hot_reads_are_warmed_after_write(self) -> None:
+        # Test a write re-renders the requested reads for the new tree version
+        from .cache import tree_version_scope
+        from .views import create_node, get_node, search_children
+        
+        get_node(self.factory.get(f'/api/nodes/{self.root.id}/'), self.root.id)
+        search_children(self.factory.get(f'/api/nodes/{self.root.id}/children/'), self.root.id)
+        body: str = json.dumps({'parent_id': self.root.id, 'names': {'en': 'Legal'}})
+        with self.captureOnCommitCallbacks(execute=True):
+            create_node(self.factory.post('/api/nodes/create/', body, content_type='application/json'))
+        
+        # One read of the tree version, then one rendered entry per read
+        with tree_version_scope(), self.assertNumQueries(3):
+            node = get_node(self.factory.get(f'/api/nodes/{self.root.id}/'), self.root.id)
+            children = search_children(self.factory.get(f'/api/nodes/{self.root.id}/children/'), self.root.id)
+        self.assertEqual(json.loads(node.content)['data']['children_count'], 2)
+        self.assertEqual(
+            [child['name'] for child in json.loads(children.content)['data']['children']],
+            ['Sales', 'Legal']
+        )
+
+
+class LoadTestCommandTest(TestCase):
+    """Test cases for the load test command"""
+    
+    def test_run_reports_every_operation(self) -> None:
+        # Test an inline run reports each operation and leaves a consistent, cleaned up tree
+        from io import StringIO
+        from django.core.management import call_command
+        from .models import NodeChange
+        
+        # A broken tree that isn't the load test's business
+        broken: NodeTree = NodeTree.objects.create(lft=5, rgt=3, children_count=0)
+        NodeTree.objects.filter(id=broken.id).update(tree_id=broken.id)
+        
+        out = StringIO()
+        with self.captureOnCommitCallbacks(execute=True):
+            call_command('load_test', requests=40, threads=1, nodes=20, page_size=5, stdout=out)
+        report: str = out.getvalue()
+        
+        for operation in ('get_node', 'search_children', 'list_all_nodes', 'create_node', 'total'):
+            self.assertIn(operation, report)
+        self.assertIn('Nested Set problems in the generated tree after the run: 0', report)
+        self.assertEqual(list(NodeTree.objects.values_list('id', flat=True)), [broken.id])
+        # Mirrors learn that the generated tree is gone
+        self.assertEqual(NodeChange.objects.last().action, NodeChange.DELETED)
+    
+    def test_invalid_mix(self) -> None:
+        # Test unknown operations are rejected before anything is written
+        from django.core.management import call_command
+        from django.core.management.base import CommandError
+        
+        with self.assertRaises(CommandError):
+            call_command('load_test', mix='get_node=50,delete_node=10')
+        self.assertEqual(NodeTree.objects.count(), 0)
+
+
+class ApiUrlsTest(TestCase):
+    """Test cases for the URL configuration of the API-only settings"""
+    
+    @override_settings(ROOT_URLCONF='challenge_hotiday.urls_api')
+    def test_serves_nodes_api_without_admin(self) -> None:
+        # Test the node endpoints are served and the admin is gone
+        root: NodeTree = NodeTree.objects.create(lft=1, rgt=2, children_count=0)
+        self.assertEqual(self.client.get('/api/nodes/').status_code, 200)
+        self.assertEqual(self.client.get(f'/api/nodes/{root.id}/').status_code, 200)
+        self.assertEqual(self.client.get('/admin/').status_code, 404)
+
+
+class LanguageFallbackTest(TestCase):
+    """Test cases for language fallback chains"""
+    
+    def setUp(self) -> None:
+        from .models import node_names_cache
+        node_names_cache.clear()
+        
+        self.factory: RequestFactory = RequestFactory()
+        self.swiss: NodeTree = NodeTree.objects.create(lft=1, rgt=2, children_count=0)
+        self.italian: NodeTree = NodeTree.objects.create(lft=3, rgt=4, children_count=0)
+        self.english: NodeTree = NodeTree.objects.create(lft=5, rgt=6, children_count=0)
+        self.unnamed: NodeTree = NodeTree.objects.create(lft=7, rgt=8, children_count=0)
+        for node, language, name in (
+            (self.swiss, 'en', 'Sales'), (self.swiss, 'it', 'Vendite'), (self.swiss, 'it-CH', 'Vendite CH'),
+            (self.italian, 'en', 'Legal'), (self.italian, 'it', 'Legale'),
+            (self.english, 'en', 'Helpdesk'),
+        ):
+            NodeTreeNames.objects.create(nodeTree=node, language=language, nodeName=name)
+    
+    @override_settings(NODES_LANGUAGE_FALLBACKS={'rm': ['it', 'de']})
+    def test_language_chain(self) -> None:
+        # Test regional codes, configured fallbacks and Accept-Language values
+        from .languages import language_chain
+        
+        self.assertEqual(language_chain('it-CH'), ('it-CH', 'it', 'en'))
+        self.assertEqual(language_chain('rm_ch'), ('rm-CH', 'rm', 'it', 'de', 'en'))
+        self.assertEqual(language_chain('de;q=0.8, fr-CH, *;q=0.5'), ('fr-CH', 'fr', 'de', 'en'))
+        self.assertEqual(language_chain(''), ('en',))
+    
+    def test_page_resolved_in_one_query(self) -> None:
+        # Test every node gets the name earliest in its chain, with one query
+        from .cache import get_tree_version, tree_version_scope
+        
+        ids: List[int] = [self.swiss.id, self.italian.id, self.english.id, self.unnamed.id]
+        with tree_version_scope():
+            get_tree_version()
+            with self.assertNumQueries(1):
+                names: Dict[int, str] = NodeTreeNames.get_node_names(ids, 'it-CH')
+            self.assertEqual(names, {
+                self.swiss.id: 'Vendite CH', self.italian.id: 'Legale',
+                self.english.id: 'Helpdesk', self.unnamed.id: f'Node {self.unnamed.id}'
+            })
+            with self.assertNumQueries(0):
+                NodeTreeNames.get_node_names(ids, 'it-CH')
+    
+    def test_accept_language_header(self) -> None:
+        # Test the header is used when there is no language parameter
+        from .views import get_node
+        
+        request = self.factory.get(f'/api/nodes/{self.swiss.id}/', HTTP_ACCEPT_LANGUAGE='it;q=0.9, it-CH')
+        self.assertEqual(json.loads(get_node(request, self.swiss.id).content)['data']['name'], 'Vendite CH')
+        request = self.factory.get(f'/api/nodes/{self.swiss.id}/', {'language': 'it'}, HTTP_ACCEPT_LANGUAGE='it-CH')
+        self.assertEqual(json.loads(get_node(request, self.swiss.id).content)['data']['name'], 'Vendite')
+    
+    @override_settings(NODES_RESPONSE_CACHE=True, NODES_WARM_THREADS=0)
+    def test_vary_and_cache_key_follow_resolved_chain(self) -> None:
+        # Test header-dependent responses vary on it, cached or not, and share entries per chain
+        from django.core.cache import cache
+        from .warmer import hot_requests
+        from .views import get_node
+        
+        cache.clear()
+        hot_requests.clear()
+        responses = [
+            get_node(self.factory.get(f'/api/nodes/{self.swiss.id}/', HTTP_ACCEPT_LANGUAGE=header), self.swiss.id)
+            for header in ('it-CH', 'it-CH, it;q=0.5', 'it_ch')
+        ]
+        for response in responses:
+            self.assertIn('Accept-Language', response['Vary'])
+            self.assertEqual(json.loads(response.content)['data']['name'], 'Vendite CH')
+        self.assertEqual(len(hot_requests.top(10)), 1)
+        
+        response = get_node(self.factory.get(f'/api/nodes/{self.swiss.id}/', {'language': 'it'}), self.swiss.id)
+        self.assertFalse(response.has_header('Vary'))
+
+
+class SharedCacheCheckTest(TestCase):
+    """Test cases for the shared cache system check"""
+    
+    def test_process_local_cache_is_a_warning(self) -> None:
+        # Test a LocMemCache default warns, and is an error with the response cache
+        from .checks import check_shared_cache
+        
+        self.assertEqual(check_shared_cache(None), [])
+        with override_settings(CACHES={'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}}):
+            self.assertEqual([error.id for error in check_shared_cache(None)], ['nodes.W001'])
+            with override_settings(NODES_RESPONSE_CACHE=True):
+                self.assertEqual([error.id for error in check_shared_cache(None)], ['nodes.E001'])
+    
+    def test_migrate_creates_cache_table(self) -> None:
+        # Test the cache table is created by migrate, not by a separate command
+        from .apps import create_cache_table
+        
+        with connection.cursor() as cursor:
+            cursor.execute('DROP TABLE nodes_cache')
+        create_cache_table(using='default')
+        self.assertIn('nodes_cache', connection.introspection.table_names())
+    
+    def test_response_cache_needs_shared_cache(self) -> None:
+        # Test the response cache stays off with a process-local cache
+        from .warmer import response_cache_enabled
+        
+        with override_settings(NODES_RESPONSE_CACHE=True):
+            self.assertTrue(response_cache_enabled())
+            with override_settings(CACHES={'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}}):
+                self.assertFalse(response_cache_enabled())
+
+
+class BackfillMigrationTest(TransactionTestCase):
+    """Test cases for the migrations deriving parents, paths and trees from baseline data"""
+    
+    before: str = '0002_alter_nodetree_lft_alter_nodetree_rgt_nodetreenames'
+    
+    def _migrate(self, target: List) -> None:
+        from django.db.migrations.executor import MigrationExecutor
+        executor = MigrationExecutor(connection)
+        executor.loader.build_graph()
+        executor.migrate(target)
+    
+    def tearDown(self) -> None:
+        from django.db.migrations.executor import MigrationExecutor
+        self._migrate(MigrationExecutor(connection).loader.graph.leaf_nodes())
+    
+    def test_colliding_api_roots_become_trees(self) -> None:
+        # Test baseline roots created through the API (all at lft=1) aren't nested in the first tree
+        from django.db.migrations.executor import MigrationExecutor
+        from .nested_set import iter_tree_problems
+        
+        self._migrate([('nodes', self.before)])
+        OldNodeTree = MigrationExecutor(connection).loader.project_state(('nodes', self.before)).apps.get_model('nodes', 'NodeTree')
+        # Company with two children, an API root, then a child added to Company through the API
+        for node_id, lft, rgt, children_count in [(1, 1, 8, 3), (2, 2, 3, 0), (3, 4, 5, 0), (4, 1, 2, 0), (5, 6, 7, 0)]:
+            OldNodeTree.objects.create(id=node_id, lft=lft, rgt=rgt, children_count=children_count)
+        
+        self._migrate(MigrationExecutor(connection).loader.graph.leaf_nodes())
+        
+        rows = NodeTree.objects.order_by('id').values_list('id', 'parent_id', 'tree_id', 'level', 'path')
+        self.assertEqual(list(rows), [
+            (1, None, 1, 0, '/'), (2, 1, 1, 1, '/1/'), (3, 1, 1, 1, '/1/'),
+            (4, None, 4, 0, '/'), (5, 1, 1, 1, '/1/'),
+        ])
+        self.assertEqual(list(iter_tree_problems()), [])
@@ -6,7 +6,15 @@ app_name = 'nodes'
 urlpatterns = [
     # API endpoints
     path('api/nodes/', views.list_all_nodes, name='list_all_nodes'),  # GET
+    path('api/trees/', views.list_trees, name='list_trees'),  # GET
     path('api/nodes/create/', views.create_node, name='create_node'),  # POST
+    path('api/nodes/names/bulk/', views.bulk_upsert_names, name='bulk_upsert_names'),  # POST
+    path('api/nodes/changes/', views.list_changes, name='list_changes'),
+    path('api/nodes/events/', views.stream_events, name='stream_events'),  # SSE, ASGI only
     path('api/nodes/<int:node_id>/', views.get_node, name='get_node'),
     path('api/nodes/<int:node_id>/children/', views.search_children, name='search_children'),
+    path('api/nodes/<int:node_id>/reorder/', views.reorder_node, name='reorder_node'),  # POST
+    path('api/nodes/<int:node_id>/ancestors/', views.node_ancestors, name='node_ancestors'),
+    path('api/nodes/<int:node_id>/stats/', views.node_stats, name='node_stats'),
+    path('api/nodes/<int:node_id>/children/stats/', views.children_stats, name='children_stats'),
 ] 
\ No newline at end of file
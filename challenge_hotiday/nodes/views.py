@@ -1,14 +1,67 @@
-from django.http import JsonResponse, HttpRequest
+from django.conf import settings
+from django.http import JsonResponse, HttpRequest, StreamingHttpResponse
 from django.views.decorators.csrf import csrf_exempt
 from django.views.decorators.http import require_http_methods
 from django.core.paginator import Paginator
+from django.db import transaction
 from django.db.models import F
-from .models import NodeTree, NodeTreeNames
-from typing import Dict, Any, List
+from .languages import request_language, vary_on_language
+from .models import NodeChange, NodeTree, NodeTreeNames
+from .warmer import cached_response
+from typing import Dict, Any, List, Optional, Union
 import json
 
+# Modules used by a few endpoints only (batching, changes, events, names,
+# nested_set, stats) are imported where they are used, so workers start
+# without them
+
+
+# Fields of a serialized node, in the order used by the columnar format
+NODE_FIELDS = ('id', 'name', 'tree_id', 'lft', 'rgt', 'children_count', 'is_leaf', 'depth')
+
+# Supported values of the 'format' query parameter
+RESPONSE_FORMATS = ('json', 'columnar')
+
+
+def _to_columnar(rows: List[Dict[str, Any]]) -> Dict[str, List[Any]]:
+    """
+    Convert a list of serialized nodes into one array per field,
+    so large listings don't repeat every key in every row.
+    """
+    return {field: [row[field] for row in rows] for field in NODE_FIELDS}
+
+
+def _parse_bool(value: str) -> bool:
+    """Parse a boolean query parameter, raising ValueError if it isn't one"""
+    if value.lower() in ('1', 'true', 'yes'):
+        return True
+    if value.lower() in ('0', 'false', 'no'):
+        return False
+    raise ValueError(f'Invalid boolean {value}')
+
+
+def _serialize_node(node: NodeTree, name: str) -> Dict[str, Any]:
+    return {
+        'id': node.id,
+        'name': name,
+        'tree_id': node.tree_id,
+        'lft': node.lft,
+        'rgt': node.rgt,
+        'children_count': node.children_count,
+        'is_leaf': node.is_leaf,
+        'depth': node.depth
+    }
+
+
+def _serialize_nodes(nodes: List[NodeTree], language: str) -> List[Dict[str, Any]]:
+    """Serialize nodes, resolving all their names with one cached lookup"""
+    names: Dict[int, str] = NodeTreeNames.get_node_names([node.id for node in nodes], language)
+    return [_serialize_node(node, names[node.id]) for node in nodes]
+
 
 @require_http_methods(["GET"])
+@vary_on_language
+@cached_response
 def list_all_nodes(request: HttpRequest) -> JsonResponse:
     """
     List all nodes in the tree (with pagination and language).
@@ -16,49 +69,50 @@ def list_all_nodes(request: HttpRequest) -> JsonResponse:
     parameters:
     - page_num: Page number (default: 0)
     - page_size: Items per page (default: 5, max: 1000)
-    - language: Language code for node names (default: 'en')
+    - language: Language code or fallback chain start, e.g. 'it-CH' (default: the
+      Accept-Language header, then 'en')
+    - format: 'json' (list of objects, default) or 'columnar' (one array per field)
+    - root_id: Only the subtree of this node, node included (optional)
+    - max_level: Only nodes with level <= max_level, 0 being the roots (optional)
+    - leaves_only: Only nodes without children (default: false)
     """
     try:
         page_num: int = int(request.GET.get('page_num', 0))
         page_size: int = min(int(request.GET.get('page_size', 5)), 1000)
-        language: str = request.GET.get('language', 'en')
+        language: str = request_language(request)
+        response_format: str = request.GET.get('format', 'json')
+        if response_format not in RESPONSE_FORMATS:
+            raise ValueError(f'Unknown format {response_format}')
+        root_id: Optional[int] = int(request.GET['root_id']) if 'root_id' in request.GET else None
+        max_level: Optional[int] = int(request.GET['max_level']) if 'max_level' in request.GET else None
+        leaves_only: bool = _parse_bool(request.GET.get('leaves_only', 'false'))
         
-        # Get all nodes in the specified language
-        nodes = NodeTree.objects.select_related().prefetch_related('names')
-        
-        # Prepare data for response
-        nodes_data: List[Dict[str, Any]] = []
-        for node in nodes:
-            # Get node name in specified language
+        # Filters are evaluated in SQL on the indexed lft/rgt range and level
+        nodes = NodeTree.objects.order_by('tree_id', 'lft')
+        if root_id is not None:
             try:
-                name_obj = node.names.get(language=language)
-                node_name = name_obj.nodeName
-            except NodeTreeNames.DoesNotExist:
-                # fallback to english
-                try:
-                    name_obj = node.names.get(language='en')
-                    node_name = name_obj.nodeName
-                except NodeTreeNames.DoesNotExist:
-                    node_name = f"Node {node.id}"
-            
-            nodes_data.append({
-                'id': node.id,
-                'name': node_name,
-                'lft': node.lft,
-                'rgt': node.rgt,
-                'children_count': node.children_count,
-                'is_leaf': node.is_leaf,
-                'depth': node.depth
-            })
-        
-        # pagination
-        paginator = Paginator(nodes_data, page_size)
+                root = NodeTree.objects.get(id=root_id)
+            except NodeTree.DoesNotExist:
+                return JsonResponse({
+                    'status': 'error',
+                    'message': f'Node with ID {root_id} not found'
+                }, status=404)
+            nodes = nodes.filter(tree_id=root.tree_id, lft__gte=root.lft, rgt__lte=root.rgt)
+        if max_level is not None:
+            nodes = nodes.filter(level__lte=max_level)
+        if leaves_only:
+            nodes = nodes.filter(rgt=F('lft') + 1)
+        
+        # Paginate in the database, then resolve names for the page only
+        paginator = Paginator(nodes, page_size)
         page_obj = paginator.get_page(page_num)
+        page_nodes: List[Dict[str, Any]] = _serialize_nodes(list(page_obj), language)
         
         return JsonResponse({
             'status': 'success',
             'data': {
-                'nodes': list(page_obj),
+                'format': response_format,
+                'nodes': _to_columnar(page_nodes) if response_format == 'columnar' else page_nodes,
                 'pagination': {
                     'current_page': page_obj.number,
                     'total_pages': paginator.num_pages,
@@ -83,16 +137,19 @@ def list_all_nodes(request: HttpRequest) -> JsonResponse:
 
 
 @require_http_methods(["GET"])
+@vary_on_language
+@cached_response
 def get_node(request: HttpRequest, node_id: int) -> JsonResponse:
     """
     Get a specific node by id.
     
     parameters:
-    - language: Language code for node names (default: 'en')
+    - language: Language code or fallback chain start, e.g. 'it-CH' (default: the
+      Accept-Language header, then 'en')
     """
     try:
         # Get language parameter
-        language: str = request.GET.get('language', 'en')
+        language: str = request_language(request)
         
         # Get the node
         try:
@@ -103,28 +160,8 @@ def get_node(request: HttpRequest, node_id: int) -> JsonResponse:
                 'message': f'Node with ID {node_id} not found'
             }, status=404)
         
-        # Get node name 
-        try:
-            name_obj = node.names.get(language=language)
-            node_name = name_obj.nodeName
-        except NodeTreeNames.DoesNotExist:
-            # fallback to english
-            try:
-                name_obj = node.names.get(language='en')
-                node_name = name_obj.nodeName
-            except NodeTreeNames.DoesNotExist:
-                node_name = f"Node {node.id}"
-        
         # Prepare response data for single node
-        node_data = {
-            'id': node.id,
-            'name': node_name,
-            'lft': node.lft,
-            'rgt': node.rgt,
-            'children_count': node.children_count,
-            'is_leaf': node.is_leaf,
-            'depth': node.depth
-        }
+        node_data = _serialize_node(node, NodeTreeNames.get_node_name(node.id, language))
         
         return JsonResponse({
             'status': 'success',
@@ -139,6 +176,8 @@ def get_node(request: HttpRequest, node_id: int) -> JsonResponse:
 
 
 @require_http_methods(["GET"])
+@vary_on_language
+@cached_response
 def search_children(request: HttpRequest, node_id: int) -> JsonResponse:
     """
     Search for children of a specific node
@@ -146,13 +185,18 @@ def search_children(request: HttpRequest, node_id: int) -> JsonResponse:
     parameters:
     - page: Page number (default: 0)
     - page_size: Items per page (default: 5, max: 1000)
-    - language: Language code for node names (default: 'en')
+    - language: Language code or fallback chain start, e.g. 'it-CH' (default: the
+      Accept-Language header, then 'en')
+    - format: 'json' (list of objects, default) or 'columnar' (one array per field)
     """
     try:
         # Get parameters
         page_num: int = int(request.GET.get('page_num', 0))
         page_size: int = min(int(request.GET.get('page_size', 5)), 1000)
-        language: str = request.GET.get('language', 'en')
+        language: str = request_language(request)
+        response_format: str = request.GET.get('format', 'json')
+        if response_format not in RESPONSE_FORMATS:
+            raise ValueError(f'Unknown format {response_format}')
 
         # Get the parent node
         try:
@@ -165,9 +209,10 @@ def search_children(request: HttpRequest, node_id: int) -> JsonResponse:
         
         # Get direct children nodes using Nested Set Model
         children = NodeTree.objects.filter(
+            tree_id=parent_node.tree_id,
             lft__gt=parent_node.lft,
             rgt__lt=parent_node.rgt
-        ).prefetch_related('names')
+        ).order_by('lft')
         
         # Filter to get only direct children (not descendants)
         direct_children: List[NodeTree] = []
@@ -182,41 +227,18 @@ def search_children(request: HttpRequest, node_id: int) -> JsonResponse:
             if is_direct_child:
                 direct_children.append(child)
         
-        # Prepare children data
-        children_data: List[Dict[str, Any]] = []
-        for child in direct_children:
-            # Get child name in specified language
-            try:
-                name_obj = child.names.get(language=language)
-                child_name = name_obj.nodeName
-            except NodeTreeNames.DoesNotExist:
-                # fallback to english
-                try:
-                    name_obj = child.names.get(language='en')
-                    child_name = name_obj.nodeName
-                except NodeTreeNames.DoesNotExist:
-                    child_name = f"Node {child.id}"
-            
-            children_data.append({
-                'id': child.id,
-                'name': child_name,
-                'lft': child.lft,
-                'rgt': child.rgt,
-                'children_count': child.children_count,
-                'is_leaf': child.is_leaf,
-                'depth': child.depth
-            })
-        
-        # pagination
-        paginator = Paginator(children_data, page_size)
+        # pagination, resolving names for the page only
+        paginator = Paginator(direct_children, page_size)
         page_obj = paginator.get_page(page_num)
+        page_children: List[Dict[str, Any]] = _serialize_nodes(list(page_obj), language)
         
         return JsonResponse({
             'status': 'success',
             'data': {
+                'format': response_format,
                 'parent_id': node_id,
-                'parent_name': parent_node.names.get(language=language).nodeName if parent_node.names.filter(language=language).exists() else parent_node.names.get(language='en').nodeName if parent_node.names.filter(language='en').exists() else f"Node {parent_node.id}",
-                'children': list(page_obj),
+                'parent_name': NodeTreeNames.get_node_name(parent_node.id, language),
+                'children': _to_columnar(page_children) if response_format == 'columnar' else page_children,
                 'pagination': {
                     'current_page': page_obj.number,
                     'total_pages': paginator.num_pages,
@@ -240,6 +262,23 @@ def search_children(request: HttpRequest, node_id: int) -> JsonResponse:
         }, status=500)
 
 
+def _created_response(new_node: NodeTree, created_names: List[Dict[str, str]]) -> JsonResponse:
+    return JsonResponse({
+        'status': 'success',
+        'message': 'Node created successfully',
+        'data': {
+            'node_id': new_node.id,
+            'tree_id': new_node.tree_id,
+            'lft': new_node.lft,
+            'rgt': new_node.rgt,
+            'children_count': new_node.children_count,
+            'is_leaf': new_node.is_leaf,
+            'depth': new_node.depth,
+            'names': created_names
+        }
+    }, status=201)
+
+
 @csrf_exempt
 @require_http_methods(["POST"])
 def create_node(request: HttpRequest) -> JsonResponse:
@@ -287,80 +326,425 @@ def create_node(request: HttpRequest) -> JsonResponse:
         
         parent_id: Optional[int] = data.get('parent_id')
         
-        # Handle root node creation
-        if parent_id is None:
-            # Create root node
-            new_node = NodeTree.objects.create(
-                lft=1,
-                rgt=2,
-                children_count=0
-            )
-        else:
-            # Create child node
+        from .nested_set import InvalidNodeName, insert_node
+        
+        try:
+            if parent_id is not None and getattr(settings, 'NODES_CREATE_BATCHING', False):
+                # Coalesced with concurrent inserts by the writer thread
+                from .batching import create_batcher
+                
+                new_node, created_names = create_batcher.submit(parent_id, data['names'])
+            else:
+                new_node, created_names = insert_node(parent_id, data['names'])
+        except NodeTree.DoesNotExist:
+            return JsonResponse({
+                'status': 'error',
+                'message': f'Parent node with ID {parent_id} not found'
+            }, status=404)
+        except InvalidNodeName as e:
+            return JsonResponse({
+                'status': 'error',
+                'message': str(e)
+            }, status=400)
+        except TimeoutError:
+            # Only raised while the insert was still queued: it was dropped
+            return JsonResponse({
+                'status': 'error',
+                'message': 'The node could not be created in time, try again'
+            }, status=503)
+        
+        return _created_response(new_node, created_names)
+        
+    except Exception as e:
+        return JsonResponse({
+            'status': 'error',
+            'message': 'Internal server error'
+        }, status=500)
+
+
+@csrf_exempt
+@require_http_methods(["POST"])
+def reorder_node(request: HttpRequest, node_id: int) -> JsonResponse:
+    """
+    Move a node before or after one of its siblings.
+    
+    Request body (exactly one of the two):
+    {
+        "before": 5,  // ID of the sibling to move in front of
+        "after": 5    // ID of the sibling to move behind
+    }
+    """
+    try:
+        try:
+            data: Dict[str, Any] = json.loads(request.body.decode('utf-8'))
+        except json.JSONDecodeError:
+            return JsonResponse({
+                'status': 'error',
+                'message': 'Invalid JSON format'
+            }, status=400)
+        
+        positions: List[str] = [
+            key for key in ('before', 'after') if isinstance(data, dict) and data.get(key) is not None
+        ]
+        if len(positions) != 1:
+            return JsonResponse({
+                'status': 'error',
+                'message': 'Exactly one of before or after is required'
+            }, status=400)
+        position: str = positions[0]
+        
+        with transaction.atomic():
             try:
-                parent_node = NodeTree.objects.get(id=parent_id)
+                node = NodeTree.objects.get(id=node_id)
             except NodeTree.DoesNotExist:
                 return JsonResponse({
                     'status': 'error',
-                    'message': f'Parent node with ID {parent_id} not found'
+                    'message': f'Node with ID {node_id} not found'
+                }, status=404)
+            try:
+                sibling = NodeTree.objects.get(id=int(data[position]))
+            except NodeTree.DoesNotExist:
+                return JsonResponse({
+                    'status': 'error',
+                    'message': f'Node with ID {data[position]} not found'
                 }, status=404)
             
-            # Update parent's children count
-            parent_node.children_count += 1
-            parent_node.save()
-            
-            # Create new node with Nested Set Model logic
-            new_node = NodeTree.objects.create(
-                lft=parent_node.rgt,
-                rgt=parent_node.rgt + 1,
-                children_count=0
-            )
+            if node.parent_id is None or sibling.parent_id != node.parent_id or sibling.id == node.id:
+                return JsonResponse({
+                    'status': 'error',
+                    'message': 'Node can only be moved next to another child of the same parent'
+                }, status=400)
             
-            # Update all nodes that need to be shifted
-            NodeTree.objects.filter(rgt__gte=parent_node.rgt).update(rgt=F('rgt') + 2)
-            NodeTree.objects.filter(lft__gt=parent_node.rgt).update(lft=F('lft') + 2)
+            from .nested_set import move_among_siblings
             
-            # Update the new node's lft and rgt values
-            new_node.lft = parent_node.rgt
-            new_node.rgt = parent_node.rgt + 1
-            new_node.save()
-        
-        # Create names for the new node
-        created_names: List[Dict[str, str]] = []
-        for language, name in data['names'].items():
-            if name:  # Only create if name is not empty
-                try:
-                    name_obj = NodeTreeNames.objects.create(
-                        nodeTree=new_node,
-                        language=language,
-                        nodeName=name
-                    )
-                    created_names.append({
-                        'language': language,
-                        'name': name
-                    })
-                except Exception as e:
-                    # If there's an error creating names, delete the node
-                    new_node.delete()
-                    return JsonResponse({
-                        'status': 'error',
-                        'message': f'Error creating name for language {language}'
-                    }, status=400)
+            node = move_among_siblings(node, sibling, position)
+        
+        return JsonResponse({
+            'status': 'success',
+            'message': 'Node moved successfully',
+            'data': {
+                'node_id': node.id,
+                'parent_id': node.parent_id,
+                'lft': node.lft,
+                'rgt': node.rgt
+            }
+        })
+        
+    except (TypeError, ValueError) as e:
+        return JsonResponse({
+            'status': 'error',
+            'message': 'Invalid parameter value'
+        }, status=400)
+    except Exception as e:
+        return JsonResponse({
+            'status': 'error',
+            'message': 'Internal server error'
+        }, status=500)
+
+
+@csrf_exempt
+@require_http_methods(["POST"])
+def bulk_upsert_names(request: HttpRequest) -> JsonResponse:
+    """
+    Insert or update node names in bulk (e.g. to add a new language).
+    
+    Request body, JSON:
+    {
+        "names": [
+            {"node_id": 1, "language": "de", "name": "Firma"}
+        ]
+    }
+    or CSV (Content-Type: text/csv) with a node_id,language,name header.
+    
+    Invalid rows are skipped and reported in data.errors.
+    """
+    from .names import read_name_rows, upsert_node_names
+    
+    try:
+        content_format: str = 'csv' if request.content_type == 'text/csv' else 'json'
+        try:
+            rows: List[Any] = read_name_rows(request.body.decode('utf-8'), content_format)
+        except (UnicodeDecodeError, ValueError) as e:
+            return JsonResponse({
+                'status': 'error',
+                'message': str(e)
+            }, status=400)
+        
+        upserted, errors = upsert_node_names(rows)
+        
+        return JsonResponse({
+            'status': 'success',
+            'data': {
+                'received': len(rows),
+                'upserted': upserted,
+                'errors': errors
+            }
+        })
+        
+    except Exception as e:
+        return JsonResponse({
+            'status': 'error',
+            'message': 'Internal server error'
+        }, status=500)
+
+
+@require_http_methods(["GET"])
+def node_stats(request: HttpRequest, node_id: int) -> JsonResponse:
+    """
+    Aggregate statistics of a node's subtree: descendant_count, leaf_count,
+    max_depth (levels below the node) and names per language.
+    """
+    from .stats import get_subtree_stats
+    
+    try:
+        try:
+            node = NodeTree.objects.get(id=node_id)
+        except NodeTree.DoesNotExist:
+            return JsonResponse({
+                'status': 'error',
+                'message': f'Node with ID {node_id} not found'
+            }, status=404)
+        
+        return JsonResponse({
+            'status': 'success',
+            'data': get_subtree_stats([node])[node.id]
+        })
+        
+    except Exception as e:
+        return JsonResponse({
+            'status': 'error',
+            'message': 'Internal server error'
+        }, status=500)
+
+
+@require_http_methods(["GET"])
+def children_stats(request: HttpRequest, node_id: int) -> JsonResponse:
+    """
+    Subtree statistics of every direct child of a node
+    
+    parameters:
+    - page_num: Page number (default: 0)
+    - page_size: Items per page (default: 5, max: 1000)
+    """
+    from .stats import get_subtree_stats
+    
+    try:
+        page_num: int = int(request.GET.get('page_num', 0))
+        page_size: int = min(int(request.GET.get('page_size', 5)), 1000)
+        
+        if not NodeTree.objects.filter(id=node_id).exists():
+            return JsonResponse({
+                'status': 'error',
+                'message': f'Parent node with ID {node_id} not found'
+            }, status=404)
+        
+        paginator = Paginator(NodeTree.objects.filter(parent_id=node_id).order_by('lft'), page_size)
+        page_obj = paginator.get_page(page_num)
+        children: List[NodeTree] = list(page_obj)
+        stats: Dict[int, Dict[str, Any]] = get_subtree_stats(children)
         
         return JsonResponse({
             'status': 'success',
-            'message': 'Node created successfully',
             'data': {
-                'node_id': new_node.id,
-                'lft': new_node.lft,
-                'rgt': new_node.rgt,
-                'children_count': new_node.children_count,
-                'is_leaf': new_node.is_leaf,
-                'depth': new_node.depth,
-                'names': created_names
+                'parent_id': node_id,
+                'children': [stats[child.id] for child in children],
+                'pagination': {
+                    'current_page': page_obj.number,
+                    'total_pages': paginator.num_pages,
+                    'total_items': paginator.count,
+                    'has_next': page_obj.has_next(),
+                    'has_previous': page_obj.has_previous(),
+                    'page_size': page_size
+                }
             }
-        }, status=201)
+        })
         
+    except ValueError as e:
+        return JsonResponse({
+            'status': 'error',
+            'message': 'Invalid parameter value'
+        }, status=400)
+    except Exception as e:
+        return JsonResponse({
+            'status': 'error',
+            'message': 'Internal server error'
+        }, status=500)
+
+
+@require_http_methods(["GET"])
+@vary_on_language
+def node_ancestors(request: HttpRequest, node_id: int) -> JsonResponse:
+    """
+    Get the ancestors of a node, from the root down to its parent,
+    served from the materialized path.
+    
+    parameters:
+    - language: Language code or fallback chain start, e.g. 'it-CH' (default: the
+      Accept-Language header, then 'en')
+    """
+    try:
+        language: str = request_language(request)
+        
+        try:
+            node = NodeTree.objects.get(id=node_id)
+        except NodeTree.DoesNotExist:
+            return JsonResponse({
+                'status': 'error',
+                'message': f'Node with ID {node_id} not found'
+            }, status=404)
+        
+        return JsonResponse({
+            'status': 'success',
+            'data': {
+                'node_id': node.id,
+                'ancestors': _serialize_nodes(list(node.ancestors()), language)
+            }
+        })
+        
+    except Exception as e:
+        return JsonResponse({
+            'status': 'error',
+            'message': 'Internal server error'
+        }, status=500)
+
+
+@require_http_methods(["GET"])
+def list_changes(request: HttpRequest) -> JsonResponse:
+    """
+    Changes to the tree after a sequence number, oldest first, so mirrors
+    can sync incrementally.
+    
+    parameters:
+    - since: Last sequence number already applied (default: 0)
+    - limit: Maximum number of changes (default: 100, max: 1000)
+    
+    Poll again with since=last_seq while has_more is true. A 'rebuilt'
+    change means any node may have moved: mirrors should reload the tree.
+    A 'deleted' change removes the whole tree of data.tree_id.
+    """
+    from .changes import serialize_change
+    
+    try:
+        since: int = int(request.GET.get('since', 0))
+        limit: int = min(int(request.GET.get('limit', 100)), 1000)
+        if since < 0 or limit < 1:
+            raise ValueError('since and limit must be positive')
+        
+        # One extra row tells whether there are more changes
+        changes: List[NodeChange] = list(NodeChange.objects.filter(seq__gt=since).order_by('seq')[:limit + 1])
+        has_more: bool = len(changes) > limit
+        changes = changes[:limit]
+        
+        return JsonResponse({
+            'status': 'success',
+            'data': {
+                'changes': [serialize_change(change) for change in changes],
+                'last_seq': changes[-1].seq if changes else since,
+                'has_more': has_more
+            }
+        })
+        
+    except ValueError as e:
+        return JsonResponse({
+            'status': 'error',
+            'message': 'Invalid parameter value'
+        }, status=400)
+    except Exception as e:
+        return JsonResponse({
+            'status': 'error',
+            'message': 'Internal server error'
+        }, status=500)
+
+
+@require_http_methods(["GET"])
+async def stream_events(request: HttpRequest) -> Union[JsonResponse, StreamingHttpResponse]:
+    """
+    Server-Sent Events stream of tree changes (node-created, node-moved,
+    node-renamed, node-rebuilt, node-deleted), served by the ASGI application.
+    
+    parameters:
+    - node_id: Only send the changes of this node's subtree (optional)
+    - since: Replay the logged changes after this sequence number first
+      (optional, defaults to the Last-Event-ID header on reconnects)
+    """
+    try:
+        node_id: Optional[int] = int(request.GET['node_id']) if 'node_id' in request.GET else None
+        last_seen: Optional[str] = request.GET.get('since', request.headers.get('Last-Event-ID'))
+        since: Optional[int] = int(last_seen) if last_seen else None
+    except ValueError as e:
+        return JsonResponse({
+            'status': 'error',
+            'message': 'Invalid parameter value'
+        }, status=400)
+    
+    if node_id is not None and not await NodeTree.objects.filter(id=node_id).aexists():
+        return JsonResponse({
+            'status': 'error',
+            'message': f'Node with ID {node_id} not found'
+        }, status=404)
+    
+    from .events import broker, event_stream
+    
+    # Subscribe before reading the log, so no change falls in between
+    subscription = broker.subscribe()
+    response = StreamingHttpResponse(
+        event_stream(subscription, since, node_id, getattr(settings, 'NODES_EVENTS_KEEPALIVE', 15)),
+        content_type='text/event-stream'
+    )
+    response['Cache-Control'] = 'no-cache'
+    # Don't let nginx buffer the stream
+    response['X-Accel-Buffering'] = 'no'
+    return response
+
+
+@require_http_methods(["GET"])
+@vary_on_language
+@cached_response
+def list_trees(request: HttpRequest) -> JsonResponse:
+    """
+    List the roots of every tree (with pagination and language), with the
+    size of each tree read from the root's own interval.
+    
+    parameters:
+    - page_num: Page number (default: 0)
+    - page_size: Items per page (default: 5, max: 1000)
+    - language: Language code or fallback chain start, e.g. 'it-CH' (default: the
+      Accept-Language header, then 'en')
+    """
+    try:
+        page_num: int = int(request.GET.get('page_num', 0))
+        page_size: int = min(int(request.GET.get('page_size', 5)), 1000)
+        language: str = request_language(request)
+        
+        # Roots only, from the level index
+        paginator = Paginator(NodeTree.objects.filter(level=0).order_by('tree_id'), page_size)
+        page_obj = paginator.get_page(page_num)
+        roots: List[NodeTree] = list(page_obj)
+        trees: List[Dict[str, Any]] = [
+            {**row, 'node_count': (root.rgt - root.lft + 1) // 2}
+            for root, row in zip(roots, _serialize_nodes(roots, language))
+        ]
+        
+        return JsonResponse({
+            'status': 'success',
+            'data': {
+                'trees': trees,
+                'pagination': {
+                    'current_page': page_obj.number,
+                    'total_pages': paginator.num_pages,
+                    'total_items': paginator.count,
+                    'has_next': page_obj.has_next(),
+                    'has_previous': page_obj.has_previous(),
+                    'page_size': page_size
+                }
+            }
+        })
+        
+    except ValueError as e:
+        return JsonResponse({
+            'status': 'error',
+            'message': 'Invalid parameter value'
+        }, status=400)
     except Exception as e:
         return JsonResponse({
             'status': 'error',
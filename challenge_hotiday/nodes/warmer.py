@@ -0,0 +1,206 @@
+"""
+Rendered JSON of node reads, cached per tree version, and a background
+warmer that renders the most requested ones again after every version
+bump, so readers don't pay for building them after a write.
+
+Off unless NODES_RESPONSE_CACHE is set and the default cache is shared
+by every worker, like the tree version. The warmer fills that cache, but
+hot requests are counted per process and only the worker that made the
+write warms its own: the reads of other workers stay cold until their
+next request builds them.
+"""
+import inspect
+import logging
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from functools import wraps
+from threading import Lock
+from typing import Callable, Dict, List, Optional, Set, Tuple
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import close_old_connections
+from django.http import HttpRequest, HttpResponse, QueryDict
+
+from .cache import get_tree_version, is_shared_cache
+from .languages import language_chain, request_language
+from .routers import pin_to_primary, reads_from_primary
+
+
+logger = logging.getLogger(__name__)
+
+RENDERED_CACHE_TIMEOUT: int = 3600
+
+# (view name, url kwargs, normalized query string with the resolved
+# language chain as 'language')
+RequestKey = Tuple[str, Tuple[Tuple[str, int], ...], str]
+
+# Cached views by name, undecorated
+_views: Dict[str, Callable] = {}
+
+
+def response_cache_enabled() -> bool:
+    # Never with a process-local cache (the nodes.E002 check), where other
+    # workers' writes wouldn't move the version of the rendered entries
+    return getattr(settings, 'NODES_RESPONSE_CACHE', False) and is_shared_cache()
+
+
+def rendered_key(version: int, request_key: RequestKey) -> str:
+    name, kwargs, query = request_key
+    arguments: str = ','.join(f'{key}={value}' for key, value in kwargs)
+    return f'nodes:rendered:{version}:{name}:{arguments}:{query}'
+
+
+class HotRequests:
+    """
+    Request counts per process, with the query string to replay each
+    request with. Past `max_size` distinct requests the least requested
+    half is dropped and the counts are halved, so the ranking follows
+    what clients read now.
+    """
+
+    def __init__(self, max_size: int = 1000) -> None:
+        self.max_size = max_size
+        self._counts: Counter = Counter()
+        self._queries: Dict[RequestKey, str] = {}
+        self._lock = Lock()
+
+    def record(self, request_key: RequestKey, query: str) -> None:
+        with self._lock:
+            self._counts[request_key] += 1
+            self._queries[request_key] = query
+            if len(self._counts) > self.max_size:
+                self._counts = Counter({
+                    key: count // 2 or 1 for key, count in self._counts.most_common(self.max_size // 2)
+                })
+                self._queries = {key: self._queries[key] for key in self._counts}
+
+    def top(self, count: int) -> List[RequestKey]:
+        with self._lock:
+            return [key for key, _ in self._counts.most_common(count)]
+
+    def query(self, request_key: RequestKey) -> Optional[str]:
+        with self._lock:
+            return self._queries.get(request_key)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._counts.clear()
+            self._queries.clear()
+
+
+hot_requests = HotRequests()
+
+
+def _render(request_key: RequestKey, version: int, query: str) -> HttpResponse:
+    """Build the response of a request (replayed from its query string) and cache it if it succeeded"""
+    name, kwargs, _ = request_key
+    request = HttpRequest()
+    request.method = 'GET'
+    request.GET = QueryDict(query)
+    response: HttpResponse = _views[name](request, **dict(kwargs))
+    if response.status_code == 200:
+        cache.set(rendered_key(version, request_key), response.content, RENDERED_CACHE_TIMEOUT)
+    return response
+
+
+def cached_response(view: Callable) -> Callable:
+    """
+    Serve a GET view from the rendered cache of the current tree version,
+    counting successful requests for the warmer. Misses are built by the
+    view once and stored, except when the read went to a replica that may
+    lag behind the version; errors are returned as they are.
+    """
+    _views[view.__name__] = view
+    # Url arguments may also be passed positionally
+    parameters: List[str] = list(inspect.signature(view).parameters)[1:]
+
+    @wraps(view)
+    def wrapper(request: HttpRequest, *args, **kwargs) -> HttpResponse:
+        kwargs.update(zip(parameters, args))
+        if not response_cache_enabled() or request.method != 'GET':
+            return view(request, **kwargs)
+        query: QueryDict = request.GET.copy()
+        if not query.get('language') and 'Accept-Language' in request.headers:
+            # Same response as asking for it as a parameter, which the warmer can replay
+            query['language'] = request.headers['Accept-Language']
+        replay: str = _normalize_query(query)
+        # Keyed by the resolved chain, so values resolving alike share an entry
+        query['language'] = ','.join(language_chain(request_language(request)))
+        request_key: RequestKey = (view.__name__, tuple(sorted(kwargs.items())), _normalize_query(query))
+        version: int = get_tree_version()
+        content: Optional[bytes] = cache.get(rendered_key(version, request_key))
+        if content is not None:
+            hot_requests.record(request_key, replay)
+            return HttpResponse(content, content_type='application/json')
+        if reads_from_primary():
+            response: HttpResponse = _render(request_key, version, replay)
+        else:
+            response = view(request, **kwargs)
+        if response.status_code == 200:
+            hot_requests.record(request_key, replay)
+        return response
+
+    return wrapper
+
+
+def _normalize_query(query: QueryDict) -> str:
+    """Same string for the same parameters in any order"""
+    normalized = QueryDict('', mutable=True)
+    for key in sorted(query):
+        normalized.setlist(key, query.getlist(key))
+    return normalized.urlencode()
+
+
+class CacheWarmer:
+    """
+    Renders the NODES_WARM_TOP most requested reads for the new tree
+    version, on NODES_WARM_THREADS background threads (inline with 0).
+    A request already queued for warming isn't queued again, so bursts of
+    writes don't pile up work: it renders whatever version is current
+    when it runs.
+    """
+
+    def __init__(self) -> None:
+        self._pool: Optional[ThreadPoolExecutor] = None
+        self._queued: Set[RequestKey] = set()
+        self._lock = Lock()
+
+    def schedule(self) -> None:
+        threads: int = getattr(settings, 'NODES_WARM_THREADS', 2)
+        for request_key in hot_requests.top(getattr(settings, 'NODES_WARM_TOP', 50)):
+            if threads <= 0:
+                self._warm(request_key)
+                continue
+            with self._lock:
+                if request_key in self._queued:
+                    continue
+                self._queued.add(request_key)
+                if self._pool is None:
+                    self._pool = ThreadPoolExecutor(max_workers=threads, thread_name_prefix='nodes-cache-warmer')
+            self._pool.submit(self._run, request_key)
+
+    def _run(self, request_key: RequestKey) -> None:
+        with self._lock:
+            # A bump from now on queues it again
+            self._queued.discard(request_key)
+        try:
+            # Replicas may not have the new version yet
+            pin_to_primary()
+            self._warm(request_key)
+        finally:
+            close_old_connections()
+
+    def _warm(self, request_key: RequestKey) -> None:
+        version: int = get_tree_version()
+        query: Optional[str] = hot_requests.query(request_key)
+        if query is None or cache.get(rendered_key(version, request_key)) is not None:
+            return
+        try:
+            _render(request_key, version, query)
+        except Exception:
+            logger.exception('Could not warm %s', request_key[0])
+
+
+cache_warmer = CacheWarmer()
+